@@ -0,0 +1,48 @@
+import os
+import argparse
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from tarifas.cache import directorio_cache
+from tarifas.carga import tablas
+from tarifas.descargas import URL
+from tarifas.extraccion import crear_cache
+from tarifas.ingesta import actualizar
+
+# Carpeta donde se guardan los PDF descargados (la misma de scraping.py)
+OUTPUT_FOLDER = "pdfs_epm"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Descarga, extrae y carga en la base solo los meses que aún no están.")
+    parser.add_argument("--url", default=URL, help="Página con el listado de PDF")
+    parser.add_argument("--salida", default=OUTPUT_FOLDER, help="Carpeta donde se guardan los PDF")
+    parser.add_argument("--cache", default=directorio_cache, help="Carpeta de la caché de extracción")
+    parser.add_argument("--env", required=True,
+                        help="Archivo .env con DATABASE_URL de la base a actualizar (sin valor por defecto: "
+                             "dashboard/.env es la base del dashboard en producción)")
+    parser.add_argument("--hilos", type=int, default=4, help="Descargas simultáneas")
+    args = parser.parse_args()
+
+    load_dotenv(args.env)
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit(f"DATABASE_URL no está configurado en {args.env}")
+
+    engine = create_engine(database_url)
+    resumen = actualizar(engine, args.url, args.salida, cache=crear_cache(args.cache), hilos=args.hilos)
+
+    if not resumen["meses"]:
+        print("La base ya tiene todos los meses publicados.")
+        return
+    print(f"Meses nuevos: {', '.join(str(periodo) for periodo in resumen['meses'])}")
+    for file_name, error in resumen["errores"].items():
+        print(f"{file_name}: error al descargar, {error}")
+    for conjunto, tabla in tablas.items():
+        print(f"{tabla}: {resumen['insertadas'][conjunto]} filas insertadas, "
+              f"{resumen['descartadas'][conjunto]} descartadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Micro-benchmark: atípicos con groupby().apply por categoría vs. la máscara vectorizada.
+
+Genera una historia sintética (categorías x meses) y compara el tiempo de la
+versión anterior de la pestaña de estadísticas con dashboard/atipicos.py, y
+verifica que marquen las mismas filas.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_atipicos.py --categorias 17 --meses 600
+"""
+import os
+import sys
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dashboard"))
+
+from atipicos import mascara_atipicos
+
+propiedades = ["propiedad_epm", "propiedad_compartido", "propiedad_cliente"]
+
+
+def historia(categorias, meses, semilla=0):
+    generador = np.random.default_rng(semilla)
+    fechas = pd.date_range("1990-01-01", periods=meses, freq="MS")
+    filas = pd.DataFrame({
+        "fecha": np.repeat(fechas, categorias),
+        "categoria_nombre": np.tile([f"Categoría {i:02d}" for i in range(categorias)], meses),
+    })
+    base = np.tile(generador.uniform(200, 1000, categorias), meses)
+    tendencia = np.repeat(np.linspace(1, 3, meses), categorias)
+    for columna in propiedades:
+        ruido = generador.normal(1, 0.05, len(filas))
+        saltos = generador.random(len(filas)) < 0.01
+        filas[columna] = base * tendencia * ruido * np.where(saltos, 1.8, 1)
+    return filas
+
+
+def atipicos_apply(df, tipo_propiedad):
+    """Versión anterior: detectar_outliers por categoría y aplanar las listas de índices."""
+    def detectar_outliers(data):
+        q1 = data.quantile(0.25)
+        q3 = data.quantile(0.75)
+        iqr = q3 - q1
+        return data[(data < (q1 - 1.5 * iqr)) | (data > (q3 + 1.5 * iqr))].index
+
+    indices = df.groupby("categoria_nombre", group_keys=False).apply(
+        lambda grupo: detectar_outliers(grupo[tipo_propiedad]), include_groups=False
+    )
+    lista = []
+    for indices_grupo in indices:
+        if not indices_grupo.empty:
+            lista.extend(indices_grupo.tolist())
+    return lista
+
+
+def atipicos_mascara(df, tipo_propiedad, modo="iqr"):
+    mascara = mascara_atipicos(df, propiedades, modo=modo)
+    return df[mascara[tipo_propiedad]].sort_values("categoria_nombre", kind="stable").index.tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la detección de atípicos por apply y vectorizada.")
+    parser.add_argument("--categorias", type=int, default=17)
+    parser.add_argument("--meses", type=int, default=600)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    df = historia(args.categorias, args.meses)
+    print(f"{len(df):,} filas, {args.categorias} categorías")
+
+    for tipo_propiedad in propiedades:
+        if atipicos_apply(df, tipo_propiedad) != atipicos_mascara(df, tipo_propiedad):
+            raise SystemExit(f"Resultados distintos en {tipo_propiedad}")
+
+    # La versión anterior necesita una pasada por propiedad; la máscara cubre las tres
+    anterior = min(timeit.repeat(lambda: [atipicos_apply(df, p) for p in propiedades],
+                                 number=1, repeat=args.repeticiones))
+    print(f"apply por categoría (3 propiedades): {anterior * 1000:8.1f} ms")
+    for modo in ("iqr", "ventana", "mad"):
+        tiempo = min(timeit.repeat(lambda: mascara_atipicos(df, propiedades, modo=modo),
+                                   number=1, repeat=args.repeticiones))
+        print(f"máscara {modo:<8} (3 propiedades):   {tiempo * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
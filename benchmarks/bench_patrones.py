@@ -0,0 +1,80 @@
+"""Micro-benchmark: buscador de una sola pasada vs. el ciclo de re.search por patrón.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_patrones.py unificados/2014.pdf unificados/2023.pdf
+"""
+import os
+import re
+import sys
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pdfplumber
+from tarifas.patrones import expresiones1, expresiones2, regex_periodo, meses, extraer_filas
+
+
+def extraer_filas_ciclo(texto):
+    """Versión original de extract v5.py: un re.search sin compilar por patrón."""
+    periodo = None
+    match_periodo = re.search(regex_periodo, texto, re.IGNORECASE)
+    if match_periodo:
+        mes_texto, anio = match_periodo.groups()
+        periodo = anio + meses[mes_texto.capitalize()]
+
+    filas1 = []
+    for categoria, patron in expresiones1.items():
+        match = re.search(patron, texto)
+        if match:
+            filas1.append([categoria] + list(match.groups()))
+
+    filas2 = []
+    for categoria, patron in expresiones2.items():
+        match = re.search(patron, texto)
+        if match:
+            filas2.append([categoria] + list(match.groups()))
+
+    return periodo, filas1, filas2
+
+
+def leer_textos(rutas):
+    textos = []
+    for ruta in rutas:
+        with pdfplumber.open(ruta) as pdf:
+            for page in pdf.pages:
+                texto = page.extract_text()
+                if texto:
+                    textos.append(texto)
+    return textos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("-n", "--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    textos = leer_textos(args.pdfs)
+    print(f"{len(textos)} páginas con texto")
+
+    for nombre, funcion in [("ciclo re.search", extraer_filas_ciclo), ("una pasada", extraer_filas)]:
+        tiempo = min(timeit.repeat(lambda: [funcion(t) for t in textos], number=args.repeticiones, repeat=3))
+        por_pagina = tiempo / (args.repeticiones * len(textos)) * 1e6
+        print(f"{nombre:>16}: {por_pagina:8.1f} µs/página")
+
+    # Las únicas diferencias esperadas son los "Rango > CS" de cada estrato y los números
+    # que pdfplumber parte en dos, que el buscador vuelve a unir
+    diferencias = 0
+    for texto in textos:
+        antes, despues = extraer_filas_ciclo(texto), extraer_filas(texto)
+        if antes != despues:
+            diferencias += 1
+            for fila_antes, fila_despues in zip(antes[1], despues[1]):
+                if fila_antes != fila_despues:
+                    print(f"  {antes[0]}: {fila_antes} -> {fila_despues}")
+    print(f"{diferencias} páginas con filas distintas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Tiempo por interacción del dashboard: todas las pestañas vs. solo la abierta.
+
+Ejecuta dashboard/app.py con streamlit.testing (sin navegador) en los dos
+modos (PESTANAS_PEREZOSAS=0 y 1) y repite la misma secuencia de
+interacciones: abrir cada pestaña con cada tipo de propiedad. Informa la
+mediana y el p90 del tiempo por interacción y el tiempo de cálculo de cada
+pestaña que registra dashboard/tiempos.py.
+
+Sin --env corre sobre la base SQLite sintética de benchmarks/suite.py.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_pestanas.py
+    python benchmarks/bench_pestanas.py --env local.env     (una copia local de la base)
+"""
+import os
+import csv
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+from dotenv import load_dotenv
+
+ruta_app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dashboard", "app.py")
+
+propiedades = ["propiedad_epm", "propiedad_compartido", "propiedad_cliente"]
+pestanas = ["📈 Evolución Temporal", "📊 Análisis Comparativo", "📉 Tendencias",
+            "📑 Estadísticas", "🤖 Análisis Inteligente", "🔮 Predicción de Tarifas"]
+
+
+def medir_modo(perezosas, repeticiones):
+    """Devuelve (tiempos por interacción, {pestaña: [segundos de cálculo]})."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    with tempfile.TemporaryDirectory() as directorio:
+        registro = os.path.join(directorio, "tiempos.csv")
+        os.environ["PESTANAS_PEREZOSAS"] = "1" if perezosas else "0"
+        os.environ["REGISTRO_TIEMPOS"] = registro
+        os.environ["DIRECTORIO_PRONOSTICOS"] = os.path.join(directorio, "pronosticos")
+
+        app = AppTest.from_file(ruta_app, default_timeout=600)
+        app.run()
+        interacciones = []
+        for _ in range(repeticiones):
+            for propiedad in propiedades:
+                for pestana in pestanas:
+                    # AppTest no tiene clic de pestaña: se fija su estado antes de la ejecución
+                    app.session_state["pestana"] = pestana
+                    inicio = time.perf_counter()
+                    app.sidebar.selectbox[0].select(propiedad).run()
+                    interacciones.append(time.perf_counter() - inicio)
+                    if app.exception:
+                        raise RuntimeError(app.exception[0].value)
+
+        por_pestana = {}
+        with open(registro, newline="", encoding="utf-8") as archivo:
+            for nombre, segundos in csv.reader(archivo):
+                por_pestana.setdefault(nombre, []).append(float(segundos))
+    return interacciones, por_pestana
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara el tiempo por interacción con y sin pestañas perezosas.")
+    parser.add_argument("--env", help="Archivo .env con DATABASE_URL (si no, base SQLite sintética)")
+    parser.add_argument("--repeticiones", type=int, default=2, help="Veces que se repite la secuencia")
+    args = parser.parse_args()
+
+    # app.py importa sus módulos (consultas, pronosticos...) desde su carpeta
+    sys.path.insert(0, os.path.dirname(ruta_app))
+    with tempfile.TemporaryDirectory() as directorio:
+        if args.env:
+            load_dotenv(args.env)
+            if not os.getenv("DATABASE_URL"):
+                raise SystemExit(f"DATABASE_URL no está configurado en {args.env}")
+        else:
+            from suite import cargar, crear_base, filas_sinteticas
+
+            ruta_base = os.path.join(directorio, "tarifas.db")
+            cargar(crear_base(ruta_base), filas_sinteticas())
+            os.environ["DATABASE_URL"] = f"sqlite:///{ruta_base}"
+            os.environ.pop("INSTANTANEA", None)
+
+        resultados = {}
+        for nombre, perezosas in (("todas", False), ("perezosa", True)):
+            resultados[nombre] = medir_modo(perezosas, args.repeticiones)
+
+    print(f"{'modo':<10} {'interacciones':>13} {'mediana ms':>11} {'p90 ms':>8}")
+    for nombre, (interacciones, _) in resultados.items():
+        p90 = statistics.quantiles(interacciones, n=10)[-1]
+        print(f"{nombre:<10} {len(interacciones):>13} {statistics.median(interacciones) * 1000:>11.1f} {p90 * 1000:>8.1f}")
+
+    print("\nCálculo por pestaña (ms promedio por ejecución, ejecuciones)")
+    for pestana in pestanas:
+        columnas = []
+        for nombre, (_, por_pestana) in resultados.items():
+            tiempos = por_pestana.get(pestana, [])
+            promedio = statistics.mean(tiempos) * 1000 if tiempos else 0.0
+            columnas.append(f"{nombre}: {promedio:8.1f} ({len(tiempos):>3})")
+        print(f"{pestana:<28} " + "   ".join(columnas))
+
+
+if __name__ == "__main__":
+    main()
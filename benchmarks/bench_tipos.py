@@ -0,0 +1,110 @@
+"""Memoria y tiempo de las agregaciones del dashboard con los tipos de antes y los compactos.
+
+"Antes" es el DataFrame tal como lo devuelve consultas.leer_tabla (nombres como
+texto, enteros y precios en 64 bits) más las columnas año/mes en int64 que las
+pestañas calculaban en cada ejecución; "después" es esquema.compactar(). Mide
+memoria (deep) y el tiempo de los groupby que repiten las pestañas en cada
+interacción, y revisa que den lo mismo al centavo.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_tipos.py --categorias 17 --meses 600
+    python benchmarks/bench_tipos.py --env dashboard/.env     (tabla tarifa real)
+"""
+import os
+import sys
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dashboard"))
+
+from consultas import columnas, leer_tarifas
+from esquema import compactar
+
+propiedades = columnas["tarifa"]
+
+
+def historia(categorias, meses, semilla=0):
+    """Tabla tarifa sintética con las mismas columnas que leer_tabla."""
+    generador = np.random.default_rng(semilla)
+    fechas = pd.date_range("1990-01-01", periods=meses, freq="MS")
+    df = pd.DataFrame({
+        "id_tarifa": np.arange(1, meses * categorias + 1),
+        "id_categoria": np.tile(np.arange(1, categorias + 1), meses),
+    })
+    tendencia = np.repeat(np.linspace(1, 3, meses), categorias)
+    base = np.tile(generador.uniform(200, 1000, categorias), meses)
+    for columna in propiedades:
+        df[columna] = (base * tendencia * generador.normal(1, 0.05, len(df))).round(2)
+    df["periodo"] = np.repeat(fechas.year * 100 + fechas.month, categorias)
+    df["categoria_nombre"] = np.tile([f"Categoría {i:02d}" for i in range(categorias)], meses)
+    df["fecha"] = np.repeat(fechas, categorias)
+    return df
+
+
+def agregaciones(df, tipo_propiedad):
+    """Los groupby que hacen las pestañas y los insights en cada ejecución."""
+    return [
+        df.groupby("fecha")[tipo_propiedad].mean().pct_change(),
+        df.groupby("categoria_nombre", observed=True)[tipo_propiedad].std(),
+        df.groupby("año")[tipo_propiedad].mean(),
+        df.groupby(["año", "mes"])[tipo_propiedad].mean(),
+        df.groupby("mes")[tipo_propiedad].agg(["mean", "std"]),
+        df.pivot_table(values=tipo_propiedad, index="mes", columns="año", aggfunc="mean", observed=True),
+    ]
+
+
+def antes(df):
+    df = df.copy()
+    df["año"] = df["fecha"].dt.year
+    df["mes"] = df["fecha"].dt.month
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara memoria y agregaciones con tipos de 64 bits y compactos.")
+    parser.add_argument("--env", help="Archivo .env con DATABASE_URL (si no, datos sintéticos)")
+    parser.add_argument("--categorias", type=int, default=17)
+    parser.add_argument("--meses", type=int, default=600)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.env:
+        from dotenv import load_dotenv
+        from sqlalchemy import create_engine
+
+        load_dotenv(args.env)
+        if not os.getenv("DATABASE_URL"):
+            raise SystemExit(f"DATABASE_URL no está configurado en {args.env}")
+        df, _ = leer_tarifas(create_engine(os.getenv("DATABASE_URL")))
+    else:
+        df = historia(args.categorias, args.meses)
+    print(f"{len(df):,} filas, {df['categoria_nombre'].nunique()} categorías")
+
+    anterior = antes(df)
+    compacto = compactar(df, propiedades)
+
+    for propiedad in propiedades:
+        for a, b in zip(agregaciones(anterior, propiedad), agregaciones(compacto, propiedad)):
+            if not np.allclose(np.asarray(a, dtype=float), np.asarray(b, dtype=float), atol=0.005, equal_nan=True):
+                raise SystemExit(f"Resultados distintos en {propiedad}")
+
+    print(f"{'':<10} {'memoria KiB':>12} {'agregaciones ms':>16} {'compactar ms':>13}")
+    conversion = min(timeit.repeat(lambda: compactar(df, propiedades), number=1, repeat=args.repeticiones))
+    for nombre, datos, preparar in (("antes", anterior, None), ("después", compacto, conversion)):
+        memoria = datos.memory_usage(deep=True).sum() / 1024
+        tiempo = min(timeit.repeat(lambda: [agregaciones(datos, p) for p in propiedades],
+                                   number=1, repeat=args.repeticiones))
+        extra = f"{preparar * 1000:13.1f}" if preparar is not None else f"{'':>13}"
+        print(f"{nombre:<10} {memoria:12.1f} {tiempo * 1000:16.1f} {extra}")
+
+    print("\nMemoria por columna (KiB)")
+    for columna in compacto.columns:
+        print(f"{columna:<22} {anterior[columna].memory_usage(deep=True, index=False) / 1024:9.1f} "
+              f"-> {compacto[columna].memory_usage(deep=True, index=False) / 1024:9.1f}  {compacto[columna].dtype}")
+
+
+if __name__ == "__main__":
+    main()
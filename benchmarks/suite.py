@@ -0,0 +1,308 @@
+"""Suite de benchmarks con fixtures fijos; escribe los resultados en JSON.
+
+Fixtures:
+- PDF: unificados/2014.pdf y unificados/2023.pdf más el de enero de cada
+  carpeta 2014/ ... 2024/ (con --completo, todos los de unificados/ y de las carpetas).
+- Tabla tarifa sintética de 50 años (600 meses) con las categorías de
+  tarifas_nivel1.csv, cargada en una base SQLite temporal con el esquema del
+  dashboard (índices de 001 y acumulados de 002). Con --modelo largo se migra
+  antes a la tabla tarifa_valor con vistas (004, tarifas/valores.py).
+
+Mediciones (tiempo de cada repetición; el JSON guarda la mediana y el mínimo):
+- extraccion.texto.*    texto de cada página con cada backend de tarifas/texto.py (pdfplumber y,
+                        si pypdfium2 está instalado, pdfium), como tarifas.extraccion.paginas_pdf
+- extraccion.patrones   tarifas.patrones sobre esos textos
+- extraccion.lectura.*  tarifas.extraccion.paginas_pdf con el backend por defecto y cada lectura
+                        (completa, clasificada, recortada; ver tarifas/plantillas.py)
+- extraccion.csv        filas de la tabla sintética con csv.writer, como extraer.py
+- consolidado.*         tarifas.consolidado.consolidar de los CSV mensuales y los consolidados del
+                        repositorio con cada lector (csv y, si pyarrow está instalado, arrow)
+- carga.filas           tarifas.carga.cargar_filas de la tabla sintética (upsert, executemany)
+- carga.acumulados      recalcular tarifa_acumulado
+- datos.*               lo que hace load_data: SQL (consultas.leer_filtrado) e instantánea
+                        Arrow + esquema.compactar, para toda la tabla y para 3 categorías x 5 años
+- pestana.*             cálculo de cada pestaña del dashboard (dashboard/tiempos.py) con
+                        streamlit.testing sobre la base sintética; se omite con --sin-app
+
+Con --comparar anterior.json informa lo que empeoró más de --tolerancia y
+sale con código 1, para seguir las regresiones entre commits.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/suite.py --salida resultados.json
+    python benchmarks/suite.py --solo datos,pestana --comparar resultados.json
+    python benchmarks/suite.py --solo carga,datos --modelo largo --comparar resultados.json
+"""
+import os
+import sys
+import csv
+import json
+import glob
+import timeit
+import argparse
+import platform
+import importlib.util
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+raiz = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, raiz)
+sys.path.insert(0, os.path.join(raiz, "dashboard"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from bench_tipos import historia
+from consultas import columnas as columnas_tabla, leer_filtrado, nombres_categoria
+from esquema import compactar
+from instantanea import Instantanea, exportar
+from tarifas.agregados import columnas_acumulado, tabla_acumulado
+from tarifas.carga import actualizar_acumulados, cargar_filas, leer_csv
+from tarifas.consolidado import consolidar, fuentes_por_defecto, lectores
+from tarifas.valores import migrar
+from tarifas.extraccion import encabezados, extraer_pagina, lecturas, paginas_pdf
+from tarifas.texto import abrir as abrir_texto, backend_por_defecto, backend_referencia, backends
+
+pdfs_fijos = ["unificados/2014.pdf", "unificados/2023.pdf"] + [f"{anio}/{anio}-01.pdf" for anio in range(2014, 2025)]
+
+meses_sinteticos = 600
+
+propiedades = columnas_tabla["tarifa"]
+
+
+def rutas_pdf(completo):
+    if completo:
+        rutas = sorted(glob.glob(os.path.join(raiz, "unificados", "*.pdf")))
+        rutas += sorted(glob.glob(os.path.join(raiz, "20[0-9][0-9]", "*.pdf")))
+        return rutas
+    return [os.path.join(raiz, ruta) for ruta in pdfs_fijos if os.path.exists(os.path.join(raiz, ruta))]
+
+
+def textos_pdf(rutas, backend=backend_referencia):
+    """Texto de cada página con el backend dado, como paginas_pdf."""
+    textos = []
+    for ruta in rutas:
+        with abrir_texto(ruta, backend) as lector:
+            textos += [lector.texto(indice) for indice in range(len(lector))]
+    return textos
+
+
+def filas_sinteticas(meses=meses_sinteticos):
+    """Filas [categoría, epm, compartido, cliente, periodo] como las de tarifas_nivel1.csv."""
+    nombres = sorted({fila[0].strip() for fila in leer_csv(os.path.join(raiz, "tarifas_nivel1.csv"))})
+    df = historia(len(nombres), meses)
+    df["categoria_nombre"] = df["id_categoria"].map(dict(enumerate(nombres, start=1)))
+    valores = [df[columna].map("{:.2f}".format) for columna in propiedades]
+    return [list(fila) for fila in zip(df["categoria_nombre"], *valores, df["periodo"].astype(str))]
+
+
+def crear_base(ruta, modelo="ancho"):
+    """Base SQLite con categoria, tarifa, tarifa_nivel y sus acumulados (esquema de tablas.sql + migraciones).
+
+    modelo="largo": además migra a tarifa_valor, con tarifa y tarifa_nivel como vistas.
+    """
+    engine = create_engine(f"sqlite:///{ruta}")
+    with engine.begin() as conexion:
+        conexion.execute(text("CREATE TABLE categoria (id_categoria INTEGER PRIMARY KEY AUTOINCREMENT, "
+                              "nombre VARCHAR(100) NOT NULL)"))
+        for tabla, valores in columnas_tabla.items():
+            definicion = ", ".join(f"{columna} DECIMAL(10,2)" for columna in valores)
+            conexion.execute(text(f"CREATE TABLE {tabla} (id_tarifa INTEGER PRIMARY KEY AUTOINCREMENT, "
+                                  f"id_categoria INT, {definicion}, periodo INT)"))
+            conexion.execute(text(f"CREATE UNIQUE INDEX uk_{tabla}_categoria_periodo ON {tabla} (id_categoria, periodo)"))
+            conexion.execute(text(f"CREATE INDEX idx_{tabla}_periodo ON {tabla} "
+                                  f"(periodo, id_categoria, {', '.join(valores)})"))
+            acumulado = ", ".join(f"{columna} DECIMAL(24,4)" for columna in columnas_acumulado(valores)[3:])
+            conexion.execute(text(f"CREATE TABLE {tabla_acumulado(tabla)} (id_categoria INT, periodo INT, n INT, "
+                                  f"{acumulado}, PRIMARY KEY (id_categoria, periodo))"))
+        if modelo == "largo":
+            migrar(conexion, columnas_tabla)
+    return engine
+
+
+def cargar(engine, filas):
+    with engine.begin() as conexion:
+        return cargar_filas(conexion, 1, filas, exigir_decimales=False)
+
+
+def escribir_csv(ruta, filas):
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(encabezados[1])
+        escritor.writerows(filas)
+
+
+def medir(resultados, nombre, funcion, repeticiones, unidades=None, unidad=None):
+    """Corre funcion `repeticiones` veces y guarda sus tiempos en resultados[nombre]."""
+    tiempos = timeit.repeat(funcion, number=1, repeat=repeticiones)
+    resultado = {"mediana_s": statistics.median(tiempos), "minimo_s": min(tiempos), "tiempos_s": tiempos}
+    if unidades:
+        resultado.update(unidades=unidades, unidad=unidad, ms_por_unidad=resultado["mediana_s"] * 1000 / unidades)
+    resultados[nombre] = resultado
+    print(f"{nombre:<40} {resultado['mediana_s'] * 1000:>10.1f} ms" +
+          (f"  ({unidades:,} {unidad})" if unidades else ""), flush=True)
+
+
+def medir_pestanas(resultados, url, repeticiones):
+    """Tiempo de cálculo por pestaña que registra dashboard/tiempos.py, con AppTest (pestañas perezosas)."""
+    from bench_pestanas import medir_modo
+
+    os.environ["DATABASE_URL"] = url
+    os.environ.pop("INSTANTANEA", None)
+    interacciones, por_pestana = medir_modo(perezosas=True, repeticiones=repeticiones)
+    resultados["pestana.interaccion"] = {"mediana_s": statistics.median(interacciones),
+                                         "minimo_s": min(interacciones), "tiempos_s": interacciones}
+    for pestana, tiempos in por_pestana.items():
+        # El nombre de la pestaña sin el emoji
+        nombre = "pestana." + pestana.split(" ", 1)[-1].lower().replace(" ", "_")
+        resultados[nombre] = {"mediana_s": statistics.median(tiempos), "minimo_s": min(tiempos), "tiempos_s": tiempos}
+    for nombre in sorted(n for n in resultados if n.startswith("pestana.")):
+        print(f"{nombre:<40} {resultados[nombre]['mediana_s'] * 1000:>10.1f} ms", flush=True)
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=raiz, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, anterior, tolerancia, minimo_ms):
+    """Mediciones cuya mediana creció más de `tolerancia` (y más de `minimo_ms`); devuelve la lista."""
+    regresiones = []
+    print(f"\n{'medición':<40} {'antes ms':>10} {'ahora ms':>10} {'cambio':>8}")
+    for nombre, resultado in resultados.items():
+        if nombre not in anterior:
+            continue
+        antes, ahora = anterior[nombre]["mediana_s"], resultado["mediana_s"]
+        cambio = ahora / antes - 1 if antes else 0.0
+        peor = cambio > tolerancia and (ahora - antes) * 1000 > minimo_ms
+        if peor:
+            regresiones.append(nombre)
+        print(f"{nombre:<40} {antes * 1000:>10.1f} {ahora * 1000:>10.1f} {cambio:>+8.0%}{'  REGRESIÓN' if peor else ''}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline y del dashboard con salida JSON.")
+    parser.add_argument("--salida", help="Archivo JSON donde escribir los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para buscar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Aumento relativo que cuenta como regresión")
+    parser.add_argument("--minimo-ms", type=float, default=1.0, help="Diferencias menores se ignoran (ruido)")
+    parser.add_argument("--solo", help="Prefijos de las mediciones a correr, separados por coma (p. ej. datos,carga)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--repeticiones-pdf", type=int, default=1, help="Repeticiones de la extracción de texto")
+    parser.add_argument("--completo", action="store_true", help="Todos los PDF de unificados/ y de las carpetas por año")
+    parser.add_argument("--sin-app", action="store_true", help="No medir las pestañas con streamlit.testing")
+    parser.add_argument("--modelo", choices=["ancho", "largo"], default="ancho",
+                        help="Esquema de la base sintética: tablas anchas o tarifa_valor con vistas")
+    args = parser.parse_args()
+
+    prefijos = tuple(args.solo.split(",")) if args.solo else ("",)
+
+    def activa(nombre):
+        return nombre.startswith(prefijos)
+
+    resultados = {}
+    fixtures = {"meses_sinteticos": meses_sinteticos, "modelo": args.modelo}
+
+    if activa("extraccion.texto") or activa("extraccion.patrones") or activa("extraccion.lectura"):
+        rutas = rutas_pdf(args.completo)
+        fixtures["pdfs"] = [os.path.relpath(ruta, raiz) for ruta in rutas]
+        textos = textos_pdf(rutas)
+        fixtures["paginas"] = len(textos)
+        for backend in backends:
+            nombre = f"extraccion.texto.{backend}"
+            if activa(nombre) and (backend == backend_referencia or backend == backend_por_defecto):
+                medir(resultados, nombre, lambda: textos_pdf(rutas, backend), args.repeticiones_pdf, len(textos),
+                      "páginas")
+        if activa("extraccion.patrones"):
+            medir(resultados, "extraccion.patrones", lambda: [extraer_pagina(t) for t in textos],
+                  args.repeticiones, len(textos), "páginas")
+        for lectura in lecturas:
+            nombre = f"extraccion.lectura.{lectura}"
+            if activa(nombre):
+                medir(resultados, nombre, lambda: [list(paginas_pdf(ruta, lectura=lectura)) for ruta in rutas],
+                      args.repeticiones_pdf, len(textos), "páginas")
+
+    if activa("consolidado"):
+        fuentes = fuentes_por_defecto(raiz)
+        fixtures["csv_consolidado"] = len(fuentes)
+        for lector in lectores:
+            nombre = f"consolidado.{lector}"
+            if activa(nombre) and (lector != "arrow" or importlib.util.find_spec("pyarrow")):
+                medir(resultados, nombre, lambda: consolidar(fuentes, lector=lector), args.repeticiones, len(fuentes),
+                      "archivos")
+
+    filas = filas_sinteticas()
+    fixtures["filas_sinteticas"] = len(filas)
+    with tempfile.TemporaryDirectory() as directorio:
+        if activa("extraccion.csv"):
+            medir(resultados, "extraccion.csv", lambda: escribir_csv(os.path.join(directorio, "filas.csv"), filas),
+                  args.repeticiones, len(filas), "filas")
+
+        ruta_base = os.path.join(directorio, "tarifas.db")
+        engine = crear_base(ruta_base, args.modelo)
+        cargar(engine, filas)
+        with engine.begin() as conexion:
+            actualizar_acumulados(conexion, [1])
+        if activa("carga.filas"):
+            medir(resultados, "carga.filas", lambda: cargar(engine, filas), args.repeticiones, len(filas), "filas")
+        if activa("carga.acumulados"):
+            def acumulados():
+                with engine.begin() as conexion:
+                    actualizar_acumulados(conexion, [1])
+            medir(resultados, "carga.acumulados", acumulados, args.repeticiones, len(filas), "filas")
+
+        with engine.connect() as conexion:
+            categorias = nombres_categoria(conexion)
+        ids = sorted(categorias)
+        periodos = sorted({int(fila[-1]) for fila in filas})
+        selecciones = {"todo": (ids, periodos[0], periodos[-1]), "3x5": (ids[:3], periodos[-60], periodos[-1])}
+        exportar(engine, os.path.join(directorio, "instantanea"))
+        instantanea = Instantanea.abrir(os.path.join(directorio, "instantanea"))
+        for nombre, (ids_seleccion, desde, hasta) in selecciones.items():
+            if activa(f"datos.sql.{nombre}"):
+                def sql():
+                    with engine.connect() as conexion:
+                        return compactar(leer_filtrado(conexion, "tarifa", categorias, ids_seleccion, desde, hasta),
+                                         propiedades)
+                medir(resultados, f"datos.sql.{nombre}", sql, args.repeticiones)
+            if activa(f"datos.instantanea.{nombre}"):
+                medir(resultados, f"datos.instantanea.{nombre}",
+                      lambda: compactar(instantanea.leer_filtrado("tarifa", ids_seleccion, desde, hasta), propiedades),
+                      args.repeticiones)
+
+        if activa("pestana") and not args.sin_app:
+            medir_pestanas(resultados, f"sqlite:///{ruta_base}", max(1, args.repeticiones // 5))
+        engine.dispose()
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "procesadores": os.cpu_count(),
+        "repeticiones": args.repeticiones,
+        "fixtures": fixtures,
+        "resultados": resultados,
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, ensure_ascii=False, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            anterior = json.load(archivo)["resultados"]
+        regresiones = comparar(resultados, anterior, args.tolerancia, args.minimo_ms)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones: {', '.join(regresiones)}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Verifica el servicio de análisis con IA (dashboard/analisis_ia.py) con el backend falso.
+
+- Tamaño del prompt: CSV completo (como antes) vs. resumen estadístico, para
+  historias de distinto largo.
+- Límite de llamadas simultáneas: varias solicitudes a la vez nunca pasan de `hilos`.
+- Caché: la misma solicitud no vuelve a llamar al modelo, tampoco con un
+  servicio nuevo sobre la misma carpeta (disco).
+- Errores: no se guardan y la siguiente solicitud vuelve a intentar.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/verificar_analisis.py
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dashboard"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analisis_ia import BackendFalso, ServicioAnalisis, armar_prompt, resumir
+from bench_atipicos import historia
+
+prompt = "Analiza la evolución temporal de las tarifas de energía. Responde siempre en español."
+
+
+class BackendConFallas(BackendFalso):
+    def __init__(self, fallas):
+        super().__init__()
+        self.fallas = fallas
+
+    def generar(self, prompt, modelo):
+        if self.fallas:
+            self.fallas -= 1
+            raise RuntimeError("falla simulada")
+        return super().generar(prompt, modelo)
+
+
+def verificar(condicion, mensaje):
+    print(f"{'ok ' if condicion else 'FALLA'} {mensaje}")
+    if not condicion:
+        raise SystemExit(1)
+
+
+def main():
+    print(f"{'meses':>6} {'filas':>7} {'CSV (caracteres)':>17} {'resumen':>9} {'resumir ms':>11}")
+    for meses in (60, 120, 600):
+        df = historia(17, meses)[["fecha", "propiedad_epm", "categoria_nombre"]]
+        inicio = time.perf_counter()
+        resumen = resumir(df)
+        tiempo = time.perf_counter() - inicio
+        anterior = f"{prompt}\n\nData:\n{df.to_csv(index=False)}"
+        print(f"{meses:>6} {len(df):>7} {len(anterior):>17,} {len(armar_prompt(prompt, resumen)):>9,} {tiempo * 1000:>11.1f}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        backend = BackendFalso(demora=0.2)
+        servicio = ServicioAnalisis(backend, directorio, hilos=2)
+        claves = [servicio.solicitar(historia(17, 24, semilla=semilla), prompt) for semilla in range(6)]
+        verificar(all(servicio.estado(clave)[0] == "pendiente" for clave in claves[2:]),
+                  "solicitar() vuelve sin esperar al modelo")
+        estados = [servicio.esperar(clave) for clave in claves]
+        verificar(all(estado == "listo" for estado, _ in estados), "las 6 solicitudes terminan")
+        verificar(backend.max_simultaneas == 2, f"como máximo 2 llamadas simultáneas ({backend.max_simultaneas})")
+
+        servicio.solicitar(historia(17, 24, semilla=0), prompt)
+        verificar(backend.llamadas == 6 and servicio.aciertos == 1, "la misma solicitud sale de memoria")
+        nuevo = ServicioAnalisis(BackendFalso(), directorio)
+        nuevo.solicitar(historia(17, 24, semilla=0), prompt)
+        verificar(nuevo.backend.llamadas == 0 and nuevo.aciertos == 1, "y de disco con un servicio nuevo")
+        otra = nuevo.solicitar(historia(17, 24, semilla=0), prompt, modelo="otro-modelo")
+        nuevo.esperar(otra)
+        verificar(otra != claves[0] and nuevo.backend.llamadas == 1, "otro modelo es otra clave")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        servicio = ServicioAnalisis(BackendConFallas(fallas=1), directorio)
+        clave = servicio.solicitar(historia(17, 24), prompt)
+        estado, mensaje = servicio.esperar(clave)
+        while estado == "pendiente":
+            estado, mensaje = servicio.esperar(clave, 0.05)
+        verificar(estado == "error" and "falla simulada" in mensaje, "el error llega al dashboard")
+        verificar(not os.listdir(directorio), "y no se guarda")
+        estado, _ = servicio.esperar(servicio.solicitar(historia(17, 24), prompt))
+        verificar(estado == "listo", "el siguiente intento llama otra vez al modelo")
+
+
+if __name__ == "__main__":
+    main()
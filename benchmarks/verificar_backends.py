@@ -0,0 +1,72 @@
+"""Verifica que el backend rápido (pdfium con respaldo) dé las mismas filas que pdfplumber.
+
+Extrae cada PDF con el backend rápido, con la lectura elegida
+(clasificada por defecto; ver tarifas/plantillas.py), y con pdfplumber
+sobre todas las páginas enteras;
+compara el resultado de cada página (período, filas de Nivel I y de Niveles
+II-IV) e informa las páginas por segundo de cada uno y cuántas páginas se
+omitieron, se recortaron y se releyeron con pdfplumber. Las páginas omitidas
+(otros operadores de red) no se comparan. Sale con código 1 si alguna
+página es distinta.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/verificar_backends.py                    (unificados/ y 2014/ ... 2024/)
+    python benchmarks/verificar_backends.py 2019/*.pdf
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tarifas.extraccion import lectura_por_defecto, lecturas, paginas_pdf
+from tarifas.plantillas import familia_operador_red
+from tarifas.texto import backend_referencia
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*")
+    parser.add_argument("--backend", default="pdfium", help="Backend a comparar con pdfplumber")
+    parser.add_argument("--lectura", choices=lecturas, default=lectura_por_defecto,
+                        help="Lectura de las páginas con el backend rápido")
+    args = parser.parse_args()
+
+    rutas = args.pdfs or (sorted(glob.glob("unificados/*.pdf")) + sorted(glob.glob("20[0-9][0-9]/*.pdf")))
+    tiempos = {args.backend: 0.0, backend_referencia: 0.0}
+    paginas = respaldo = omitidas = recortadas = 0
+    distintas = []
+    for ruta in rutas:
+        inicio = time.perf_counter()
+        rapidas = list(paginas_pdf(ruta, backend=args.backend, lectura=args.lectura))
+        tiempos[args.backend] += time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        referencia = list(paginas_pdf(ruta, backend=backend_referencia, lectura="completa"))
+        tiempos[backend_referencia] += time.perf_counter() - inicio
+
+        paginas += len(rapidas)
+        respaldo += sum(pagina["backend"] != args.backend for pagina in rapidas)
+        recortadas += sum(pagina["recorte"] for pagina in rapidas)
+        for indice, (rapida, lenta) in enumerate(zip(rapidas, referencia)):
+            if rapida.get("familia") == familia_operador_red:
+                omitidas += 1
+            elif rapida["resultado"] != lenta["resultado"]:
+                distintas.append((ruta, indice, rapida["resultado"], lenta["resultado"]))
+
+    print(f"{len(rutas)} PDF, {paginas} páginas")
+    for backend, segundos in tiempos.items():
+        print(f"{backend:<12} {segundos:8.2f} s {paginas / segundos:10.1f} páginas/s")
+    print(f"{omitidas} páginas omitidas, {recortadas} recortadas")
+    print(f"{respaldo} páginas releídas con {backend_referencia} ({respaldo / max(paginas, 1):.1%})")
+
+    for ruta, indice, rapida, lenta in distintas:
+        print(f"DISTINTA {ruta} página {indice + 1}:\n  {args.backend}: {rapida}\n  {backend_referencia}: {lenta}")
+    print(f"{len(distintas)} páginas con filas distintas")
+    if distintas:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
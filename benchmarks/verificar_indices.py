@@ -0,0 +1,126 @@
+"""Chequeo de regresión con EXPLAIN para las consultas del dashboard.
+
+Falla (código de salida 1) si alguna consulta de dashboard/consultas.py deja
+de usar su índice (el cubriente por periodo para tabla completa y rangos, la
+clave única cuando se filtran categorías) o si vuelve a ordenar en la base
+(filesort / temp b-tree). Funciona con MySQL/MariaDB y con SQLite.
+
+Si la base ya migró a la tabla larga (migraciones/004_tarifa_valor.sql),
+tarifa y tarifa_nivel son vistas: se revisa la tabla base de la vista
+(tarifa_valor con alias a), que debe usar el índice por periodo o la clave
+primaria, y en MySQL/MariaDB que los rangos de periodos lean solo las
+particiones de sus años.
+
+Uso (desde la raíz del repositorio, después de correr la migración en una
+copia local de la base):
+    python benchmarks/verificar_indices.py --env local.env
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dashboard"))
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, inspect
+
+from consultas import indices, indices_categoria, query_tabla, sentencia
+from tarifas.valores import tabla_valores
+
+# Con la tabla larga: alias de tarifa_valor en las vistas y los índices que debe usar
+alias_valores = "a"
+indice_valores = f"idx_{tabla_valores}_periodo"
+indice_valores_categoria = "PRIMARY"
+
+# Variantes de cada consulta: sin filtros, con rango y con el filtro completo de la barra lateral
+variantes = {
+    "": ({}, {}),
+    " (rango)": ({"rango": True}, {"desde": 202001, "hasta": 202312}),
+    " (filtro)": ({"rango": True, "por_categoria": True}, {"desde": 202001, "hasta": 202312, "ids": [18, 20, 22]}),
+}
+
+
+def particiones_rango(parametros):
+    """Particiones de tarifa_valor que debe leer una consulta con :desde y :hasta (None si no tiene rango)."""
+    if "desde" not in parametros:
+        return None
+    return {f"p{anio}" for anio in range(parametros["desde"] // 100, parametros["hasta"] // 100 + 1)}
+
+
+def problemas_mysql(conexion, tabla, consulta, parametros, indice, cubriente, particiones=None):
+    problemas = []
+    # MariaDB solo muestra las particiones con EXPLAIN PARTITIONS; MySQL 8 ya no lo acepta
+    explain = "EXPLAIN PARTITIONS " if particiones and getattr(conexion.dialect, "is_mariadb", False) else "EXPLAIN "
+    for fila in conexion.execute(sentencia(explain + consulta), parametros).mappings():
+        fila = {clave.lower(): valor for clave, valor in fila.items()}
+        if fila["table"] != tabla:
+            continue
+        extra = fila.get("extra") or ""
+        if fila["key"] != indice:
+            problemas.append(f"usa el índice {fila['key']!r} en vez de {indice!r}")
+        if cubriente and "Using index" not in extra:
+            problemas.append("lee la tabla además del índice (falta 'Using index')")
+        if "filesort" in extra:
+            problemas.append("ordena con filesort")
+        leidas = set((fila.get("partitions") or "").split(",")) - {""}
+        if particiones and leidas - particiones:
+            problemas.append(f"lee particiones fuera del rango: {', '.join(sorted(leidas - particiones))}")
+    return problemas
+
+
+def problemas_sqlite(conexion, tabla, consulta, parametros, indice, cubriente, particiones=None):
+    # SQLite no tiene particiones; se revisa solo el índice
+    detalles = [fila[-1] for fila in conexion.execute(sentencia("EXPLAIN QUERY PLAN " + consulta), parametros)]
+    problemas = []
+    indice = "PRIMARY KEY" if indice == "PRIMARY" else f"INDEX {indice}"
+    esperado = f"{'COVERING ' if cubriente else ''}{indice} "
+    propios = [detalle for detalle in detalles if detalle.startswith((f"SEARCH {tabla} ", f"SCAN {tabla} "))]
+    if not any(esperado in detalle + " " for detalle in propios):
+        problemas.append(f"no usa el índice {indice}: {detalles}")
+    if any("TEMP B-TREE" in detalle for detalle in detalles):
+        problemas.append("ordena con un b-tree temporal")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Revisa con EXPLAIN que las consultas usen los índices por periodo.")
+    parser.add_argument("--env", required=True,
+                        help="Archivo .env con DATABASE_URL de la base a revisar (sin valor por defecto: "
+                             "dashboard/.env es la base del dashboard en producción)")
+    args = parser.parse_args()
+
+    load_dotenv(args.env)
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit(f"DATABASE_URL no está configurado en {args.env}")
+
+    engine = create_engine(database_url)
+    revisar = problemas_sqlite if engine.dialect.name == "sqlite" else problemas_mysql
+    largo = inspect(engine).has_table(tabla_valores)
+    fallas = 0
+    with engine.connect() as conexion:
+        for tabla in indices:
+            for sufijo, (opciones, parametros) in variantes.items():
+                por_categoria = opciones.get("por_categoria", False)
+                if largo:
+                    indice = indice_valores_categoria if por_categoria else indice_valores
+                    problemas = revisar(conexion, alias_valores, query_tabla(tabla, **opciones), parametros,
+                                        indice, cubriente=not por_categoria,
+                                        particiones=particiones_rango(parametros))
+                else:
+                    indice = indices_categoria[tabla] if por_categoria else indices[tabla]
+                    problemas = revisar(conexion, tabla, query_tabla(tabla, **opciones), parametros,
+                                        indice, cubriente=not por_categoria)
+                nombre = tabla + sufijo
+                if problemas:
+                    fallas += 1
+                    for problema in problemas:
+                        print(f"FALLA {nombre}: {problema}")
+                else:
+                    print(f"ok    {nombre}: {indice}")
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import argparse
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from tarifas.carga import archivos_csv, cargar_csv, tamano_lote, tablas
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Carga tarifas_nivel1.csv y tarifas_nivel2-3-4.csv en las tablas tarifa y tarifa_nivel.")
+    parser.add_argument("--nivel1", default=archivos_csv[1], help="CSV de la tabla tarifa")
+    parser.add_argument("--nivel234", default=archivos_csv[2], help="CSV de la tabla tarifa_nivel")
+    parser.add_argument("--metodo", choices=["executemany", "load_data"], default="executemany",
+                        help="load_data usa LOAD DATA LOCAL INFILE (solo MySQL)")
+    parser.add_argument("--lote", type=int, default=tamano_lote, help="Filas por executemany")
+    parser.add_argument("--env", required=True,
+                        help="Archivo .env con DATABASE_URL de la base a cargar (sin valor por defecto: "
+                             "dashboard/.env es la base del dashboard en producción)")
+    args = parser.parse_args()
+
+    load_dotenv(args.env)
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit(f"DATABASE_URL no está configurado en {args.env}")
+
+    connect_args = {"allow_local_infile": True} if args.metodo == "load_data" else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    estadisticas = cargar_csv(engine, {1: args.nivel1, 2: args.nivel234}, args.metodo, args.lote)
+
+    for tabla in tablas.values():
+        datos = estadisticas[tabla]
+        filas_por_segundo = datos["insertadas"] / datos["segundos"] if datos["segundos"] else 0
+        print(f"{tabla}: {datos['insertadas']} filas en {datos['segundos']:.2f} s "
+              f"({filas_por_segundo:,.0f} filas/s), {datos['descartadas']} descartadas, "
+              f"{datos['repetidas']} repetidas (queda la primera)")
+    if estadisticas["acumulados"]:
+        print(f"Acumulados recalculados en {estadisticas['acumulados_segundos']:.2f} s")
+    else:
+        print("Sin tablas de acumulados (migraciones/002_acumulados.sql): no se recalcularon")
+    print(f"Total: {estadisticas['total_segundos']:.2f} s en una transacción")
+
+
+if __name__ == "__main__":
+    main()
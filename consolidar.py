@@ -0,0 +1,45 @@
+import csv
+import argparse
+from tarifas.consolidado import consolidar, fuentes_por_defecto, hilos_por_defecto, lector_por_defecto, lectores, resumen
+from tarifas.extraccion import encabezados
+
+# Archivos CSV consolidados de cada conjunto de filas
+csv_nivel1 = "tarifas_consolidadas_nivel1.csv"
+csv_nivel234 = "tarifas_consolidadas_nivel2-3-4.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Une los CSV mensuales (2014/ ... 2024/) y los consolidados en un CSV por conjunto, "
+                    "sin repetidas y ordenado por periodo.")
+    parser.add_argument("--raiz", default="", help="Carpeta con 2014/ ... 2024/ y los CSV consolidados")
+    parser.add_argument("--hilos", type=int, default=hilos_por_defecto, help="Archivos que se leen a la vez")
+    parser.add_argument("--lector", choices=lectores, default=lector_por_defecto,
+                        help="Lector de CSV (arrow requiere pyarrow)")
+    parser.add_argument("--nivel1", default=csv_nivel1, help="CSV de salida de las tarifas de Nivel I")
+    parser.add_argument("--nivel234", default=csv_nivel234, help="CSV de salida de las tarifas de Niveles II-IV")
+    parser.add_argument("--conflictos", action="store_true",
+                        help="Listar las filas repetidas con otros valores que se descartaron")
+    args = parser.parse_args()
+
+    estadisticas = {}
+    try:
+        filas = consolidar(fuentes_por_defecto(args.raiz), args.hilos, args.lector, estadisticas)
+    except ValueError as error:
+        raise SystemExit(str(error))
+
+    for conjunto, ruta in ((1, args.nivel1), (2, args.nivel234)):
+        with open(ruta, mode="w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(encabezados[conjunto])
+            escritor.writerows(filas[conjunto])
+
+    print(resumen(estadisticas))
+    print(f"{len(filas[1])} filas en {args.nivel1}, {len(filas[2])} filas en {args.nivel234}")
+    if args.conflictos:
+        for conjunto, categoria, periodo, ruta in estadisticas["conflictos"]:
+            print(f"CONFLICTO {periodo} {categoria}: se descartó la fila de {ruta}")
+
+
+if __name__ == "__main__":
+    main()
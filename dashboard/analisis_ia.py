@@ -0,0 +1,261 @@
+"""Análisis con IA de los datos del dashboard, resumidos, en segundo plano y guardados.
+
+En vez de mandar el DataFrame completo como CSV, resumir() lo reduce a un
+resumen estadístico en JSON (por columna, por categoría y una serie de
+promedios con a lo sumo `max_puntos` puntos): el tamaño del prompt ya no
+crece con el número de filas.
+
+ServicioAnalisis hace las llamadas al modelo en un pool de `hilos` hilos
+(el límite de llamadas simultáneas), así el script de Streamlit no se queda
+bloqueado, y guarda cada respuesta en memoria y en disco con el hash de
+(resumen, prompt, modelo). Los errores no se guardan: el siguiente clic
+vuelve a intentar.
+
+Backends: "gemini" (google-generativeai, se importa al primer uso) y
+"falso", que responde localmente sin red para pruebas y desarrollo.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Carpeta por defecto de los análisis guardados (relativa al directorio de trabajo)
+directorio_analisis = ".cache_analisis"
+
+# Cambiarla invalida los análisis guardados (por ejemplo, si cambia el formato del resumen)
+version_analisis = 1
+
+modelo_por_defecto = "gemini-1.5-flash"
+
+
+def _numero(valor):
+    return None if pd.isna(valor) else round(float(valor), 2)
+
+
+def _estadisticas(valores):
+    valores = valores.dropna()
+    if valores.empty:
+        return {"n": 0}
+    return {
+        "n": int(len(valores)),
+        "promedio": _numero(valores.mean()),
+        "desv_est": _numero(valores.std()),
+        "minimo": _numero(valores.min()),
+        "p25": _numero(valores.quantile(0.25)),
+        "mediana": _numero(valores.median()),
+        "p75": _numero(valores.quantile(0.75)),
+        "maximo": _numero(valores.max()),
+    }
+
+
+def resumir(df, max_puntos=36):
+    """Resumen estadístico de df en JSON; su tamaño no depende del número de filas."""
+    columnas_fecha = [columna for columna in df.columns if pd.api.types.is_datetime64_any_dtype(df[columna])]
+    numericas = list(df.select_dtypes("floating").columns)
+    fecha = columnas_fecha[0] if columnas_fecha else None
+    if fecha is not None:
+        df = df.sort_values(fecha, kind="stable")
+
+    resumen = {"filas": int(len(df)), "columnas": {c: _estadisticas(df[c]) for c in numericas}}
+    if fecha is not None and not df.empty:
+        resumen["desde"] = df[fecha].min().strftime("%Y-%m")
+        resumen["hasta"] = df[fecha].max().strftime("%Y-%m")
+
+    if "categoria_nombre" in df:
+        por_categoria = {}
+        for categoria, grupo in df.groupby("categoria_nombre", observed=True):
+            por_categoria[str(categoria)] = {}
+            for columna in numericas:
+                valores = grupo[columna].dropna()
+                estadisticas = _estadisticas(valores)
+                if fecha is not None and not valores.empty and valores.iloc[0] != 0:
+                    estadisticas["inicial"] = _numero(valores.iloc[0])
+                    estadisticas["final"] = _numero(valores.iloc[-1])
+                    estadisticas["variacion_pct"] = _numero((valores.iloc[-1] / valores.iloc[0] - 1) * 100)
+                por_categoria[str(categoria)][columna] = estadisticas
+        resumen["por_categoria"] = por_categoria
+
+    if fecha is not None and numericas and not df.empty:
+        serie = df.groupby(fecha)[numericas].mean()
+        # Promedio mensual; si son demasiados meses, trimestral o anual
+        for frecuencia in ("M", "Q", "Y"):
+            agrupada = serie.groupby(serie.index.to_period(frecuencia)).mean()
+            if len(agrupada) <= max_puntos:
+                break
+        resumen["serie_promedio"] = {
+            str(periodo): {c: _numero(v) for c, v in fila.items()} for periodo, fila in agrupada.iterrows()
+        }
+        if serie.index.nunique() >= 24:
+            estacional = serie.groupby(serie.index.month).mean()
+            resumen["promedio_por_mes"] = {int(m): {c: _numero(v) for c, v in fila.items()}
+                                           for m, fila in estacional.iterrows()}
+
+    if len(numericas) > 1:
+        correlaciones = df[numericas].corr()
+        resumen["correlaciones"] = {c: {o: _numero(v) for o, v in fila.items()} for c, fila in correlaciones.iterrows()}
+
+    return json.dumps(resumen, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def clave_analisis(resumen, prompt, modelo):
+    """Hash SHA-256 del resumen, el prompt y el modelo."""
+    h = hashlib.sha256(f"{version_analisis}|{modelo}|{prompt}".encode("utf-8"))
+    h.update(resumen.encode("utf-8"))
+    return h.hexdigest()
+
+
+def armar_prompt(prompt, resumen):
+    return f"{prompt}\n\nResumen estadístico de los datos (JSON; precios en COP):\n{resumen}"
+
+
+class BackendGemini:
+    def __init__(self, api_key):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+
+    def generar(self, prompt, modelo):
+        return self._genai.GenerativeModel(modelo).generate_content(prompt).text
+
+
+class BackendFalso:
+    """Responde sin red: texto fijo con el tamaño del prompt, tras `demora` segundos."""
+
+    def __init__(self, demora=0.0):
+        self.demora = demora
+        self.llamadas = 0
+        self.simultaneas = 0
+        self.max_simultaneas = 0
+        self._lock = threading.Lock()
+
+    def generar(self, prompt, modelo):
+        with self._lock:
+            self.llamadas += 1
+            self.simultaneas += 1
+            self.max_simultaneas = max(self.max_simultaneas, self.simultaneas)
+        try:
+            time.sleep(self.demora)
+            primera_linea = prompt.splitlines()[0] if prompt else ""
+            return (f"**Análisis de prueba ({modelo})**\n\n"
+                    f"- Solicitud: {primera_linea[:120]}\n"
+                    f"- Tamaño del prompt: {len(prompt):,} caracteres")
+        finally:
+            with self._lock:
+                self.simultaneas -= 1
+
+
+def crear_backend(nombre, api_key=None):
+    if nombre == "gemini":
+        return BackendGemini(api_key)
+    if nombre == "falso":
+        return BackendFalso()
+    raise ValueError(f"Backend de IA desconocido: {nombre}")
+
+
+class ServicioAnalisis:
+    """Análisis por clave, en memoria y en disco, calculados en un pool con límite de hilos."""
+
+    def __init__(self, backend, directorio=directorio_analisis, hilos=2):
+        self.backend = backend
+        self.directorio = directorio
+        self.hilos = hilos
+        self.aciertos = 0
+        self.llamadas = 0
+        self._memoria = {}
+        self._pendientes = {}
+        self._errores = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta_entrada(self, clave):
+        return os.path.join(self.directorio, f"{clave}.json")
+
+    def obtener(self, clave):
+        """Texto guardado para la clave, o None."""
+        with self._lock:
+            if clave in self._memoria:
+                return self._memoria[clave]
+        try:
+            with open(self._ruta_entrada(clave), encoding="utf-8") as archivo:
+                texto = json.load(archivo)["texto"]
+        except (OSError, ValueError, KeyError):
+            return None
+        with self._lock:
+            self._memoria[clave] = texto
+        return texto
+
+    def _guardar(self, clave, modelo, prompt, texto):
+        """Guarda la respuesta de forma atómica (archivo temporal + rename)."""
+        entrada = {"modelo": modelo, "prompt": prompt, "texto": texto}
+        ruta_entrada = self._ruta_entrada(clave)
+        temporal = f"{ruta_entrada}.{threading.get_ident()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(entrada, archivo, ensure_ascii=False)
+        os.replace(temporal, ruta_entrada)
+        with self._lock:
+            self._memoria[clave] = texto
+
+    def _llamar(self, clave, prompt_completo, modelo, prompt):
+        texto = self.backend.generar(prompt_completo, modelo)
+        with self._lock:
+            self.llamadas += 1
+        self._guardar(clave, modelo, prompt, texto)
+        return texto
+
+    def solicitar(self, datos, prompt, modelo=modelo_por_defecto):
+        """Encola el análisis de datos (DataFrame) y devuelve su clave; no espera la respuesta."""
+        resumen = resumir(datos)
+        clave = clave_analisis(resumen, prompt, modelo)
+        if self.obtener(clave) is not None:
+            with self._lock:
+                self.aciertos += 1
+            return clave
+        with self._lock:
+            self._errores.pop(clave, None)
+            if clave in self._pendientes:
+                return clave
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="analisis_ia")
+            futuro = self._pool.submit(self._llamar, clave, armar_prompt(prompt, resumen), modelo, prompt)
+            self._pendientes[clave] = futuro
+        futuro.add_done_callback(lambda futuro, clave=clave: self._terminar(clave, futuro))
+        return clave
+
+    def _terminar(self, clave, futuro):
+        with self._lock:
+            self._pendientes.pop(clave, None)
+            if futuro.exception() is not None:
+                self._errores[clave] = str(futuro.exception())
+
+    def estado(self, clave):
+        """("listo", texto), ("pendiente", None) o ("error", mensaje)."""
+        texto = self.obtener(clave)
+        if texto is not None:
+            return "listo", texto
+        with self._lock:
+            if clave in self._pendientes:
+                return "pendiente", None
+            if clave in self._errores:
+                return "error", self._errores[clave]
+        return "error", "El análisis no está disponible; vuelve a generarlo."
+
+    def esperar(self, clave, segundos=None):
+        """Espera la respuesta hasta `segundos` (o sin límite) y devuelve estado()."""
+        with self._lock:
+            futuro = self._pendientes.get(clave)
+        if futuro is not None:
+            try:
+                futuro.result(timeout=segundos)
+            except Exception:
+                pass
+        return self.estado(clave)
+
+    def pendientes(self):
+        with self._lock:
+            return len(self._pendientes)
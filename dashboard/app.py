@@ -6,15 +6,24 @@ import plotly.graph_objects as go
 import locale
 import os
 from plotly.subplots import make_subplots
-from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 import plotly.figure_factory as ff
 from datetime import datetime, timedelta
-from prophet import Prophet
 from dotenv import load_dotenv
-import google.generativeai as genai
-from google.api_core import exceptions
-import json
+import hmac
+from functools import partial
+from consultas import (estadisticas_filas, estadisticas_rango, leer_filtrado, leer_pronosticos, leer_resumen,
+                       periodo_de_fecha, periodo_maximo, promedios_anuales, promedios_anuales_filas,
+                       resumen_estadisticas)
+from atipicos import mascara_atipicos, modos as modos_atipicos
+from pronosticos import CachePronosticos, directorio_pronosticos, maximo_memoria
+from pronosticos_lote import metodos as metodos_pronostico, pronostico_base
+from instantanea import Instantanea, version_archivo
+from datos_compartidos import DatosCompartidos, ttl_datos
+from analisis_ia import ServicioAnalisis, crear_backend, directorio_analisis
+from esquema import compactar, precios_float64
+from tiempos import medir
+from base_datos import BaseDatos
 
 #Sagy
 
@@ -47,43 +56,47 @@ st.markdown("""
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
 
-# Función para llamar a IA
-@st.cache_data
-def call_ia_model(data, prompt, model_name="gemini-1.5-flash"):
-    try:
-        # Convertir datos a string
-        if isinstance(data, pd.DataFrame):
-            data_str = data.to_csv(index=False)
-        elif isinstance(data, dict):
-            data_str = json.dumps(data, ensure_ascii=False)
+# Análisis con IA: resumen estadístico de los datos, llamada al modelo en segundo plano y
+# respuesta guardada en disco (ver analisis_ia.py). IA_BACKEND=falso responde sin red
+@st.cache_resource
+def init_analisis():
+    backend = crear_backend(os.getenv("IA_BACKEND", "gemini"), GEMINI_API_KEY)
+    return ServicioAnalisis(backend, os.getenv("DIRECTORIO_ANALISIS", directorio_analisis),
+                            hilos=int(os.getenv("HILOS_IA", "2")))
+
+# Muestra el análisis cuando esté listo: mientras tanto solo se vuelve a ejecutar este
+# fragmento, y cualquier otra interacción con el dashboard lo interrumpe sin esperar al modelo
+@st.fragment
+def mostrar_analisis(clave, titulo):
+    servicio = init_analisis()
+    with st.spinner("Analizando datos con IA..."):
+        estado, texto = servicio.esperar(clave, 1)
+    if estado == "pendiente":
+        st.rerun(scope="fragment")
+    if estado == "error":
+        st.error(f"Tenemos un error al procesar su solicitud: {texto}")
+    else:
+        with st.expander(titulo):
+            st.markdown(texto)
+
+def seccion_ia(boton, titulo, datos, prompt, ayuda):
+    if st.button(boton):
+        try:
+            clave = init_analisis().solicitar(datos, prompt)
+        except Exception as e:
+            st.error(f"Tenemos un error al procesar su solicitud: {e}")
         else:
-            data_str = str(data)
-        
-        full_prompt = f"{prompt}\n\nData:\n{data_str}"
-        model = genai.GenerativeModel(model_name)
-        response = model.generate_content(full_prompt)
-        return response.text
-    
-    except exceptions.GoogleAPIError as e:
-        return f"Error calling Gemini API: {str(e)}"
-    except Exception as e:
-        return f"Unexpected error: {str(e)}"
+            mostrar_analisis(clave, titulo)
+    else:
+        st.write(ayuda)
 
-# Conexión a la base de datos
+# Conexión a la base de datos: pool, réplica de lectura y métricas de las consultas
+# (ver base_datos.py). El pre-ping del pool reemplaza la conexión de prueba
 @st.cache_resource
-def init_connection():
+def init_base():
     try:
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            raise ValueError("DATABASE_URL no está configurado en el archivo .env")
-        
-        # Intentar crear la conexión
-        engine = create_engine(database_url)
-        connection = engine.connect()
-        connection.close()
-        return engine
+        return BaseDatos.desde_entorno()
 
     except ValueError as ve:
         st.error(f"⚠️ Error de configuración: {ve}")
@@ -94,6 +107,11 @@ def init_connection():
 
     return None
 
+# El dashboard solo lee: engine de la réplica si DATABASE_URL_LECTURA está configurada
+def init_connection():
+    base = init_base()
+    return None if base is None else base.lectura
+
 # Función para cargar datos
 # @st.cache_data
 # def load_data():
@@ -128,42 +146,113 @@ def init_connection():
     
 #     return df_tarifas, df_niveles
 
-@st.cache_data
-def load_data():
+# Consultas filtradas que se guardan en caché (las más viejas salen primero)
+MAX_CONSULTAS_CACHE = 32
+
+# Datos de solo lectura compartidos por todas las sesiones (ver datos_compartidos.py): el
+# resumen de la barra lateral y la versión de los datos, revisada cada TTL_DATOS segundos.
+# Modo sin base de datos: con INSTANTANEA=<carpeta> (ver exportar_instantanea.py) se comparte
+# la instantánea Arrow abierta con memory map y no se usa DATABASE_URL
+TTL_DATOS = int(os.getenv("TTL_DATOS", ttl_datos))
+
+@st.cache_resource
+def init_datos():
+    directorio = os.getenv("INSTANTANEA")
+    if directorio:
+        return DatosCompartidos(lambda: Instantanea.abrir(directorio), lambda: version_archivo(directorio), TTL_DATOS)
+
     engine = init_connection()
-    
     if engine is None:
-        return None, None
+        return None
+
+    def version():
+        with engine.connect() as conexion:
+            return periodo_maximo(conexion)
+
+    return DatosCompartidos(lambda: leer_resumen(engine), version, TTL_DATOS)
+
+# Columnas de valores de la tabla tarifa
+PROPIEDADES = ["propiedad_epm", "propiedad_compartido", "propiedad_cliente"]
+
+def load_resumen():
+    """Categorías y rango de fechas para la barra lateral, sin traer las tarifas."""
+    datos = init_datos()
+    
+    if datos is None:
+        return None
     
     try:
-        query_tarifas = """
-        SELECT t.*, c.nombre as categoria_nombre 
-        FROM tarifa t 
-        JOIN categoria c ON t.id_categoria = c.id_categoria
-        ORDER BY t.periodo, c.nombre
-        """
-
-        query_niveles = """
-        SELECT tn.*, c.nombre as categoria_nombre 
-        FROM tarifa_nivel tn 
-        JOIN categoria c ON tn.id_categoria = c.id_categoria
-        ORDER BY tn.periodo, c.nombre
-        """
-
-        df_tarifas = pd.read_sql(query_tarifas, engine)
-        df_niveles = pd.read_sql(query_niveles, engine)
-
-        df_tarifas['fecha'] = pd.to_datetime(df_tarifas['periodo'].astype(str), format='%Y%m')
-        df_niveles['fecha'] = pd.to_datetime(df_niveles['periodo'].astype(str), format='%Y%m')
-
-        df_tarifas['categoria_nombre'] = df_tarifas['categoria_nombre'].str.replace('ESPD*', 'ESPD', regex=False)
-        df_niveles['categoria_nombre'] = df_niveles['categoria_nombre'].str.replace('ESPD*', 'ESPD', regex=False)
-        
-        return df_tarifas, df_niveles
+        resumen = datos.actual()
+        if isinstance(resumen, Instantanea):
+            resumen = resumen.resumen()
+        nombres = resumen["nombres"]
+        # Nombre -> ids (ESPD* y ESPD se muestran igual)
+        ids_por_nombre = {}
+        for id_categoria in resumen["ids"]:
+            ids_por_nombre.setdefault(nombres[id_categoria], []).append(id_categoria)
+        return {
+            "nombres": nombres,
+            "ids_por_nombre": ids_por_nombre,
+            "fecha_min": pd.to_datetime(str(resumen["periodo_min"]), format='%Y%m'),
+            "fecha_max": pd.to_datetime(str(resumen["periodo_max"]), format='%Y%m'),
+        }
 
     except Exception:
         st.error("⚠️ Error al cargar los datos. Por favor, verifica la conexión a la base de datos.")
-        return None, None
+        return None
+
+# Función para cargar solo las filas del filtro; la clave es (categorías, rango de periodos) y la
+# versión de los datos. No incluye el tipo de propiedad: el resultado trae las tres y cambiarla
+# no vuelve a consultar
+@st.cache_data(max_entries=MAX_CONSULTAS_CACHE)
+def load_data(categorias, desde, hasta, version):
+    resumen = load_resumen()
+    if resumen is None:
+        return None
+    ids = ids_seleccionados(resumen, categorias)
+    
+    try:
+        if os.getenv("INSTANTANEA"):
+            df = init_datos().actual().leer_filtrado("tarifa", ids, desde, hasta)
+        else:
+            engine = init_connection()
+            if engine is None:
+                return None
+            with engine.connect() as conexion:
+                df = leer_filtrado(conexion, "tarifa", resumen["nombres"], ids, desde, hasta)
+    except Exception:
+        st.error("⚠️ Error al cargar los datos. Por favor, verifica la conexión a la base de datos.")
+        return None
+    # Tipos compactos y año/mes una sola vez por consulta (ver esquema.py)
+    return compactar(df, PROPIEDADES)
+
+def ids_seleccionados(resumen, categorias):
+    return [id_categoria for nombre in categorias for id_categoria in resumen["ids_por_nombre"].get(nombre, [])]
+
+# Estadísticas por categoría y promedios anuales desde las tablas de acumulados
+# (tarifas/agregados.py); None si la base todavía no las tiene o se usa la instantánea.
+# La versión de los datos compartidos va en la clave para no servir resultados viejos
+@st.cache_data(max_entries=MAX_CONSULTAS_CACHE)
+def load_estadisticas(categorias, desde, hasta, version):
+    if os.getenv("INSTANTANEA"):
+        return None
+    
+    engine = init_connection()
+    resumen = load_resumen()
+    
+    if engine is None or resumen is None:
+        return None
+    
+    ids = ids_seleccionados(resumen, categorias)
+    try:
+        with engine.connect() as conexion:
+            estadisticas = estadisticas_rango(conexion, "tarifa", resumen["nombres"], ids, desde, hasta)
+            if estadisticas is None:
+                return None
+            return estadisticas, promedios_anuales(conexion, "tarifa", resumen["nombres"], ids, desde, hasta)
+
+    except (SQLAlchemyError, pd.errors.DatabaseError):
+        return None
 
 # Función para generar análisis automático
 # def generar_insights(df, tipo_propiedad):
@@ -208,9 +297,7 @@ def generar_insights(df, tipo_propiedad):
                    f"(coeficiente: {valor_correlacion:.2f}), indicando que sus tarifas tienden a moverse juntas.")
     
     # 3. Detección de valores atípicos
-    Q1, Q3 = df[tipo_propiedad].quantile([0.25, 0.75])
-    IQR = Q3 - Q1
-    outliers = df[(df[tipo_propiedad] < (Q1 - 1.5 * IQR)) | (df[tipo_propiedad] > (Q3 + 1.5 * IQR))]
+    outliers = df[mascara_atipicos(df, [tipo_propiedad], por=None)[tipo_propiedad]]
     if not outliers.empty:
         fecha_max_outlier = outliers['fecha'].dt.strftime('%b %Y').iloc[0]
         insights.append(f"Se han detectado {len(outliers)} valores atípicos en las tarifas, "
@@ -227,7 +314,7 @@ def generar_insights(df, tipo_propiedad):
             insights.append(f"El mes con mayor disminución fue {mes_max_variacion} con una variación de {valor_max_variacion:.2f}%.")
     
     # 5. Categoría más volátil
-    volatilidad = df.groupby('categoria_nombre')[tipo_propiedad].std()
+    volatilidad = df.groupby('categoria_nombre', observed=True)[tipo_propiedad].std()
     if not volatilidad.empty:
         categoria_volatil = volatilidad.idxmax()
         valor_volatilidad = volatilidad.max()
@@ -235,7 +322,6 @@ def generar_insights(df, tipo_propiedad):
                        f"con una desviación estándar de {valor_volatilidad:,.2f} COP.")
     
     # 6. Tendencia anual
-    df['año'] = df['fecha'].dt.year
     tendencia_anual = df.groupby('año')[tipo_propiedad].mean().pct_change().mean() * 100
     if tendencia_anual > 0:
         insights.append(f"La tendencia anual promedio muestra un aumento del {tendencia_anual:.2f}% por año.")
@@ -252,44 +338,111 @@ def generar_insights(df, tipo_propiedad):
     
     return insights
 
-# Función para predecir tarifas futuras
+# Pronósticos guardados por serie, compartidos entre sesiones (ver pronosticos.py)
+@st.cache_resource
+def init_pronosticos():
+    return CachePronosticos(os.getenv("DIRECTORIO_PRONOSTICOS", directorio_pronosticos),
+                            maximo=int(os.getenv("MAX_PRONOSTICOS_MEMORIA", maximo_memoria)))
+
+# Prophet de una serie (una categoría y una propiedad); solo ajusta si no está guardada
 def predecir_tarifas(df, tipo_propiedad):
-    df_pred = df[['fecha', tipo_propiedad]].rename(columns={'fecha': 'ds', tipo_propiedad: 'y'})
-    modelo = Prophet()
-    modelo.fit(df_pred)
-    futuro = modelo.make_future_dataframe(periods=6, freq='ME')
-    prediccion = modelo.predict(futuro)
-    return prediccion
-
-# Función para detectar outliers
-def detectar_outliers(data):
-    Q1 = data.quantile(0.25)
-    Q3 = data.quantile(0.75)
-    IQR = Q3 - Q1
-    outliers = data[(data < (Q1 - 1.5 * IQR)) | (data > (Q3 + 1.5 * IQR))]
-    return outliers.index
+    return init_pronosticos().pronosticar(df, tipo_propiedad)
+
+# Encola en segundo plano el Prophet de cada categoría seleccionada en las tres propiedades,
+# por si se refina; una vez por filtro y versión de los datos en cada sesión, así los reruns
+# con la misma selección no vuelven a hashear las series
+def precalcular_pronosticos(df, filtro):
+    firma = (filtro, init_datos().version)
+    if st.session_state.get("pronosticos_precalculados") == firma:
+        return 0
+    st.session_state["pronosticos_precalculados"] = firma
+    series = [(df_categoria, propiedad)
+              for _, df_categoria in df.groupby('categoria_nombre', observed=True) for propiedad in PROPIEDADES]
+    return init_pronosticos().precalcular(series)
+
+# Pronósticos guardados por pronosticar.py (tabla pronostico); None sin la tabla o con la instantánea
+@st.cache_data(max_entries=MAX_CONSULTAS_CACHE, ttl=TTL_DATOS)
+def load_pronosticos(categorias, propiedad, version):
+    if os.getenv("INSTANTANEA"):
+        return None
+    
+    engine = init_connection()
+    resumen = load_resumen()
+    
+    if engine is None or resumen is None:
+        return None
+    
+    try:
+        with engine.connect() as conexion:
+            return leer_pronosticos(conexion, resumen["nombres"], ids_seleccionados(resumen, categorias), propiedad)
+    except (SQLAlchemyError, pd.errors.DatabaseError):
+        return None
+
+# Pronóstico por categoría de la selección: de la tabla si el rango (filtro, como el de
+# load_data) llega al último periodo (Prophet si está, si no el método base); las demás
+# categorías, o todas si el rango termina antes, con el método base al momento sobre las
+# filas filtradas, o con Prophet si se pide refinar
+def pronosticos_seleccion(df_filtrado, tipo_propiedad, refinar, filtro):
+    categorias, _, hasta = filtro
+    resumen = load_resumen()
+    nombres = resumen["nombres"]
+    partes = []
+    guardados = None
+    if hasta >= resumen["fecha_max"].year * 100 + resumen["fecha_max"].month:
+        guardados = load_pronosticos(categorias, tipo_propiedad, init_datos().version)
+    if guardados is not None and not guardados.empty:
+        con_prophet = guardados.loc[guardados['metodo'] == 'prophet', 'id_categoria'].unique()
+        partes.append(guardados[(guardados['metodo'] == 'prophet') | ~guardados['id_categoria'].isin(con_prophet)])
+        df_filtrado = df_filtrado[~df_filtrado['id_categoria'].isin(guardados['id_categoria'].unique())]
+
+    if refinar:
+        for _, df_categoria in df_filtrado.groupby('categoria_nombre', observed=True):
+            if len(df_categoria) < 2:
+                continue
+            prediccion = predecir_tarifas(df_categoria, tipo_propiedad)
+            futura = prediccion[prediccion['ds'] > df_categoria['fecha'].max()]
+            partes.append(pd.DataFrame({
+                'metodo': 'prophet',
+                'id_categoria': int(df_categoria['id_categoria'].iloc[-1]),
+                'fecha': futura['ds'].to_numpy(),
+                'yhat': futura['yhat'].to_numpy(),
+                'yhat_inferior': futura['yhat_lower'].to_numpy(),
+                'yhat_superior': futura['yhat_upper'].to_numpy(),
+            }))
+    elif not df_filtrado.empty:
+        base = pronostico_base(df_filtrado, [tipo_propiedad])
+        base['fecha'] = pd.to_datetime(base['periodo'].astype(str), format='%Y%m')
+        partes.append(base)
+
+    if not partes:
+        return pd.DataFrame(columns=['metodo', 'categoria_nombre', 'fecha', 'yhat', 'yhat_inferior', 'yhat_superior'])
+    pronosticos = pd.concat(partes, ignore_index=True)
+    pronosticos['categoria_nombre'] = pronosticos['id_categoria'].map(nombres)
+    pronosticos['metodo'] = pronosticos['metodo'].map(metodos_pronostico)
+    # ESPD* y ESPD se muestran con el mismo nombre: queda la serie con el id más reciente
+    pronosticos = pronosticos.sort_values(['id_categoria', 'fecha']).drop_duplicates(
+        ['categoria_nombre', 'fecha'], keep='last'
+    )
+    return pronosticos.sort_values(['categoria_nombre', 'fecha'], kind='stable', ignore_index=True)
 
 # Título principal con emoji
 st.title("⚡ Análisis de Tarifas Energéticas")
 st.markdown("---")
 
-# Cargar datos
-df_tarifas, df_niveles = load_data()
+# Cargar categorías y fechas disponibles
+resumen = load_resumen()
 
 # Verificar si los datos fueron cargados correctamente antes de continuar
-if df_tarifas is None or df_niveles is None:
+if resumen is None:
     st.error("⚠️ No se pudieron cargar los datos. Verifica la conexión a la base de datos.")
     st.stop()
 
-# Continuar solo si los datos están disponibles
-categorias = sorted(df_tarifas['categoria_nombre'].unique())
-
 # Sidebar para filtros
 with st.sidebar:
     st.header("🔍 Filtros")
     
     # Filtro de categorías
-    categorias = sorted(df_tarifas['categoria_nombre'].unique())
+    categorias = sorted(resumen["ids_por_nombre"])
     categoria_seleccionada = st.multiselect(
         "Seleccionar Categorías",
         options=categorias,
@@ -301,8 +454,8 @@ with st.sidebar:
     )
     
     # Filtro de fechas
-    fecha_min = df_tarifas['fecha'].min()
-    fecha_max = df_tarifas['fecha'].max()
+    fecha_min = resumen["fecha_min"]
+    fecha_max = resumen["fecha_max"]
     fecha_rango = st.date_input(
         "Rango de Fechas",
         value=(fecha_min.date(), fecha_max.date()),
@@ -317,29 +470,37 @@ with st.sidebar:
         format_func=lambda x: x.replace("propiedad_", "").title()
     )
 
-# Filtrar datos según selección
-df_filtrado = df_tarifas[
-    (df_tarifas['categoria_nombre'].isin(categoria_seleccionada)) &
-    (df_tarifas['fecha'] >= pd.to_datetime(fecha_rango[0])) &
-    (df_tarifas['fecha'] <= pd.to_datetime(fecha_rango[1]))
-]
+# Filtrar datos según selección (en la base, solo la ventana elegida)
+fecha_desde = fecha_rango[0]
+fecha_hasta = fecha_rango[1] if len(fecha_rango) > 1 else fecha_max.date()
+filtro = (
+    tuple(sorted(categoria_seleccionada)),
+    periodo_de_fecha(fecha_desde, inicio=True),
+    periodo_de_fecha(fecha_hasta, inicio=False)
+)
+df_filtrado = load_data(*filtro, init_datos().version)
+
+if df_filtrado is None:
+    st.error("⚠️ No se pudieron cargar los datos. Verifica la conexión a la base de datos.")
+    st.stop()
+
+# Precalcular predicciones en segundo plano (opcional, PRECALCULAR_PRONOSTICOS=1 en el .env)
+if os.getenv("PRECALCULAR_PRONOSTICOS") == "1" and not df_filtrado.empty:
+    precalcular_pronosticos(df_filtrado, filtro)
 
 # Verificar si hay datos filtrados
 if df_filtrado.empty:
     st.warning("Sin datos en el filtro, por favor selecciona una o varias categorías.")
-else:
-    # Crear pestañas
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "📈 Evolución Temporal",
-        "📊 Análisis Comparativo",
-        "📉 Tendencias",
-        "📑 Estadísticas",
-        "🤖 Análisis Inteligente",
-        "🔮 Predicción de Tarifas"
-    ])
-
-    # Pestaña 1: Evolución Temporal
-with tab1:
+    st.stop()
+
+# Estadísticas por categoría y promedios anuales: de los acumulados, o de las filas si no existen
+agregados = load_estadisticas(*filtro, init_datos().version)
+if agregados is None:
+    agregados = (estadisticas_filas(df_filtrado, "tarifa"), promedios_anuales_filas(df_filtrado, "tarifa"))
+estadisticas, promedios_anuales_categoria = agregados
+
+# Pestaña 1: Evolución Temporal
+def pestana_evolucion(df_filtrado, tipo_propiedad):
     st.header("Evolución de Tarifas en el Tiempo")
     
     # Gráfico de líneas temporal
@@ -368,39 +529,31 @@ with tab1:
     
     with col1:
         st.subheader("Variación Porcentual Tarifa")
-        df_var = df_filtrado.groupby('categoria_nombre')[tipo_propiedad].agg([
-            ('Inicial [$]', 'first'),
-            ('Final [$]', 'last'),
-            ('Variación [%]', lambda x: ((x.iloc[-1] - x.iloc[0]) / x.iloc[0] * 100))
-        ]).round(2)
+        df_var = resumen_estadisticas(estadisticas, tipo_propiedad)[
+            ['Inicial [$]', 'Final [$]', 'Variación [%]']
+        ].round(2)
         df_var = df_var.rename_axis('Categoría')
         st.dataframe(df_var, use_container_width=True)
     
     with col2:
         st.subheader("Estadísticas de Variación")
-        df_stats = df_filtrado.groupby('categoria_nombre')[tipo_propiedad].agg([
-            ('Promedio', 'mean'),
-            ('Mínimo', 'min'),
-            ('Máximo', 'max'),
-            ('Desv. Est.', 'std')
-        ]).round(2)
+        df_stats = resumen_estadisticas(estadisticas, tipo_propiedad)[
+            ['Promedio', 'Mínimo', 'Máximo', 'Desv. Est.']
+        ].round(2)
         df_stats = df_stats.rename_axis('Categoría')
-        st.dataframe(df_var, use_container_width=True)
+        st.dataframe(df_stats, use_container_width=True)
 
     # Análisis Temporal
     st.subheader("Análisis con Inteligencia Artificial")
-    if st.button("Generar Análisis con IA"):
-        with st.spinner("Analizando datos con IA..."):
-            data_to_send = df_filtrado[['fecha', tipo_propiedad, 'categoria_nombre']]
-            prompt = "Analiza la evolución temporal de las tarifas de energía en los datos proporcionados. Identifica las tendencias clave, los picos y las caídas a lo largo del tiempo. Responde siempre en español."
-            analysis = call_ia_model(data_to_send, prompt)
-            with st.expander("Ver análisis"):
-                st.markdown(analysis)
-    else:
-        st.write("Haz clic en el botón para generar el análisis.")
+    seccion_ia(
+        "Generar Análisis con IA", "Ver análisis",
+        df_filtrado[['fecha', tipo_propiedad, 'categoria_nombre']],
+        "Analiza la evolución temporal de las tarifas de energía en los datos proporcionados. Identifica las tendencias clave, los picos y las caídas a lo largo del tiempo. Responde siempre en español.",
+        "Haz clic en el botón para generar el análisis."
+    )
 
 # Pestaña 2: Análisis Comparativo
-with tab2:
+def pestana_comparativo(df_filtrado, tipo_propiedad):
     st.header("Comparación entre Tipos de Propiedad")
     
     # Gráfico de cajas
@@ -433,24 +586,18 @@ with tab2:
     st.plotly_chart(fig_corr, use_container_width=True)
 
     # Análisis Comparativo
-    if st.button("Generar Análisis Comparativo con IA"):
-        with st.spinner("Analizando datos con IA..."):
-            data_to_send = df_filtrado[propiedades + ['categoria_nombre']]
-            prompt = "Compara la distribución de las tarifas entre propiedad_epm, propiedad_compartido y propiedad_cliente en los datos proporcionados. Destaca diferencias, similitudes y cualquier patrón notable. Responde siempre en español."
-            analysis = call_ia_model(data_to_send, prompt)
-            with st.expander("Ver análisis comparativo"):
-                st.markdown(analysis)
-    else:
-        st.write("Haz clic en el botón para generar el análisis comparativo.")
+    seccion_ia(
+        "Generar Análisis Comparativo con IA", "Ver análisis comparativo",
+        df_filtrado[propiedades + ['categoria_nombre']],
+        "Compara la distribución de las tarifas entre propiedad_epm, propiedad_compartido y propiedad_cliente en los datos proporcionados. Destaca diferencias, similitudes y cualquier patrón notable. Responde siempre en español.",
+        "Haz clic en el botón para generar el análisis comparativo."
+    )
 
 # Pestaña 3: Tendencias
-with tab3:
+def pestana_tendencias(df_filtrado, tipo_propiedad):
     st.header("Análisis de Tendencias")
     
-    # Tendencia general
-    df_filtrado['año'] = df_filtrado['fecha'].dt.year
-    df_filtrado['mes'] = df_filtrado['fecha'].dt.month
-    
+    # Tendencia general (año y mes vienen calculados desde load_data)
     # Tendencia mensual promedio
     fig_tendencia = px.line(
         df_filtrado.groupby(['año', 'mes'])[tipo_propiedad].mean().reset_index(),
@@ -471,7 +618,7 @@ with tab3:
     
     with col1:
         st.subheader("Crecimiento Anual por Categoría")
-        df_crecimiento = df_filtrado.groupby(['año', 'categoria_nombre'])[tipo_propiedad].mean().unstack()
+        df_crecimiento = promedios_anuales_categoria[tipo_propiedad].unstack()
         df_crecimiento.columns = [f"{col} [$]" for col in df_crecimiento.columns]
         df_crecimiento = df_crecimiento.rename_axis('Categoría', axis=1)
         df_crecimiento = df_crecimiento.rename_axis('Año')
@@ -492,46 +639,41 @@ with tab3:
     st.plotly_chart(fig_heatmap)
 
     # Análisis de Tendencias
-    if st.button("Generar Análisis de Tendencias con IA"):
-        with st.spinner("Analizando datos con IA..."):
-            try:
-                data_to_send = df_filtrado[['fecha', 'año', 'mes', tipo_propiedad, 'categoria_nombre']]
-                prompt = "Analiza las tendencias en las tarifas de energía a lo largo del tiempo basándote en los datos proporcionados. Identifica patrones estacionales, cambios anuales y cualquier cambio significativo. Responde siempre en español."
-                analysis = call_ia_model(data_to_send, prompt)
-                with st.expander("Ver análisis de tendencias"):
-                    st.markdown(analysis)
-            except Exception:
-                st.error("Tenemos un error al procesar su solicitud. Limita la cantidad de datos.")
-    else:
-        st.write("Haz clic en el botón para generar el análisis de tendencias.")
+    seccion_ia(
+        "Generar Análisis de Tendencias con IA", "Ver análisis de tendencias",
+        df_filtrado[['fecha', tipo_propiedad, 'categoria_nombre']],
+        "Analiza las tendencias en las tarifas de energía a lo largo del tiempo basándote en los datos proporcionados. Identifica patrones estacionales, cambios anuales y cualquier cambio significativo. Responde siempre en español.",
+        "Haz clic en el botón para generar el análisis de tendencias."
+    )
 
 # Pestaña 4: Estadísticas
-with tab4:
+def pestana_estadisticas(df_filtrado, tipo_propiedad):
     st.header("Estadísticas Detalladas")
     
     # Resumen estadístico completo
     st.subheader("Resumen Estadístico por Categoría")
-    df_stats_completo = df_filtrado.groupby('categoria_nombre')[tipo_propiedad].describe()
+    # Cuartiles sobre los precios exactos (en float32 el redondeo puede mover un centavo)
+    df_stats_completo = precios_float64(df_filtrado[tipo_propiedad]).groupby(
+        df_filtrado['categoria_nombre'], observed=True
+    ).describe()
     df_stats_completo = df_stats_completo.rename_axis('Categoría')
     st.dataframe(df_stats_completo, use_container_width=True)
     
     # Análisis de outliers
     st.subheader("Detección de Valores Atípicos")
     
-    # Detectar índices de outliers agrupados por categoría
-    def get_outlier_indices(group):
-        return detectar_outliers(group[tipo_propiedad])
-    
-    # Aplicar la detección de outliers y obtener los índices
-    outliers_indices = df_filtrado.groupby('categoria_nombre', group_keys=False).apply(
-        get_outlier_indices, include_groups=False
+    modo_atipicos = st.selectbox(
+        "Método de detección",
+        list(modos_atipicos),
+        format_func=modos_atipicos.get,
+        help="Ventana móvil y MAD se adaptan mejor a historias largas donde el nivel de la tarifa cambia."
     )
     
-    # Aplanar la lista de índices
-    outlier_indices_list = []
-    for indices in outliers_indices:
-        if not indices.empty:
-            outlier_indices_list.extend(indices.tolist())
+    # Máscara de atípicos por categoría para las tres propiedades en una pasada
+    mascara = mascara_atipicos(df_filtrado, PROPIEDADES, modo=modo_atipicos)
+    outlier_indices_list = df_filtrado[mascara[tipo_propiedad]].sort_values(
+        'categoria_nombre', kind='stable'
+    ).index.tolist()
     
     if outlier_indices_list:
         outliers_df = df_filtrado.loc[outlier_indices_list, ['categoria_nombre', tipo_propiedad, 'fecha']].rename(columns={
@@ -546,47 +688,46 @@ with tab4:
         st.write("No se encontraron valores atípicos significativos.")
 
     # Análisis Estadístico
-    if st.button("Generar Análisis Estadístico con IA"):
-        with st.spinner("Analizando datos con IA..."):
-            try:
-                data_to_send = df_filtrado[[tipo_propiedad, 'categoria_nombre']]
-                prompt = "Proporciona un análisis estadístico de las tarifas de energía en los datos proporcionados. Comenta sobre las distribuciones, la variabilidad y cualquier valor atípico. Además, intenta identificar y explicar posibles razones o factores que podrían estar causando estos valores atípicos, considerando el contexto de las categorías y los datos disponibles. Responde siempre en español."
-                analysis = call_ia_model(data_to_send, prompt)
-                with st.expander("Ver análisis estadístico"):
-                    st.markdown(analysis)
-            except Exception:
-                st.error("Tenemos un error al procesar su solicitud. Limita la cantidad de datos.")
-    else:
-        st.write("Haz clic en el botón para generar el análisis estadístico.")
+    seccion_ia(
+        "Generar Análisis Estadístico con IA", "Ver análisis estadístico",
+        df_filtrado[[tipo_propiedad, 'categoria_nombre']],
+        "Proporciona un análisis estadístico de las tarifas de energía en los datos proporcionados. Comenta sobre las distribuciones, la variabilidad y cualquier valor atípico. Además, intenta identificar y explicar posibles razones o factores que podrían estar causando estos valores atípicos, considerando el contexto de las categorías y los datos disponibles. Responde siempre en español.",
+        "Haz clic en el botón para generar el análisis estadístico."
+    )
 
-    # Pestaña 5: Análisis Inteligente
-    with tab5:
-        st.header("🤖 Análisis Inteligente de Tarifas")
-        insights = generar_insights(df_filtrado, tipo_propiedad)
-        for insight in insights:
-            st.write(f"🔍 {insight}")
+# Pestaña 5: Análisis Inteligente
+def pestana_insights(df_filtrado, tipo_propiedad):
+    st.header("🤖 Análisis Inteligente de Tarifas")
+    insights = generar_insights(df_filtrado, tipo_propiedad)
+    for insight in insights:
+        st.write(f"🔍 {insight}")
 
 # Pestaña 6: Predicción de Tarifas
-with tab6:
+def pestana_prediccion(df_filtrado, tipo_propiedad, filtro):
     st.header("🔮 Predicción de Tarifas")
-    prediccion = predecir_tarifas(df_filtrado, tipo_propiedad)
+    refinar = st.toggle("Refinar con Prophet las categorías sin pronóstico guardado (más lento)")
+    pronosticos = pronosticos_seleccion(df_filtrado, tipo_propiedad, refinar, filtro)
+    if pronosticos.empty:
+        st.warning("No hay suficientes datos recientes para pronosticar las categorías seleccionadas.")
+        return
+
+    # Histórico (línea continua) y pronóstico (punteada) de cada categoría
+    historico = df_filtrado[['fecha', 'categoria_nombre', tipo_propiedad]].rename(columns={tipo_propiedad: 'valor'})
+    serie = pd.concat([
+        historico.assign(serie='Histórico', categoria_nombre=historico['categoria_nombre'].astype(str)),
+        pronosticos[['fecha', 'categoria_nombre', 'yhat']].rename(columns={'yhat': 'valor'}).assign(serie='Pronóstico'),
+    ], ignore_index=True)
     fig_pred = px.line(
-        prediccion,
-        x='ds',
-        y='yhat',
+        serie,
+        x='fecha',
+        y='valor',
+        color='categoria_nombre',
+        line_dash='serie',
         title="Predicción de Tarifas Energéticas",
-        labels={'ds': 'Fecha', 'yhat': 'Tarifa Predicha (COP)'}
+        labels={'fecha': 'Fecha', 'valor': 'Tarifa (COP)', 'categoria_nombre': 'Categoría', 'serie': ''}
     )
     st.plotly_chart(fig_pred, use_container_width=True)
     
-    # Tomar la fecha actual automáticamente
-    # fecha_actual = pd.to_datetime(datetime.now().date())
-    # proximo_mes = fecha_actual + pd.offsets.MonthEnd(1) + pd.offsets.MonthBegin(1)
-    # pred_proximo_mes = prediccion[prediccion['ds'] >= proximo_mes].iloc[0]
-    # locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-    # tarifa_predicha = pred_proximo_mes['yhat']
-    # fecha_predicha = pred_proximo_mes['ds'].strftime('%B %Y').capitalize()
-
     # Mapeo manual de los nombres de los meses en español
     meses = {
         "January": "Enero", "February": "Febrero", "March": "Marzo",
@@ -598,31 +739,54 @@ with tab6:
     # Tomar la fecha actual automáticamente
     fecha_actual = pd.to_datetime(datetime.now().date())
     proximo_mes = fecha_actual + pd.offsets.MonthEnd(1) + pd.offsets.MonthBegin(1)
-    pred_proximo_mes = prediccion[prediccion['ds'] >= proximo_mes].iloc[0]
-    tarifa_predicha = pred_proximo_mes['yhat']
+    # Si los datos no llegan hasta hoy, se muestra el último mes pronosticado
+    fechas_futuras = pronosticos.loc[pronosticos['fecha'] >= proximo_mes, 'fecha']
+    fecha_objetivo = fechas_futuras.min() if not fechas_futuras.empty else pronosticos['fecha'].max()
 
     # Convertir la fecha al formato en español sin usar locale
-    fecha_predicha = meses[pred_proximo_mes['ds'].strftime('%B')] + pred_proximo_mes['ds'].strftime(' %Y')
+    fecha_predicha = meses[fecha_objetivo.strftime('%B')] + fecha_objetivo.strftime(' %Y')
     
-    # Mostrar etiqueta con la predicción
+    # Mostrar etiqueta con la predicción de cada categoría
     st.markdown(
         f"<span style='background-color: #000000; padding: 5px 10px; border-radius: 5px; font-size: 14px;'>"
-        f"Predicción para {fecha_predicha}: ${tarifa_predicha:,.2f} COP"
+        f"Predicción para {fecha_predicha}"
         f"</span>",
         unsafe_allow_html=True
     )
+    df_prediccion = pronosticos[pronosticos['fecha'] == fecha_objetivo].set_index('categoria_nombre')
+    df_prediccion = df_prediccion[['yhat', 'yhat_inferior', 'yhat_superior', 'metodo']].rename(columns={
+        'yhat': 'Tarifa Predicha [$]', 'yhat_inferior': 'Mínimo esperado [$]',
+        'yhat_superior': 'Máximo esperado [$]', 'metodo': 'Método'
+    }).rename_axis('Categoría')
+    st.dataframe(df_prediccion.round(2), use_container_width=True)
 
     # Análisis de Predicción con IA
     st.subheader("Análisis de Predicción con Inteligencia Artificial")
-    if st.button("Generar Análisis de Predicción con IA"):
-        with st.spinner("Analizando datos con IA..."):
-            data_to_send = prediccion[['ds', 'yhat']]
-            prompt = "Analiza la predicción de las tarifas de energía en los datos proporcionados. Identifica las tendencias clave y cualquier cambio significativo en las tarifas predichas. Responde siempre en español."
-            analysis = call_ia_model(data_to_send, prompt)
-            with st.expander("Ver análisis de predicción"):
-                st.markdown(analysis)
-    else:
-        st.write("Haz clic en el botón para generar el análisis de predicción.")
+    seccion_ia(
+        "Generar Análisis de Predicción con IA", "Ver análisis de predicción",
+        pronosticos[['fecha', 'yhat', 'categoria_nombre']],
+        "Analiza la predicción de las tarifas de energía en los datos proporcionados. Identifica las tendencias clave y cualquier cambio significativo en las tarifas predichas. Responde siempre en español.",
+        "Haz clic en el botón para generar el análisis de predicción."
+    )
+
+# Pestañas: con PESTANAS_PEREZOSAS=0 se calculan las seis en cada interacción (modo anterior);
+# por defecto solo corre la pestaña abierta y cambiar de pestaña vuelve a ejecutar el script
+PESTANAS = {
+    "📈 Evolución Temporal": pestana_evolucion,
+    "📊 Análisis Comparativo": pestana_comparativo,
+    "📉 Tendencias": pestana_tendencias,
+    "📑 Estadísticas": pestana_estadisticas,
+    "🤖 Análisis Inteligente": pestana_insights,
+    "🔮 Predicción de Tarifas": partial(pestana_prediccion, filtro=filtro),
+}
+pestanas_perezosas = os.getenv("PESTANAS_PEREZOSAS", "1") != "0"
+
+contenedores = st.tabs(list(PESTANAS), key="pestana", on_change="rerun" if pestanas_perezosas else "ignore")
+for (nombre_pestana, mostrar_pestana), contenedor in zip(PESTANAS.items(), contenedores):
+    if pestanas_perezosas and not contenedor.open:
+        continue
+    with contenedor, medir(nombre_pestana):
+        mostrar_pestana(df_filtrado, tipo_propiedad)
 
 # Métricas clave en el footer
 st.markdown("---")
@@ -631,7 +795,7 @@ col1, col2, col3, col4 = st.columns(4)
 with col1:
     st.metric(
         "Tarifa Promedio",
-        f"${df_filtrado[tipo_propiedad].mean():.2f}",
+        f"${estadisticas[f'suma_{tipo_propiedad}'].sum() / estadisticas['n'].sum():.2f}",
         f"{df_filtrado[tipo_propiedad].pct_change().mean()*100:.1f}%"
     )
 
@@ -655,7 +819,7 @@ with col3:
 
 with col4:
     # Categoría con mayor volatilidad (desviación estándar)
-    volatilidad = df_filtrado.groupby('categoria_nombre')[tipo_propiedad].std()
+    volatilidad = resumen_estadisticas(estadisticas, tipo_propiedad)['Desv. Est.']
     categoria_volatil = volatilidad.idxmax()
     st.metric(
         "Categoría Más Volátil",
@@ -690,7 +854,50 @@ st.markdown("""
     - **Desarrollado por:** Los Tarifarios.     
 """)
 
-# Botón para limpiar caché
-if st.button('Limpiar Cache'):
-    st.cache_data.clear()
-    st.success('Cache limpiado exitosamente')
\ No newline at end of file
+# Métricas de las consultas a la base (base_datos.py): estado de los pools, tiempo y filas por
+# sentencia y las últimas consultas lentas; solo para el administrador
+def panel_consultas():
+    base = None if os.getenv("INSTANTANEA") else init_base()
+    if base is None:
+        return
+    metricas = base.metricas
+    st.markdown("**Consultas a la base**")
+    for nombre, estado in base.estado_pools().items():
+        st.caption(f"Pool {nombre}: {estado}")
+    st.caption(f"Desde el {datetime.fromtimestamp(metricas.desde):%Y-%m-%d %H:%M:%S}; "
+               f"lentas: más de {metricas.umbral_lenta:g} s")
+    por_sentencia = metricas.por_sentencia()
+    if por_sentencia:
+        tabla = pd.DataFrame(por_sentencia)
+        tabla["total [ms]"] = tabla["segundos"] * 1000
+        tabla["promedio [ms]"] = tabla["promedio"] * 1000
+        tabla["máximo [ms]"] = tabla["maximo"] * 1000
+        st.dataframe(tabla[["base", "sentencia", "ejecuciones", "total [ms]", "promedio [ms]", "máximo [ms]",
+                            "filas", "lentas", "errores"]].round(1), hide_index=True)
+    lentas = metricas.lentas()
+    if lentas:
+        st.markdown("**Últimas consultas lentas**")
+        st.dataframe(pd.DataFrame([{"momento": datetime.fromtimestamp(lenta["momento"]), "base": lenta["base"],
+                                    "segundos": round(lenta["segundos"], 3), "error": lenta["error"],
+                                    "sentencia": lenta["sentencia"]} for lenta in lentas]), hide_index=True)
+    if st.button("Reiniciar métricas"):
+        metricas.reiniciar()
+        st.rerun()
+
+# Botón para limpiar caché: recarga los datos compartidos y vacía los cachés de todas
+# las sesiones, así que solo aparece con la clave de administrador (CLAVE_ADMIN en el .env)
+CLAVE_ADMIN = os.getenv("CLAVE_ADMIN")
+if CLAVE_ADMIN:
+    with st.expander("Administración"):
+        clave = st.text_input("Clave de administrador", type="password")
+        if clave and hmac.compare_digest(clave.encode("utf-8"), CLAVE_ADMIN.encode("utf-8")):
+            datos = init_datos()
+            st.caption(f"Versión de los datos: {datos.version} "
+                       f"(cargados el {datetime.fromtimestamp(datos.cargado):%Y-%m-%d %H:%M:%S})")
+            if st.button('Limpiar Cache'):
+                datos.invalidar()
+                st.cache_data.clear()
+                st.success('Cache limpiado exitosamente')
+            panel_consultas()
+        elif clave:
+            st.error("Clave incorrecta")
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""Detección vectorizada de valores atípicos.
+
+Una sola pasada por columnas y grupos: devuelve una máscara booleana con el
+mismo índice del DataFrame y una columna por cada columna de valores, en vez
+de aplicar una función por categoría y juntar listas de índices.
+
+Modos:
+- "iqr": fuera de [Q1 - factor*IQR, Q3 + factor*IQR] del grupo (el criterio de siempre).
+- "ventana": el mismo criterio pero con cuartiles de una ventana móvil centrada de
+  `ventana` periodos, para historias largas donde el nivel de la tarifa cambia.
+- "mad": z modificado 0.6745 * |x - mediana| / MAD mayor que `umbral_mad`
+  (Iglewicz y Hoaglin); no depende de los extremos como los cuartiles.
+"""
+import pandas as pd
+
+modos = {
+    "iqr": "Rango intercuartílico",
+    "ventana": "Ventana móvil",
+    "mad": "Desviación absoluta mediana (MAD)",
+}
+
+
+def _cuartiles(valores, grupos, ventana):
+    if ventana:
+        # Las filas vienen ordenadas por periodo, así que dentro de cada grupo la ventana es temporal
+        moviles = (grupos.rolling(ventana, center=True, min_periods=3) if grupos is not None
+                   else valores.rolling(ventana, center=True, min_periods=3))
+        q1, q3 = moviles.quantile(0.25), moviles.quantile(0.75)
+        if grupos is not None:
+            q1 = q1.reset_index(level=0, drop=True).reindex(valores.index)
+            q3 = q3.reset_index(level=0, drop=True).reindex(valores.index)
+        return q1, q3
+    if grupos is not None:
+        return grupos.transform("quantile", 0.25), grupos.transform("quantile", 0.75)
+    return valores.quantile(0.25), valores.quantile(0.75)
+
+
+def mascara_atipicos(df, columnas, por="categoria_nombre", modo="iqr", factor=1.5, ventana=12, umbral_mad=3.5):
+    """DataFrame booleano (índice de df, una columna por columna de valores): True si es atípico.
+
+    por=None usa toda la tabla como un solo grupo.
+    """
+    valores = df[columnas].astype(float)
+    grupos = valores.groupby(df[por], sort=False) if por is not None else None
+
+    if modo == "mad":
+        mediana = grupos.transform("median") if grupos is not None else valores.median()
+        desviacion = (valores - mediana).abs()
+        if grupos is not None:
+            mad = desviacion.groupby(df[por], sort=False).transform("median")
+        else:
+            mad = desviacion.median()
+        # Con MAD 0 (serie casi constante) el cociente queda NaN y no se marca nada
+        return (0.6745 * desviacion / mad.where(mad > 0)).gt(umbral_mad)
+
+    if modo not in ("iqr", "ventana"):
+        raise ValueError(f"Modo de atípicos desconocido: {modo}")
+    q1, q3 = _cuartiles(valores, grupos, ventana if modo == "ventana" else None)
+    rango = q3 - q1
+    return valores.lt(q1 - factor * rango) | valores.gt(q3 + factor * rango)
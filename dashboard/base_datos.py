@@ -0,0 +1,208 @@
+"""Acceso a la base del dashboard: pool de conexiones, réplica de lectura y métricas de las consultas.
+
+BaseDatos crea los engines con el pool dimensionado a mano, pre-ping (una
+conexión caída se reemplaza antes de usarla, sin abrir una de prueba al
+arrancar) y reciclado, y con un tiempo máximo por consulta. Si hay una URL de
+réplica, las lecturas del dashboard van a la réplica y la principal queda
+para escribir.
+
+Con eventos de SQLAlchemy se mide cada consulta: tiempo, filas (cuando el
+driver las informa; sqlite3 no lo hace en los SELECT) y errores, agregados
+por sentencia, y las que pasan del umbral de lentas se registran con logging
+(logger "dashboard.base_datos"). El panel de administración del dashboard
+muestra esas métricas y el estado de los pools.
+
+Variables del .env (ver desde_entorno):
+- DATABASE_URL: base principal. DATABASE_URL_LECTURA: réplica de solo lectura (opcional).
+- POOL_TAMANO (5), POOL_EXCESO (10), POOL_ESPERA (30 s), POOL_RECICLAR (1800 s).
+- TIEMPO_MAXIMO_CONSULTA (30 s; 0 sin límite): max_execution_time en MySQL,
+  max_statement_time en MariaDB y un progress handler en SQLite.
+- CONSULTA_LENTA (0.5 s): umbral de las consultas que se registran como lentas.
+"""
+import os
+import re
+import time
+import logging
+import threading
+from collections import deque
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger("dashboard.base_datos")
+
+# Valores por defecto del pool y de los límites
+pool_tamano = 5
+pool_exceso = 10
+pool_espera = 30
+pool_reciclar = 1800
+tiempo_maximo_consulta = 30.0
+consulta_lenta = 0.5
+
+# Consultas lentas que se guardan para el panel
+lentas_guardadas = 50
+
+# Listas de parámetros expandidos (IN (?, ?, ?)) se agrupan como una sola sentencia
+_lista_parametros = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_espacios = re.compile(r"\s+")
+
+
+def normalizar_sentencia(sentencia):
+    """Sentencia en una línea, con las listas de parámetros como (...)."""
+    return _lista_parametros.sub("(...)", _espacios.sub(" ", sentencia).strip())
+
+
+class MetricasConsultas:
+    """Tiempo, filas y errores por sentencia, y las últimas consultas lentas; seguro entre hilos."""
+
+    def __init__(self, umbral_lenta=consulta_lenta, guardadas=lentas_guardadas):
+        self.umbral_lenta = umbral_lenta
+        self._candado = threading.Lock()
+        self._por_sentencia = {}
+        self._lentas = deque(maxlen=guardadas)
+        self.desde = time.time()
+
+    def registrar(self, base, sentencia, segundos, filas=None, error=None):
+        clave = (base, normalizar_sentencia(sentencia))
+        with self._candado:
+            datos = self._por_sentencia.setdefault(
+                clave, {"ejecuciones": 0, "segundos": 0.0, "maximo": 0.0, "filas": 0, "errores": 0, "lentas": 0})
+            datos["ejecuciones"] += 1
+            datos["segundos"] += segundos
+            datos["maximo"] = max(datos["maximo"], segundos)
+            if filas is not None and filas >= 0:
+                datos["filas"] += filas
+            if error is not None:
+                datos["errores"] += 1
+            lenta = segundos >= self.umbral_lenta
+            if lenta:
+                datos["lentas"] += 1
+                self._lentas.append({"momento": time.time(), "base": base, "sentencia": clave[1],
+                                     "segundos": segundos, "error": error})
+        if lenta:
+            logger.warning("Consulta lenta en %s (%.3f s%s): %s", base, segundos,
+                           f", {error}" if error else "", clave[1][:500])
+
+    def por_sentencia(self):
+        """[{base, sentencia, ejecuciones, segundos, promedio, maximo, filas, errores, lentas}], las más costosas primero."""
+        with self._candado:
+            filas = [{"base": base, "sentencia": sentencia, **datos, "promedio": datos["segundos"] / datos["ejecuciones"]}
+                     for (base, sentencia), datos in self._por_sentencia.items()]
+        return sorted(filas, key=lambda fila: fila["segundos"], reverse=True)
+
+    def lentas(self):
+        """Últimas consultas lentas, la más reciente primero."""
+        with self._candado:
+            return list(reversed(self._lentas))
+
+    def reiniciar(self):
+        with self._candado:
+            self._por_sentencia.clear()
+            self._lentas.clear()
+            self.desde = time.time()
+
+
+def _fijar_tiempo_maximo(conexion_dbapi, segundos):
+    """Tiempo máximo de las consultas de la sesión en MySQL (milisegundos) o MariaDB (segundos)."""
+    cursor = conexion_dbapi.cursor()
+    try:
+        cursor.execute("SELECT VERSION()")
+        mariadb = "mariadb" in str(cursor.fetchone()[0]).lower()
+        if mariadb:
+            cursor.execute(f"SET SESSION max_statement_time = {float(segundos)}")
+        else:
+            cursor.execute(f"SET SESSION max_execution_time = {int(segundos * 1000)}")
+    finally:
+        cursor.close()
+
+
+def instrumentar(engine, metricas, base, tiempo_maximo=tiempo_maximo_consulta):
+    """Registra en `metricas` cada consulta del engine y aplica el tiempo máximo por consulta."""
+    dialecto = engine.dialect.name
+
+    if tiempo_maximo and dialecto == "mysql":
+        @event.listens_for(engine, "connect")
+        def al_conectar(conexion_dbapi, registro):
+            _fijar_tiempo_maximo(conexion_dbapi, tiempo_maximo)
+
+    def limpiar(conexion):
+        if tiempo_maximo and dialecto == "sqlite":
+            conexion.connection.dbapi_connection.set_progress_handler(None, 0)
+        return conexion.info["inicio_consulta"].pop()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def antes(conexion, cursor, sentencia, parametros, contexto, executemany):
+        if tiempo_maximo and dialecto == "sqlite":
+            # sqlite3 no tiene tiempo máximo: el handler interrumpe la consulta al vencer el plazo
+            plazo = time.monotonic() + tiempo_maximo
+            conexion.connection.dbapi_connection.set_progress_handler(lambda: time.monotonic() > plazo, 10000)
+        conexion.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def despues(conexion, cursor, sentencia, parametros, contexto, executemany):
+        segundos = time.perf_counter() - limpiar(conexion)
+        metricas.registrar(base, sentencia, segundos, cursor.rowcount)
+
+    @event.listens_for(engine, "handle_error")
+    def al_fallar(contexto_error):
+        conexion = contexto_error.connection
+        if conexion is None or not conexion.info.get("inicio_consulta"):
+            return
+        segundos = time.perf_counter() - limpiar(conexion)
+        metricas.registrar(base, contexto_error.statement or "", segundos,
+                           error=type(contexto_error.original_exception).__name__)
+
+    return engine
+
+
+def crear_engine(url, tamano=pool_tamano, exceso=pool_exceso, espera=pool_espera, reciclar=pool_reciclar):
+    """Engine con pool dimensionado, pre-ping y reciclado (SQLite en memoria usa su pool de siempre)."""
+    opciones = {"pool_pre_ping": True, "pool_recycle": reciclar}
+    url = make_url(url)
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        opciones.update(pool_size=tamano, max_overflow=exceso, pool_timeout=espera)
+    return create_engine(url, **opciones)
+
+
+class BaseDatos:
+    """Engines de la base principal y de lectura (la réplica, o la misma principal) con métricas compartidas."""
+
+    def __init__(self, url, url_lectura=None, tiempo_maximo=tiempo_maximo_consulta, umbral_lenta=consulta_lenta,
+                 **pool):
+        self.metricas = MetricasConsultas(umbral_lenta)
+        self.principal = instrumentar(crear_engine(url, **pool), self.metricas, "principal", tiempo_maximo)
+        if url_lectura:
+            self.lectura = instrumentar(crear_engine(url_lectura, **pool), self.metricas, "réplica", tiempo_maximo)
+        else:
+            self.lectura = self.principal
+
+    @classmethod
+    def desde_entorno(cls):
+        """BaseDatos con las variables del .env (ver el docstring del módulo)."""
+        url = os.getenv("DATABASE_URL")
+        if not url:
+            raise ValueError("DATABASE_URL no está configurado en el archivo .env")
+        return cls(
+            url,
+            os.getenv("DATABASE_URL_LECTURA") or None,
+            tiempo_maximo=float(os.getenv("TIEMPO_MAXIMO_CONSULTA", tiempo_maximo_consulta)),
+            umbral_lenta=float(os.getenv("CONSULTA_LENTA", consulta_lenta)),
+            tamano=int(os.getenv("POOL_TAMANO", pool_tamano)),
+            exceso=int(os.getenv("POOL_EXCESO", pool_exceso)),
+            espera=float(os.getenv("POOL_ESPERA", pool_espera)),
+            reciclar=int(os.getenv("POOL_RECICLAR", pool_reciclar)),
+        )
+
+    def engines(self):
+        """{nombre: engine} sin repetir la principal cuando no hay réplica."""
+        if self.lectura is self.principal:
+            return {"principal": self.principal}
+        return {"principal": self.principal, "réplica": self.lectura}
+
+    def estado_pools(self):
+        """{nombre: texto de estado del pool} (conexiones abiertas, prestadas y en exceso)."""
+        return {nombre: engine.pool.status() for nombre, engine in self.engines().items()}
+
+    def cerrar(self):
+        for engine in self.engines().values():
+            engine.dispose()
@@ -0,0 +1,284 @@
+"""Consultas del dashboard sobre tarifa y tarifa_nivel.
+
+Están escritas para los índices de migraciones/001_indices_periodo.sql: se
+leen solo columnas del índice (periodo, id_categoria, valores...) en el orden
+del índice, sin JOIN, así la base las resuelve sin tocar la tabla y sin
+ordenar. Los nombres de categoría (17 filas) se traen aparte y se cruzan en
+pandas.
+
+Los filtros de la barra lateral (categorías y rango de periodos) se mandan a
+la base como parámetros (leer_filtrado), así solo viaja la ventana
+seleccionada; el dashboard guarda esos resultados en un caché acotado.
+
+Con la tabla larga de migraciones/004_tarifa_valor.sql, tarifa y tarifa_nivel
+son vistas con las mismas columnas y estas consultas no cambian; los índices
+que usan son los de tarifa_valor (ver benchmarks/verificar_indices.py).
+"""
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from esquema import precios_float64
+
+columnas = {
+    "tarifa": ["propiedad_epm", "propiedad_compartido", "propiedad_cliente"],
+    "tarifa_nivel": ["nivel_ii_punta", "nivel_ii_fuera_de_punta", "nivel_iii_punta",
+                     "nivel_iii_fuera_de_punta", "nivel_iv_punta", "nivel_iv_fuera_de_punta"],
+}
+
+# Índices que deben usar las consultas (los revisa benchmarks/verificar_indices.py):
+# por periodo para leer la tabla o un rango, por categoría cuando se filtran categorías
+indices = {"tarifa": "idx_tarifa_periodo", "tarifa_nivel": "idx_tarifa_nivel_periodo"}
+indices_categoria = {"tarifa": "uk_tarifa_categoria_periodo", "tarifa_nivel": "uk_tarifa_nivel_categoria_periodo"}
+
+query_categorias = "SELECT id_categoria, nombre FROM categoria"
+
+
+def query_tabla(tabla, rango=False, por_categoria=False):
+    """SELECT de la tabla.
+
+    rango=True filtra por :desde <= periodo <= :hasta y por_categoria=True
+    por id_categoria IN :ids (lista; ver sentencia()). Con categorías se
+    ordena como la clave única, que las busca una a una sin ordenar después.
+    """
+    lista = ", ".join(["id_tarifa", "id_categoria"] + columnas[tabla] + ["periodo"])
+    condiciones = []
+    if rango:
+        condiciones.append("periodo BETWEEN :desde AND :hasta")
+    if por_categoria:
+        condiciones.append("id_categoria IN :ids")
+    filtro = " WHERE " + " AND ".join(condiciones) if condiciones else ""
+    orden = "id_categoria, periodo" if por_categoria else "periodo, id_categoria"
+    return f"SELECT {lista} FROM {tabla}{filtro} ORDER BY {orden}"
+
+
+def sentencia(consulta):
+    """text() de la consulta, expandiendo :ids a un parámetro por id."""
+    sentencia_sql = text(consulta)
+    if ":ids" in consulta:
+        sentencia_sql = sentencia_sql.bindparams(bindparam("ids", expanding=True))
+    return sentencia_sql
+
+
+def periodo_de_fecha(fecha, inicio=True):
+    """Periodo AAAAMM para un extremo del rango de fechas.
+
+    Cada periodo se fecha el día 1 del mes: si el rango empieza después del
+    día 1, ese mes queda por fuera y se empieza en el siguiente.
+    """
+    if inicio and fecha.day > 1:
+        return fecha.year * 100 + fecha.month + 1 if fecha.month < 12 else (fecha.year + 1) * 100 + 1
+    return fecha.year * 100 + fecha.month
+
+
+def nombres_categoria(conexion):
+    """{id_categoria: nombre} tal como se muestra en el dashboard."""
+    return {id_categoria: nombre.replace("ESPD*", "ESPD")
+            for id_categoria, nombre in conexion.execute(text(query_categorias))}
+
+
+def resumen_tabla(conexion, tabla):
+    """Categorías presentes y periodos mínimo y máximo, sin leer las filas (sale de los índices)."""
+    minimo, maximo = conexion.execute(text(f"SELECT MIN(periodo), MAX(periodo) FROM {tabla}")).one()
+    ids = [fila[0] for fila in conexion.execute(text(f"SELECT DISTINCT id_categoria FROM {tabla}"))]
+    return {"ids": ids, "periodo_min": minimo, "periodo_max": maximo}
+
+
+def leer_resumen(engine, tabla="tarifa"):
+    """{nombres, ids, periodo_min, periodo_max} para la barra lateral, sin leer las filas."""
+    with engine.connect() as conexion:
+        return {"nombres": nombres_categoria(conexion), **resumen_tabla(conexion, tabla)}
+
+
+def periodo_maximo(conexion, tabla="tarifa"):
+    """Último periodo cargado (una lectura del índice); sirve de versión de los datos."""
+    return conexion.execute(text(f"SELECT MAX(periodo) FROM {tabla}")).scalar()
+
+
+def leer_filtrado(conexion, tabla, categorias, ids, desde, hasta):
+    """Filas de las categorías `ids` entre los periodos desde y hasta (incluidos)."""
+    return leer_tabla(conexion, tabla, categorias, {"ids": list(ids), "desde": desde, "hasta": hasta})
+
+
+def leer_tabla(conexion, tabla, categorias, filtros=None):
+    """Filas de la tabla con categoria_nombre y fecha, ordenadas por periodo y nombre como antes.
+
+    filtros: {"ids": [...], "desde": AAAAMM, "hasta": AAAAMM} o None para toda la tabla.
+    """
+    consulta = query_tabla(tabla, rango=filtros is not None, por_categoria=filtros is not None)
+    df = pd.read_sql(sentencia(consulta), conexion, params=filtros)
+    df["categoria_nombre"] = df["id_categoria"].map(categorias)
+    # La base entrega el orden del índice; se reordena por periodo y nombre (estable, pocas filas)
+    df = df.sort_values(["periodo", "categoria_nombre"], kind="stable", ignore_index=True)
+    df["fecha"] = pd.to_datetime(df["periodo"].astype(str), format="%Y%m")
+    return df
+
+
+def leer_tarifas(engine):
+    """(df_tarifas, df_niveles) con las columnas que usaba el SELECT t.*, c.nombre original."""
+    with engine.connect() as conexion:
+        categorias = nombres_categoria(conexion)
+        return leer_tabla(conexion, "tarifa", categorias), leer_tabla(conexion, "tarifa_nivel", categorias)
+
+
+# Acumulados por (categoría, periodo) que mantiene tarifas/agregados.py
+tablas_acumulado = {"tarifa": "tarifa_acumulado", "tarifa_nivel": "tarifa_nivel_acumulado"}
+
+
+def _prefijos(conexion, tabla, ids, condicion, parametros, funcion="MAX", por_anio=False):
+    """Fila de acumulados en el periodo MAX/MIN que cumple la condición, por categoría (y año)."""
+    acumulado = tablas_acumulado[tabla]
+    grupo = "id_categoria, periodo - periodo % 100" if por_anio else "id_categoria"
+    consulta = (f"SELECT a.* FROM {acumulado} a JOIN ("
+                f"SELECT id_categoria, {funcion}(periodo) AS periodo FROM {acumulado} "
+                f"WHERE id_categoria IN :ids AND {condicion} GROUP BY {grupo}) p "
+                f"ON a.id_categoria = p.id_categoria AND a.periodo = p.periodo")
+    return pd.read_sql(sentencia(consulta), conexion, params={"ids": list(ids), **parametros})
+
+
+def _restar_prefijo(filas, anteriores, columnas_valor):
+    """n, suma y suma2 de cada fila menos los de la fila anterior de su categoría."""
+    anteriores = anteriores.set_index("id_categoria")
+    filas = filas.copy()
+    for columna in ["n"] + [f"{p}_{c}" for c in columnas_valor for p in ("suma", "suma2")]:
+        filas[columna] = filas[columna] - filas["id_categoria"].map(anteriores[columna]).fillna(0)
+    return filas
+
+
+def estadisticas_rango(conexion, tabla, nombres, ids, desde, hasta):
+    """Estadísticas por categoría entre desde y hasta a partir de los acumulados.
+
+    Conteo, promedio y desviación salen de dos filas de prefijo por categoría;
+    primero/último de una fila más. Mínimo y máximo no se pueden restar, así
+    que salen de un GROUP BY sobre el índice por periodo. Devuelve un DataFrame
+    con índice categoria_nombre (ver resumen_estadisticas).
+    """
+    columnas_valor = columnas[tabla]
+    rango = {"desde": desde, "hasta": hasta}
+    fin = _prefijos(conexion, tabla, ids, "periodo BETWEEN :desde AND :hasta", rango)
+    if fin.empty:
+        return None
+    inicio = _prefijos(conexion, tabla, ids, "periodo < :desde", {"desde": desde})
+    primero = _prefijos(conexion, tabla, ids, "periodo BETWEEN :desde AND :hasta", rango, funcion="MIN")
+    extremos = pd.read_sql(sentencia(
+        f"SELECT id_categoria, {', '.join(f'MIN({c}) AS minimo_{c}, MAX({c}) AS maximo_{c}' for c in columnas_valor)} "
+        f"FROM {tabla} WHERE periodo BETWEEN :desde AND :hasta AND id_categoria IN :ids GROUP BY id_categoria"
+    ), conexion, params={"ids": list(ids), **rango}).set_index("id_categoria")
+
+    fin = _restar_prefijo(fin, inicio, columnas_valor).set_index("id_categoria")
+    primero = primero.set_index("id_categoria")
+    filas = fin[["n"] + [f"{p}_{c}" for c in columnas_valor for p in ("suma", "suma2")]].copy()
+    for columna in columnas_valor:
+        filas[f"primero_{columna}"] = primero[columna]
+        filas[f"ultimo_{columna}"] = fin[columna]
+        filas[f"minimo_{columna}"] = extremos[f"minimo_{columna}"]
+        filas[f"maximo_{columna}"] = extremos[f"maximo_{columna}"]
+    filas["periodo_inicial"] = primero["periodo"]
+    filas["periodo_final"] = fin["periodo"]
+    filas["categoria_nombre"] = filas.index.map(nombres)
+    return _unir_por_nombre(filas, columnas_valor)
+
+
+def estadisticas_filas(df, tabla):
+    """Mismas estadísticas que estadisticas_rango, calculadas desde las filas ya cargadas."""
+    columnas_valor = columnas[tabla]
+    # Sumas y cuadrados en float64 aunque el DataFrame tenga los precios en float32 (esquema.py)
+    valores_float64 = precios_float64(df[columnas_valor])
+    grupos = valores_float64.groupby(df["id_categoria"])
+    filas = pd.DataFrame({"n": grupos.size()})
+    for columna in columnas_valor:
+        valores = grupos[columna]
+        filas[f"suma_{columna}"] = valores.sum()
+        filas[f"suma2_{columna}"] = (valores_float64[columna] ** 2).groupby(df["id_categoria"]).sum()
+        filas[f"primero_{columna}"] = valores.first()
+        filas[f"ultimo_{columna}"] = valores.last()
+        filas[f"minimo_{columna}"] = valores.min()
+        filas[f"maximo_{columna}"] = valores.max()
+    categorias = df.groupby("id_categoria")
+    filas["periodo_inicial"] = categorias["periodo"].min()
+    filas["periodo_final"] = categorias["periodo"].max()
+    filas["categoria_nombre"] = categorias["categoria_nombre"].first().astype(str)
+    return _unir_por_nombre(filas, columnas_valor)
+
+
+def _unir_por_nombre(filas, columnas_valor):
+    """Junta las categorías que se muestran con el mismo nombre (ESPD* y ESPD)."""
+    if filas["categoria_nombre"].is_unique:
+        return filas.set_index("categoria_nombre").sort_index()
+    filas = filas.sort_values("periodo_inicial")
+    grupos = filas.groupby("categoria_nombre")
+    unidas = grupos[["n"] + [f"{p}_{c}" for c in columnas_valor for p in ("suma", "suma2")]].sum()
+    for columna in columnas_valor:
+        unidas[f"primero_{columna}"] = grupos[f"primero_{columna}"].first()
+        unidas[f"minimo_{columna}"] = grupos[f"minimo_{columna}"].min()
+        unidas[f"maximo_{columna}"] = grupos[f"maximo_{columna}"].max()
+    unidas["periodo_inicial"] = grupos["periodo_inicial"].min()
+    ultimos = filas.sort_values("periodo_final").groupby("categoria_nombre")
+    for columna in columnas_valor:
+        unidas[f"ultimo_{columna}"] = ultimos[f"ultimo_{columna}"].last()
+    unidas["periodo_final"] = ultimos["periodo_final"].last()
+    return unidas.sort_index()
+
+
+def resumen_estadisticas(estadisticas, columna):
+    """Inicial, final, variación, promedio, mínimo, máximo y desviación (muestral) de una columna."""
+    n = estadisticas["n"]
+    suma = estadisticas[f"suma_{columna}"]
+    varianza = (estadisticas[f"suma2_{columna}"] - suma ** 2 / n) / (n - 1)
+    inicial = estadisticas[f"primero_{columna}"]
+    final = estadisticas[f"ultimo_{columna}"]
+    return pd.DataFrame({
+        "Inicial [$]": inicial,
+        "Final [$]": final,
+        "Variación [%]": (final - inicial) / inicial * 100,
+        "Promedio": suma / n,
+        "Mínimo": estadisticas[f"minimo_{columna}"],
+        "Máximo": estadisticas[f"maximo_{columna}"],
+        "Desv. Est.": varianza.clip(lower=0).where(n > 1) ** 0.5,
+    })
+
+
+def promedios_anuales(conexion, tabla, nombres, ids, desde, hasta):
+    """Promedio por año y categoría (años en filas, categorías en columnas) desde los acumulados.
+
+    Cada año sale de la resta entre su último prefijo y el del año anterior:
+    O(categorías x años) filas leídas.
+    """
+    columnas_valor = columnas[tabla]
+    finales = _prefijos(conexion, tabla, ids, "periodo BETWEEN :desde AND :hasta",
+                        {"desde": desde, "hasta": hasta}, por_anio=True)
+    inicio = _prefijos(conexion, tabla, ids, "periodo < :desde", {"desde": desde})
+    if not inicio.empty:
+        finales = pd.concat([inicio, finales])
+    finales = finales.sort_values(["id_categoria", "periodo"], ignore_index=True)
+    restas = ["n"] + [f"suma_{c}" for c in columnas_valor]
+    diferencias = finales.groupby("id_categoria")[restas].diff()
+    # La primera fila de cada categoría es su propio total si no hay prefijo anterior
+    primera = ~finales["id_categoria"].duplicated()
+    diferencias[primera] = finales.loc[primera, restas]
+    diferencias["año"] = finales["periodo"] // 100
+    diferencias["categoria_nombre"] = finales["id_categoria"].map(nombres)
+    # Quitar el prefijo anterior al rango, que solo servía para restar
+    diferencias = diferencias[finales["periodo"] >= desde]
+    sumas = diferencias.groupby(["año", "categoria_nombre"])[restas].sum()
+    return pd.DataFrame({c: sumas[f"suma_{c}"] / sumas["n"] for c in columnas_valor})
+
+
+def promedios_anuales_filas(df, tabla):
+    """Mismo resultado que promedios_anuales, calculado desde las filas ya cargadas."""
+    anios = df["año"] if "año" in df else df["fecha"].dt.year.rename("año")
+    valores = precios_float64(df[columnas[tabla]])
+    return valores.groupby([anios, df["categoria_nombre"]], observed=True).mean()
+
+
+def leer_pronosticos(conexion, nombres, ids, propiedad):
+    """Pronósticos guardados (tabla pronostico) de las categorías y la propiedad, con nombre y fecha."""
+    consulta = sentencia(
+        "SELECT metodo, id_categoria, periodo, yhat, yhat_inferior, yhat_superior FROM pronostico "
+        "WHERE propiedad = :propiedad AND id_categoria IN :ids ORDER BY metodo, id_categoria, periodo"
+    )
+    df = pd.read_sql(consulta, conexion, params={"propiedad": propiedad, "ids": list(ids)})
+    valores = ["yhat", "yhat_inferior", "yhat_superior"]
+    df[valores] = df[valores].astype(float)
+    df["categoria_nombre"] = df["id_categoria"].map(nombres)
+    df["fecha"] = pd.to_datetime(df["periodo"].astype(str), format="%Y%m")
+    return df
@@ -0,0 +1,58 @@
+"""Datos de solo lectura compartidos por todas las sesiones del proceso, con su versión.
+
+Con la base es solo el resumen de la barra lateral (categorías y rango de
+periodos); las filas se piden filtradas en la base (load_data, con caché
+acotado). Con la instantánea es la Instantanea abierta con memory map, de
+donde load_data corta la ventana elegida. La versión entra en la clave de los
+cachés de load_data, las estadísticas y los pronósticos.
+
+Cada `ttl` segundos la siguiente sesión que pide los datos consulta la
+versión (el último periodo cargado, una lectura del índice) y, si cambió,
+recarga los datos; las sesiones que ya tienen la versión anterior la siguen
+usando hasta su próxima ejecución. Las correcciones dentro de un periodo ya
+cargado no cambian la versión: para eso está invalidar(), que el dashboard
+solo ofrece al administrador.
+"""
+import time
+import threading
+
+# Segundos entre revisiones de la versión por defecto
+ttl_datos = 300
+
+
+class DatosCompartidos:
+    def __init__(self, cargar, version, ttl=ttl_datos):
+        """cargar() devuelve lo que se comparte; version() un valor que cambia cuando hay datos nuevos."""
+        self._cargar = cargar
+        self._version = version
+        self.ttl = ttl
+        self.version = None
+        self.cargado = None
+        self._datos = None
+        self._revisado = None
+        self._candado = threading.Lock()
+
+    def _vencido(self):
+        return self._datos is None or time.monotonic() - self._revisado >= self.ttl
+
+    def actual(self):
+        """Los datos vigentes; los recarga si pasó el TTL y cambió la versión."""
+        datos = self._datos
+        if datos is None or self._vencido():
+            with self._candado:
+                # Otra sesión pudo haberla recargado mientras se esperaba el candado
+                if self._vencido():
+                    version = self._version()
+                    if self._datos is None or version != self.version:
+                        self._datos = self._cargar()
+                        self.version = version
+                        self.cargado = time.time()
+                    self._revisado = time.monotonic()
+                datos = self._datos
+        return datos
+
+    def invalidar(self):
+        """Descarta los datos: la próxima llamada a actual() los vuelve a leer."""
+        with self._candado:
+            self._datos = None
+            self.version = None
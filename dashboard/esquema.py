@@ -0,0 +1,32 @@
+"""Tipos compactos para los DataFrames de tarifas que usa el dashboard.
+
+compactar() se aplica una vez al cargar (load_data) y deja:
+- categoria_nombre como category (códigos int8 + los nombres una sola vez),
+- id_tarifa y periodo en int32, id_categoria en int16,
+- año y mes ya calculados en int16, para no derivarlos de fecha en cada pestaña,
+- los precios en float32.
+
+Los precios vienen de columnas decimal(10,2): en float32 cada valor menor a
+~167.000 conserva los centavos, así que precios_float64() los recupera exactos
+(redondeando a 2 decimales) donde se acumulan sumas o cuadrados.
+"""
+import pandas as pd
+
+tipos_enteros = {"id_tarifa": "int32", "id_categoria": "int16", "periodo": "int32"}
+
+
+def compactar(df, columnas_valor):
+    """Copia de df con los tipos compactos y las columnas año y mes."""
+    df = df.astype({columna: tipo for columna, tipo in tipos_enteros.items() if columna in df})
+    df = df.astype({columna: "float32" for columna in columnas_valor})
+    # Categorías en orden alfabético: ordenar o agrupar por nombre da lo mismo que con texto
+    nombres = df["categoria_nombre"].astype(str)
+    df["categoria_nombre"] = pd.Categorical(nombres, categories=sorted(nombres.unique()))
+    df["año"] = df["fecha"].dt.year.astype("int16")
+    df["mes"] = df["fecha"].dt.month.astype("int16")
+    return df
+
+
+def precios_float64(valores):
+    """Precios (Series o DataFrame) en float64 con los centavos exactos."""
+    return valores.astype("float64").round(2)
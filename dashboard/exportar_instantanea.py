@@ -0,0 +1,33 @@
+import os
+import argparse
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from instantanea import directorio_instantanea, exportar, tablas_instantanea
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Exporta tarifa a una instantánea Arrow para usar el dashboard sin base de datos.")
+    parser.add_argument("--salida", default=directorio_instantanea, help="Carpeta de la instantánea")
+    parser.add_argument("--env", required=True,
+                        help="Archivo .env con DATABASE_URL de la base a exportar (sin valor por defecto: "
+                             "dashboard/.env es la base del dashboard en producción)")
+    parser.add_argument("--niveles", action="store_true",
+                        help="Exportar también tarifa_nivel (el dashboard no la usa)")
+    args = parser.parse_args()
+
+    load_dotenv(args.env)
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit(f"DATABASE_URL no está configurado en {args.env}")
+
+    tablas = ("tarifa", "tarifa_nivel") if args.niveles else tablas_instantanea
+    filas = exportar(create_engine(database_url), args.salida, tablas)
+    for tabla, cantidad in filas.items():
+        print(f"{tabla}: {cantidad} filas")
+    print(f"Instantánea escrita en {args.salida}. Para usarla: INSTANTANEA={args.salida} streamlit run app.py")
+
+
+if __name__ == "__main__":
+    main()
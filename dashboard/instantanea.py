@@ -0,0 +1,170 @@
+"""Instantánea en Arrow de las tablas de tarifas para usar el dashboard sin base de datos.
+
+exportar() escribe un archivo Arrow IPC por tabla (por defecto solo
+tarifa.arrow: el dashboard no lee tarifa_nivel) con tipos fijos, la fecha ya
+calculada, los nombres de categoría normalizados (ESPD* -> ESPD) y
+codificados como diccionario, y las filas ordenadas por categoría y periodo.
+Instantanea abre esos archivos con memory map: no se copian a memoria hasta
+que se leen, y como cada categoría es un bloque ordenado por periodo, un
+rango de fechas de una categoría es un corte contiguo (búsqueda binaria).
+cortar() devuelve esos cortes como una tabla Arrow sin copiar datos; el
+dashboard los pasa a pandas en load_data, una vez por filtro (caché acotado).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from consultas import columnas, leer_tabla, nombres_categoria
+
+# Carpeta por defecto de la instantánea (relativa al directorio de trabajo)
+directorio_instantanea = "instantanea"
+
+# Tablas que lee el dashboard
+tablas_instantanea = ("tarifa",)
+
+# Orden de las filas en la instantánea
+orden_filas = [("id_categoria", "ascending"), ("periodo", "ascending")]
+
+# Tipo de la columna fecha que arma consultas.leer_tabla (la resolución depende de la versión de pandas)
+_tipo_fecha = pd.to_datetime(pd.Series(["201401"]), format="%Y%m").dtype
+
+
+def _ruta(directorio, tabla):
+    return os.path.join(directorio, f"{tabla}.arrow")
+
+
+def _esquema(tabla):
+    import pyarrow as pa
+
+    return pa.schema(
+        [("id_tarifa", pa.int32()), ("id_categoria", pa.int16())]
+        + [(columna, pa.float64()) for columna in columnas[tabla]]
+        + [("periodo", pa.int32()),
+           ("categoria_nombre", pa.dictionary(pa.int8(), pa.string())),
+           ("fecha", pa.timestamp("ns"))]
+    )
+
+
+# id_categoria * _base_clave + periodo ordena las filas como orden_filas
+_base_clave = 1_000_000
+
+
+def _claves(datos):
+    """Clave (categoría, periodo) de cada fila como int64, para buscar los cortes."""
+    ids = datos.column("id_categoria").to_numpy().astype(np.int64)
+    return ids * _base_clave + datos.column("periodo").to_numpy()
+
+
+def version_archivo(directorio=directorio_instantanea):
+    """Fecha de modificación de tarifa.arrow: cambia cada vez que se vuelve a exportar."""
+    return os.path.getmtime(_ruta(directorio, "tarifa"))
+
+
+def tablas_arrow(engine, tablas=tablas_instantanea):
+    """{tabla: pyarrow.Table} de las tablas dadas con el esquema de la instantánea."""
+    import pyarrow as pa
+
+    resultado = {}
+    with engine.connect() as conexion:
+        categorias = nombres_categoria(conexion)
+        for tabla in tablas:
+            df = leer_tabla(conexion, tabla, categorias)
+            esquema = _esquema(tabla)
+            datos = pa.Table.from_pandas(df[esquema.names], schema=esquema, preserve_index=False)
+            resultado[tabla] = datos.sort_by(orden_filas)
+    return resultado
+
+
+def exportar(engine, directorio=directorio_instantanea, tablas=tablas_instantanea):
+    """Escribe la instantánea de las tablas dadas; devuelve {tabla: filas}."""
+    import pyarrow as pa
+
+    os.makedirs(directorio, exist_ok=True)
+    filas = {}
+    for tabla, datos in tablas_arrow(engine, tablas).items():
+        temporal = _ruta(directorio, tabla) + ".tmp"
+        # Sin compresión, para poder leerla con memory map sin descomprimir
+        with pa.OSFile(temporal, "wb") as salida, pa.ipc.new_file(salida, datos.schema) as escritor:
+            escritor.write_table(datos)
+        os.replace(temporal, _ruta(directorio, tabla))
+        filas[tabla] = datos.num_rows
+    return filas
+
+
+class Instantanea:
+    """Tablas Arrow de solo lectura con las mismas respuestas que consultas.py.
+
+    Se abre desde los archivos de exportar() (abrir). cortar() no copia datos;
+    leer_filtrado copia las filas que devuelve a un DataFrame.
+    """
+
+    def __init__(self, tablas):
+        if "tarifa" not in tablas:
+            raise ValueError("La instantánea necesita la tabla tarifa")
+        self._tablas = {}
+        self._claves = {}
+        for tabla, datos in tablas.items():
+            claves = _claves(datos)
+            if np.any(claves[1:] < claves[:-1]):
+                # Instantáneas exportadas antes, ordenadas por periodo: se ordenan una vez al abrir
+                datos = datos.sort_by(orden_filas)
+                claves = _claves(datos)
+            self._tablas[tabla] = datos
+            self._claves[tabla] = claves
+
+    @classmethod
+    def abrir(cls, directorio=directorio_instantanea, tablas=tablas_instantanea):
+        import pyarrow as pa
+
+        abiertas = {}
+        for tabla in tablas:
+            if os.path.exists(_ruta(directorio, tabla)):
+                abiertas[tabla] = pa.ipc.open_file(pa.memory_map(_ruta(directorio, tabla))).read_all()
+        if "tarifa" not in abiertas:
+            raise FileNotFoundError(f"No hay instantánea en {directorio} (falta tarifa.arrow)")
+        return cls(abiertas)
+
+    def nombres_categoria(self, tabla="tarifa"):
+        """{id_categoria: nombre} de las categorías presentes."""
+        datos = self._tablas[tabla].select(["id_categoria", "categoria_nombre"]).to_pandas()
+        return dict(zip(datos["id_categoria"].astype(int), datos["categoria_nombre"].astype(str)))
+
+    def resumen_tabla(self, tabla):
+        import pyarrow.compute as pc
+
+        periodos = pc.min_max(self._tablas[tabla].column("periodo"))
+        ids = np.unique(self._claves[tabla] // _base_clave)
+        return {"ids": [int(i) for i in ids], "periodo_min": periodos["min"].as_py(),
+                "periodo_max": periodos["max"].as_py()}
+
+    def resumen(self, tabla="tarifa"):
+        """Lo mismo que consultas.leer_resumen: nombres, ids y periodos mínimo y máximo."""
+        return {"nombres": self.nombres_categoria(tabla), **self.resumen_tabla(tabla)}
+
+    def cortar(self, tabla, ids, desde, hasta):
+        """pyarrow.Table con las filas de las categorías `ids` entre desde y hasta: un corte por categoría, sin copiar."""
+        import pyarrow as pa
+
+        datos = self._tablas[tabla]
+        claves = self._claves[tabla]
+        cortes = []
+        for id_categoria in sorted(set(ids)):
+            inicio, fin = np.searchsorted(claves, [id_categoria * _base_clave + desde,
+                                                   id_categoria * _base_clave + hasta + 1])
+            cortes.append(datos.slice(inicio, fin - inicio))
+        # concat_tables solo junta los bloques de cada corte
+        return pa.concat_tables(cortes) if cortes else datos.slice(0, 0)
+
+    def leer_filtrado(self, tabla, ids, desde, hasta):
+        """Filas de las categorías `ids` entre desde y hasta, como consultas.leer_filtrado."""
+        import pyarrow as pa
+
+        corte = self.cortar(tabla, ids, desde, hasta)
+        nombres = corte.column("categoria_nombre").cast(pa.string())
+        corte = corte.set_column(corte.schema.get_field_index("categoria_nombre"), "categoria_nombre", nombres)
+
+        df = corte.to_pandas()
+        # Mismos tipos y orden que devuelve consultas.leer_tabla
+        df = df.astype({"id_tarifa": "int64", "id_categoria": "int64", "periodo": "int64", "fecha": _tipo_fecha})
+        return df.sort_values(["periodo", "categoria_nombre"], kind="stable", ignore_index=True)
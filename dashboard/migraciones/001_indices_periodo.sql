@@ -0,0 +1,44 @@
+-- Índices por (categoría, periodo) para `tarifa` y `tarifa_nivel`
+--
+-- Ejecutar una vez sobre la base ya importada desde tarifas_energia.sql:
+--   mysql -u usuario -p nombre_base < dashboard/migraciones/001_indices_periodo.sql
+--
+-- 1. Borra los meses repetidos: queda la primera fila cargada, la de menor id_tarifa.
+--    En tarifas_energia.sql la repetida es la que está mal (revisado contra los CSV
+--    mensuales y los PDF). Se borran:
+--    tarifa       3694 Industrial y Comercial            202306  911.23 / 884.28 / 857.33 (ENEL)
+--    tarifa       3695 ESPD*                             202306  835.29 / 810.59 / 785.89 (ENEL)
+--    tarifa       3696 Oficial y Exentos de Contribucion 202306  759.36 / 736.90 / 714.44 (ENEL)
+--    tarifa_nivel  535 Industrial y Comercial 2 3 4      201909  518.85 ... (las de octubre de 2019)
+--    tarifa_nivel  536 Oficial y Exentos 2 3 4           201909  432.38 ... (las de octubre de 2019)
+--    Quedan 3687-3689 (EPM, como 2023/2023-06.csv) y 533-534 (como 2019/2019-09.pdf).
+-- 2. Agrega la clave única (id_categoria, periodo): impide volver a cargar un mes dos veces.
+-- 3. Agrega un índice que cubre las consultas del dashboard, ordenado por periodo,
+--    para que los rangos de fechas se resuelvan solo con el índice.
+-- 4. Quita la KEY `id_categoria`; la llave foránea queda cubierta por la clave única.
+
+START TRANSACTION;
+
+DELETE t FROM `tarifa` t
+JOIN `tarifa` r ON r.id_categoria = t.id_categoria AND r.periodo = t.periodo AND r.id_tarifa < t.id_tarifa;
+
+DELETE tn FROM `tarifa_nivel` tn
+JOIN `tarifa_nivel` r ON r.id_categoria = tn.id_categoria AND r.periodo = tn.periodo AND r.id_tarifa < tn.id_tarifa;
+
+COMMIT;
+
+ALTER TABLE `tarifa`
+  ADD UNIQUE KEY `uk_tarifa_categoria_periodo` (`id_categoria`, `periodo`),
+  ADD KEY `idx_tarifa_periodo` (`periodo`, `id_categoria`, `propiedad_epm`, `propiedad_compartido`, `propiedad_cliente`);
+
+ALTER TABLE `tarifa`
+  DROP KEY `id_categoria`;
+
+ALTER TABLE `tarifa_nivel`
+  ADD UNIQUE KEY `uk_tarifa_nivel_categoria_periodo` (`id_categoria`, `periodo`),
+  ADD KEY `idx_tarifa_nivel_periodo` (`periodo`, `id_categoria`, `nivel_ii_punta`, `nivel_ii_fuera_de_punta`,
+                                      `nivel_iii_punta`, `nivel_iii_fuera_de_punta`, `nivel_iv_punta`,
+                                      `nivel_iv_fuera_de_punta`);
+
+ALTER TABLE `tarifa_nivel`
+  DROP KEY `id_categoria`;
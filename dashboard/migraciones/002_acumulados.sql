@@ -0,0 +1,94 @@
+-- Tablas de acumulados por (categoría, periodo) para las estadísticas del dashboard
+--
+-- Ejecutar después de 001_indices_periodo.sql:
+--   mysql -u usuario -p nombre_base < dashboard/migraciones/002_acumulados.sql
+--
+-- Cada fila guarda el valor del periodo y, por columna de valores, la suma y la
+-- suma de cuadrados acumuladas de la categoría hasta ese periodo (n = filas
+-- acumuladas). cargar.py y actualizar.py las recalculan en cada carga
+-- (tarifas/agregados.py); aquí se llenan por primera vez.
+-- Requiere funciones de ventana (MariaDB 10.2+ / MySQL 8+).
+
+CREATE TABLE IF NOT EXISTS `tarifa_acumulado` (
+  `id_categoria` int(11) NOT NULL,
+  `periodo` int(11) NOT NULL,
+  `n` int(11) NOT NULL,
+  `propiedad_epm` decimal(10,2) NOT NULL,
+  `suma_propiedad_epm` decimal(18,2) NOT NULL,
+  `suma2_propiedad_epm` decimal(24,4) NOT NULL,
+  `propiedad_compartido` decimal(10,2) NOT NULL,
+  `suma_propiedad_compartido` decimal(18,2) NOT NULL,
+  `suma2_propiedad_compartido` decimal(24,4) NOT NULL,
+  `propiedad_cliente` decimal(10,2) NOT NULL,
+  `suma_propiedad_cliente` decimal(18,2) NOT NULL,
+  `suma2_propiedad_cliente` decimal(24,4) NOT NULL,
+  PRIMARY KEY (`id_categoria`, `periodo`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TABLE IF NOT EXISTS `tarifa_nivel_acumulado` (
+  `id_categoria` int(11) NOT NULL,
+  `periodo` int(11) NOT NULL,
+  `n` int(11) NOT NULL,
+  `nivel_ii_punta` decimal(10,2) NOT NULL,
+  `suma_nivel_ii_punta` decimal(18,2) NOT NULL,
+  `suma2_nivel_ii_punta` decimal(24,4) NOT NULL,
+  `nivel_ii_fuera_de_punta` decimal(10,2) NOT NULL,
+  `suma_nivel_ii_fuera_de_punta` decimal(18,2) NOT NULL,
+  `suma2_nivel_ii_fuera_de_punta` decimal(24,4) NOT NULL,
+  `nivel_iii_punta` decimal(10,2) NOT NULL,
+  `suma_nivel_iii_punta` decimal(18,2) NOT NULL,
+  `suma2_nivel_iii_punta` decimal(24,4) NOT NULL,
+  `nivel_iii_fuera_de_punta` decimal(10,2) NOT NULL,
+  `suma_nivel_iii_fuera_de_punta` decimal(18,2) NOT NULL,
+  `suma2_nivel_iii_fuera_de_punta` decimal(24,4) NOT NULL,
+  `nivel_iv_punta` decimal(10,2) NOT NULL,
+  `suma_nivel_iv_punta` decimal(18,2) NOT NULL,
+  `suma2_nivel_iv_punta` decimal(24,4) NOT NULL,
+  `nivel_iv_fuera_de_punta` decimal(10,2) NOT NULL,
+  `suma_nivel_iv_fuera_de_punta` decimal(18,2) NOT NULL,
+  `suma2_nivel_iv_fuera_de_punta` decimal(24,4) NOT NULL,
+  PRIMARY KEY (`id_categoria`, `periodo`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+START TRANSACTION;
+
+DELETE FROM `tarifa_acumulado`;
+INSERT INTO `tarifa_acumulado`
+SELECT id_categoria, periodo,
+       COUNT(*) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       propiedad_epm,
+       SUM(propiedad_epm) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       SUM(propiedad_epm * propiedad_epm) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       propiedad_compartido,
+       SUM(propiedad_compartido) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       SUM(propiedad_compartido * propiedad_compartido) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       propiedad_cliente,
+       SUM(propiedad_cliente) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       SUM(propiedad_cliente * propiedad_cliente) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING)
+FROM `tarifa`;
+
+DELETE FROM `tarifa_nivel_acumulado`;
+INSERT INTO `tarifa_nivel_acumulado`
+SELECT id_categoria, periodo,
+       COUNT(*) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       nivel_ii_punta,
+       SUM(nivel_ii_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       SUM(nivel_ii_punta * nivel_ii_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       nivel_ii_fuera_de_punta,
+       SUM(nivel_ii_fuera_de_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       SUM(nivel_ii_fuera_de_punta * nivel_ii_fuera_de_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       nivel_iii_punta,
+       SUM(nivel_iii_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       SUM(nivel_iii_punta * nivel_iii_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       nivel_iii_fuera_de_punta,
+       SUM(nivel_iii_fuera_de_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       SUM(nivel_iii_fuera_de_punta * nivel_iii_fuera_de_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       nivel_iv_punta,
+       SUM(nivel_iv_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       SUM(nivel_iv_punta * nivel_iv_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       nivel_iv_fuera_de_punta,
+       SUM(nivel_iv_fuera_de_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING),
+       SUM(nivel_iv_fuera_de_punta * nivel_iv_fuera_de_punta) OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING)
+FROM `tarifa_nivel`;
+
+COMMIT;
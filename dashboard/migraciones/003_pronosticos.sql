@@ -0,0 +1,20 @@
+-- Tabla de pronósticos por (categoría, propiedad) que lee la pestaña de predicción
+--
+--   mysql -u usuario -p nombre_base < dashboard/migraciones/003_pronosticos.sql
+--
+-- La llena dashboard/pronosticar.py: metodo 'base' (suavizado exponencial,
+-- segundos) o 'prophet' (un modelo por serie). `propiedad` es el nombre de la
+-- columna pronosticada (propiedad_epm, nivel_ii_punta, ...) y `periodo` el mes
+-- pronosticado en formato AAAAMM, como en tarifa.
+
+CREATE TABLE IF NOT EXISTS `pronostico` (
+  `metodo` varchar(16) NOT NULL,
+  `id_categoria` int(11) NOT NULL,
+  `propiedad` varchar(32) NOT NULL,
+  `periodo` int(11) NOT NULL,
+  `yhat` decimal(12,2) NOT NULL,
+  `yhat_inferior` decimal(12,2) NOT NULL,
+  `yhat_superior` decimal(12,2) NOT NULL,
+  `generado` datetime NOT NULL,
+  PRIMARY KEY (`metodo`, `propiedad`, `id_categoria`, `periodo`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
@@ -0,0 +1,102 @@
+-- Tabla larga tarifa_valor (un valor por categoría, periodo y dimensión), particionada por año
+--
+-- Ejecutar después de 001, 002 y 003:
+--   mysql -u usuario -p nombre_base < dashboard/migraciones/004_tarifa_valor.sql
+--
+-- 1. Crea tarifa_valor (id_categoria, periodo, dimension, valor); dimension es el
+--    nombre de la columna de antes (propiedad_epm, nivel_ii_punta, ...). Una
+--    dimensión nueva son filas nuevas, sin ALTER TABLE.
+-- 2. Copia los valores de `tarifa` y `tarifa_nivel`.
+-- 3. Renombra las tablas anchas a tarifa_ancha y tarifa_nivel_ancha (quedan de respaldo).
+-- 4. Crea las vistas `tarifa` y `tarifa_nivel` con las columnas de antes, para las
+--    consultas del dashboard y los acumulados de 002. Son un JOIN por dimensión
+--    (ALGORITHM=MERGE, sin GROUP BY): el filtro por periodo llega a tarifa_valor
+--    y solo se leen las particiones de esos años.
+--
+-- cargar.py y actualizar.py escriben en tarifa_valor cuando existe (tarifas/valores.py).
+-- Las tablas particionadas no admiten llaves foráneas: id_categoria ya no se valida
+-- contra categoria (tarifas/carga.py crea las categorías antes de insertar).
+-- Las particiones llegan a 2030; después las filas van a p_futuro. Para agregar un año:
+--   ALTER TABLE tarifa_valor REORGANIZE PARTITION p_futuro INTO (
+--     PARTITION p2031 VALUES LESS THAN (203200), PARTITION p_futuro VALUES LESS THAN MAXVALUE);
+-- python benchmarks/verificar_indices.py revisa índices y particiones con EXPLAIN.
+
+CREATE TABLE `tarifa_valor` (
+  `id_categoria` int(11) NOT NULL,
+  `periodo` int(11) NOT NULL,
+  `dimension` varchar(32) NOT NULL,
+  `valor` decimal(10,2) NOT NULL,
+  PRIMARY KEY (`dimension`, `id_categoria`, `periodo`),
+  KEY `idx_tarifa_valor_periodo` (`dimension`, `periodo`, `id_categoria`, `valor`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+PARTITION BY RANGE (`periodo`) (
+  PARTITION p_anterior VALUES LESS THAN (201400),
+  PARTITION p2014 VALUES LESS THAN (201500),
+  PARTITION p2015 VALUES LESS THAN (201600),
+  PARTITION p2016 VALUES LESS THAN (201700),
+  PARTITION p2017 VALUES LESS THAN (201800),
+  PARTITION p2018 VALUES LESS THAN (201900),
+  PARTITION p2019 VALUES LESS THAN (202000),
+  PARTITION p2020 VALUES LESS THAN (202100),
+  PARTITION p2021 VALUES LESS THAN (202200),
+  PARTITION p2022 VALUES LESS THAN (202300),
+  PARTITION p2023 VALUES LESS THAN (202400),
+  PARTITION p2024 VALUES LESS THAN (202500),
+  PARTITION p2025 VALUES LESS THAN (202600),
+  PARTITION p2026 VALUES LESS THAN (202700),
+  PARTITION p2027 VALUES LESS THAN (202800),
+  PARTITION p2028 VALUES LESS THAN (202900),
+  PARTITION p2029 VALUES LESS THAN (203000),
+  PARTITION p2030 VALUES LESS THAN (203100),
+  PARTITION p_futuro VALUES LESS THAN MAXVALUE
+);
+
+START TRANSACTION;
+
+INSERT INTO `tarifa_valor` (id_categoria, periodo, dimension, valor)
+SELECT id_categoria, periodo, 'propiedad_epm', propiedad_epm FROM `tarifa` WHERE propiedad_epm IS NOT NULL
+UNION ALL
+SELECT id_categoria, periodo, 'propiedad_compartido', propiedad_compartido FROM `tarifa` WHERE propiedad_compartido IS NOT NULL
+UNION ALL
+SELECT id_categoria, periodo, 'propiedad_cliente', propiedad_cliente FROM `tarifa` WHERE propiedad_cliente IS NOT NULL;
+
+INSERT INTO `tarifa_valor` (id_categoria, periodo, dimension, valor)
+SELECT id_categoria, periodo, 'nivel_ii_punta', nivel_ii_punta FROM `tarifa_nivel` WHERE nivel_ii_punta IS NOT NULL
+UNION ALL
+SELECT id_categoria, periodo, 'nivel_ii_fuera_de_punta', nivel_ii_fuera_de_punta FROM `tarifa_nivel` WHERE nivel_ii_fuera_de_punta IS NOT NULL
+UNION ALL
+SELECT id_categoria, periodo, 'nivel_iii_punta', nivel_iii_punta FROM `tarifa_nivel` WHERE nivel_iii_punta IS NOT NULL
+UNION ALL
+SELECT id_categoria, periodo, 'nivel_iii_fuera_de_punta', nivel_iii_fuera_de_punta FROM `tarifa_nivel` WHERE nivel_iii_fuera_de_punta IS NOT NULL
+UNION ALL
+SELECT id_categoria, periodo, 'nivel_iv_punta', nivel_iv_punta FROM `tarifa_nivel` WHERE nivel_iv_punta IS NOT NULL
+UNION ALL
+SELECT id_categoria, periodo, 'nivel_iv_fuera_de_punta', nivel_iv_fuera_de_punta FROM `tarifa_nivel` WHERE nivel_iv_fuera_de_punta IS NOT NULL;
+
+COMMIT;
+
+RENAME TABLE `tarifa` TO `tarifa_ancha`, `tarifa_nivel` TO `tarifa_nivel_ancha`;
+
+-- id_tarifa ya no es autoincremental: sale de periodo e id_categoria (único por fila)
+CREATE ALGORITHM=MERGE VIEW `tarifa` AS
+SELECT a.periodo * 1000 + a.id_categoria AS id_tarifa, a.id_categoria,
+       a.valor AS propiedad_epm, b.valor AS propiedad_compartido, c.valor AS propiedad_cliente,
+       a.periodo
+FROM `tarifa_valor` a
+LEFT JOIN `tarifa_valor` b ON b.dimension = 'propiedad_compartido' AND b.id_categoria = a.id_categoria AND b.periodo = a.periodo
+LEFT JOIN `tarifa_valor` c ON c.dimension = 'propiedad_cliente' AND c.id_categoria = a.id_categoria AND c.periodo = a.periodo
+WHERE a.dimension = 'propiedad_epm';
+
+CREATE ALGORITHM=MERGE VIEW `tarifa_nivel` AS
+SELECT a.periodo * 1000 + a.id_categoria AS id_tarifa, a.id_categoria,
+       a.valor AS nivel_ii_punta, b.valor AS nivel_ii_fuera_de_punta,
+       c.valor AS nivel_iii_punta, d.valor AS nivel_iii_fuera_de_punta,
+       e.valor AS nivel_iv_punta, f.valor AS nivel_iv_fuera_de_punta,
+       a.periodo
+FROM `tarifa_valor` a
+LEFT JOIN `tarifa_valor` b ON b.dimension = 'nivel_ii_fuera_de_punta' AND b.id_categoria = a.id_categoria AND b.periodo = a.periodo
+LEFT JOIN `tarifa_valor` c ON c.dimension = 'nivel_iii_punta' AND c.id_categoria = a.id_categoria AND c.periodo = a.periodo
+LEFT JOIN `tarifa_valor` d ON d.dimension = 'nivel_iii_fuera_de_punta' AND d.id_categoria = a.id_categoria AND d.periodo = a.periodo
+LEFT JOIN `tarifa_valor` e ON e.dimension = 'nivel_iv_punta' AND e.id_categoria = a.id_categoria AND e.periodo = a.periodo
+LEFT JOIN `tarifa_valor` f ON f.dimension = 'nivel_iv_fuera_de_punta' AND f.id_categoria = a.id_categoria AND f.periodo = a.periodo
+WHERE a.dimension = 'nivel_ii_punta';
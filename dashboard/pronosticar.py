@@ -0,0 +1,37 @@
+import os
+import argparse
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from consultas import columnas, leer_tarifas
+from pronosticos import meses_futuros
+from pronosticos_lote import calcular_y_guardar, metodos
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pronostica cada (categoría, propiedad) de tarifa y tarifa_nivel y lo guarda en la tabla pronostico.")
+    parser.add_argument("--metodo", choices=list(metodos), default="base",
+                        help="base: suavizado exponencial en NumPy (segundos); prophet: un Prophet por serie")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos para prophet (por defecto, uno por CPU)")
+    parser.add_argument("--meses", type=int, default=meses_futuros, help="Meses a pronosticar")
+    parser.add_argument("--env", required=True,
+                        help="Archivo .env con DATABASE_URL de la base donde guardar los pronósticos (sin valor por "
+                             "defecto: dashboard/.env es la base del dashboard en producción)")
+    args = parser.parse_args()
+
+    load_dotenv(args.env)
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit(f"DATABASE_URL no está configurado en {args.env}")
+
+    engine = create_engine(database_url)
+    df_tarifas, df_niveles = leer_tarifas(engine)
+    tablas_valor = {"tarifa": (df_tarifas, columnas["tarifa"]), "tarifa_nivel": (df_niveles, columnas["tarifa_nivel"])}
+    resultado = calcular_y_guardar(engine, tablas_valor, args.metodo, args.meses, args.procesos)
+    print(f"{metodos[args.metodo]}: {resultado['series']} series, {resultado['filas']} filas "
+          f"en {resultado['segundos_calculo']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Pronósticos de Prophet guardados por serie.
+
+Ajustar un Prophet tarda varios segundos, y la serie casi nunca cambia entre
+una interacción y otra del dashboard. Cada pronóstico se identifica con el
+hash de la serie (fecha, valor) y del tipo de propiedad, y se guarda en
+disco (un JSON con los parámetros del modelo ajustado,
+prophet.serialize.model_to_json, y la predicción) y en memoria, donde solo
+quedan las `maximo_memoria` predicciones usadas más recientemente.
+
+Además se pueden precalcular pronósticos en un hilo aparte después de cargar
+los datos, para que la pestaña de predicción los encuentre listos.
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from esquema import precios_float64
+
+# Carpeta por defecto de los pronósticos guardados (relativa al directorio de trabajo)
+directorio_pronosticos = ".cache_pronosticos"
+
+# Cambiarla invalida los pronósticos guardados (por ejemplo, si cambia la configuración del modelo)
+version_pronostico = 2
+
+# Meses a pronosticar después del último dato
+meses_futuros = 6
+
+# Predicciones que se guardan en memoria (las demás se vuelven a leer de disco)
+maximo_memoria = 128
+
+
+def serie_prophet(df, tipo_propiedad):
+    """Serie con las columnas ds, y que espera Prophet."""
+    serie = df[['fecha', tipo_propiedad]].rename(columns={'fecha': 'ds', tipo_propiedad: 'y'})
+    # Los precios llegan en float32 (esquema.py); Prophet y el hash usan los valores exactos
+    serie['y'] = precios_float64(serie['y'])
+    return serie
+
+
+def clave_serie(serie, tipo_propiedad):
+    """Hash SHA-256 de los valores de la serie, el tipo de propiedad y la configuración."""
+    h = hashlib.sha256(f"{version_pronostico}|{meses_futuros}|{tipo_propiedad}".encode("utf-8"))
+    h.update(pd.to_datetime(serie['ds']).to_numpy(dtype="datetime64[ns]").tobytes())
+    h.update(serie['y'].to_numpy(dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def ajustar(serie):
+    """Ajusta un Prophet y predice meses_futuros meses; devuelve (modelo, prediccion)."""
+    # Importar prophet tarda; así solo se paga cuando de verdad hay que ajustar
+    from prophet import Prophet
+
+    modelo = Prophet()
+    modelo.fit(serie)
+    futuro = modelo.make_future_dataframe(periods=meses_futuros, freq='MS')
+    return modelo, modelo.predict(futuro)
+
+
+class CachePronosticos:
+    """Pronósticos por clave de serie, en disco y en un LRU en memoria, con precálculo en segundo plano."""
+
+    def __init__(self, directorio=directorio_pronosticos, hilos=1, maximo=maximo_memoria):
+        self.directorio = directorio
+        self.hilos = hilos
+        self.maximo = maximo
+        self.aciertos = 0
+        self.ajustes = 0
+        self._memoria = OrderedDict()
+        self._pendientes = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta_entrada(self, clave):
+        return os.path.join(self.directorio, f"{clave}.json")
+
+    def _recordar(self, clave, prediccion):
+        """Guarda la predicción en memoria y descarta la usada hace más tiempo si se pasa del máximo."""
+        with self._lock:
+            self._memoria[clave] = prediccion
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.maximo:
+                self._memoria.popitem(last=False)
+
+    def obtener(self, clave):
+        """Predicción guardada para la clave, o None."""
+        with self._lock:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                return self._memoria[clave]
+        try:
+            with open(self._ruta_entrada(clave), encoding="utf-8") as archivo:
+                entrada = json.load(archivo)
+        except (OSError, ValueError):
+            return None
+        prediccion = pd.DataFrame(entrada["prediccion"])
+        prediccion['ds'] = pd.to_datetime(prediccion['ds'])
+        self._recordar(clave, prediccion)
+        return prediccion
+
+    def modelo(self, clave):
+        """Modelo ajustado de la clave reconstruido desde disco, o None."""
+        from prophet.serialize import model_from_json
+
+        try:
+            with open(self._ruta_entrada(clave), encoding="utf-8") as archivo:
+                return model_from_json(json.load(archivo)["modelo"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _guardar(self, clave, modelo, prediccion):
+        """Guarda parámetros y predicción de forma atómica (archivo temporal + rename)."""
+        from prophet.serialize import model_to_json
+
+        columnas = prediccion.copy()
+        columnas['ds'] = columnas['ds'].dt.strftime('%Y-%m-%d')
+        entrada = {"modelo": model_to_json(modelo), "prediccion": columnas.to_dict(orient="list")}
+        ruta_entrada = self._ruta_entrada(clave)
+        temporal = f"{ruta_entrada}.{threading.get_ident()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(entrada, archivo)
+        os.replace(temporal, ruta_entrada)
+        self._recordar(clave, prediccion)
+
+    def _calcular(self, clave, serie):
+        prediccion = self.obtener(clave)
+        if prediccion is not None:
+            return prediccion
+        modelo, prediccion = ajustar(serie)
+        self._guardar(clave, modelo, prediccion)
+        with self._lock:
+            self.ajustes += 1
+        return prediccion
+
+    def pronosticar(self, df, tipo_propiedad):
+        """Predicción de la serie; si ya se está calculando en segundo plano, la espera."""
+        serie = serie_prophet(df, tipo_propiedad)
+        clave = clave_serie(serie, tipo_propiedad)
+        prediccion = self.obtener(clave)
+        if prediccion is not None:
+            with self._lock:
+                self.aciertos += 1
+            return prediccion
+        with self._lock:
+            pendiente = self._pendientes.get(clave)
+        if pendiente is not None:
+            return pendiente.result()
+        return self._calcular(clave, serie)
+
+    def precalcular(self, series):
+        """Encola en segundo plano las series [(df, tipo_propiedad), ...] que no estén guardadas."""
+        encoladas = 0
+        for df, tipo_propiedad in series:
+            serie = serie_prophet(df, tipo_propiedad)
+            clave = clave_serie(serie, tipo_propiedad)
+            with self._lock:
+                if clave in self._memoria or clave in self._pendientes:
+                    continue
+            if os.path.exists(self._ruta_entrada(clave)):
+                continue
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="pronosticos")
+                futuro = self._pool.submit(self._calcular, clave, serie)
+                self._pendientes[clave] = futuro
+            futuro.add_done_callback(lambda _, clave=clave: self._terminar(clave))
+            encoladas += 1
+        return encoladas
+
+    def _terminar(self, clave):
+        with self._lock:
+            self._pendientes.pop(clave, None)
+
+    def pendientes(self):
+        with self._lock:
+            return len(self._pendientes)
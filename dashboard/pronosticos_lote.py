@@ -0,0 +1,195 @@
+"""Pronósticos en lote: un modelo por (categoría, propiedad), guardados en la tabla pronostico.
+
+Dos métodos:
+- "base": suavizado exponencial de Holt con tendencia amortiguada, vectorizado
+  en NumPy sobre todas las series a la vez (una matriz series x meses). Tarda
+  milisegundos, así que sirve de vista previa inmediata cuando la tabla todavía
+  no tiene pronósticos para la selección.
+- "prophet": un Prophet por serie, repartidos en un pool de procesos.
+
+pronosticar.py calcula y guarda; el dashboard lee la tabla
+(consultas.leer_pronosticos) y prefiere "prophet" cuando existe.
+"""
+import time
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from pronosticos import meses_futuros
+
+tabla_pronostico = "pronostico"
+
+metodos = {"base": "Suavizado exponencial (Holt amortiguado)", "prophet": "Prophet"}
+
+columnas_pronostico = ["metodo", "id_categoria", "propiedad", "periodo", "yhat", "yhat_inferior", "yhat_superior"]
+
+# Series sin datos en los últimos meses (categorías que ya no se publican) no se pronostican
+meses_sin_datos = 12
+
+
+def _mes(periodos):
+    """AAAAMM -> número de mes consecutivo."""
+    periodos = np.asarray(periodos)
+    return (periodos // 100) * 12 + periodos % 100 - 1
+
+
+def _periodo(meses):
+    meses = np.asarray(meses)
+    return (meses // 12) * 100 + meses % 12 + 1
+
+
+def matriz_series(df, columnas_valor):
+    """(claves [(id_categoria, propiedad)], primer mes, matriz series x meses con NaN donde falta)."""
+    meses = _mes(df["periodo"].to_numpy())
+    inicio = meses.min()
+    ids = np.sort(df["id_categoria"].unique())
+    fila_categoria = np.searchsorted(ids, df["id_categoria"].to_numpy())
+    matriz = np.full((len(ids) * len(columnas_valor), meses.max() - inicio + 1), np.nan)
+    claves = []
+    for i, columna in enumerate(columnas_valor):
+        matriz[i * len(ids) + fila_categoria, meses - inicio] = df[columna].to_numpy(dtype=np.float64)
+        claves += [(int(id_categoria), columna) for id_categoria in ids]
+    return claves, inicio, matriz
+
+
+def suavizado_holt(matriz, horizonte=meses_futuros, alfa=0.5, beta=0.1, phi=0.98):
+    """Holt amortiguado sobre cada fila de la matriz; devuelve (yhat, inferior, superior), series x horizonte.
+
+    Los NaN (meses sin dato) avanzan el nivel con la tendencia sin corregirlo.
+    El intervalo es ±1,96 veces el error cuadrático medio a un paso por raíz de h.
+    """
+    filas, columnas = matriz.shape
+    validos = ~np.isnan(matriz)
+    primero = np.where(validos.any(axis=1), validos.argmax(axis=1), columnas)
+    nivel = matriz[np.arange(filas), np.minimum(primero, columnas - 1)]
+    tendencia = np.zeros(filas)
+    suma_errores = np.zeros(filas)
+    n_errores = np.zeros(filas)
+    for j in range(columnas):
+        activas = j > primero
+        prediccion = nivel + phi * tendencia
+        observadas = activas & validos[:, j]
+        error = np.where(observadas, matriz[:, j] - prediccion, 0.0)
+        nivel = np.where(activas, prediccion + alfa * error, nivel)
+        tendencia = np.where(activas, phi * tendencia + alfa * beta * error, tendencia)
+        suma_errores += error ** 2
+        n_errores += observadas
+
+    pasos = np.arange(1, horizonte + 1)
+    amortiguamiento = np.cumsum(phi ** pasos)
+    yhat = nivel[:, None] + tendencia[:, None] * amortiguamiento[None, :]
+    sigma = np.sqrt(suma_errores / np.maximum(n_errores, 1))
+    margen = 1.96 * sigma[:, None] * np.sqrt(pasos)[None, :]
+    return yhat, yhat - margen, yhat + margen
+
+
+def _series_vigentes(matriz):
+    validos = ~np.isnan(matriz)
+    ultimo = matriz.shape[1] - 1 - validos[:, ::-1].argmax(axis=1)
+    return validos.any(axis=1) & (ultimo >= matriz.shape[1] - meses_sin_datos)
+
+
+def _largo(claves, meses, yhat, inferior, superior, metodo):
+    """Filas de la tabla pronostico a partir de arreglos series x horizonte."""
+    horizonte = len(meses)
+    return pd.DataFrame({
+        "metodo": metodo,
+        "id_categoria": np.repeat([id_categoria for id_categoria, _ in claves], horizonte),
+        "propiedad": np.repeat([propiedad for _, propiedad in claves], horizonte),
+        "periodo": np.tile(_periodo(meses), len(claves)),
+        "yhat": np.ravel(yhat),
+        "yhat_inferior": np.ravel(inferior),
+        "yhat_superior": np.ravel(superior),
+    }, columns=columnas_pronostico)
+
+
+def pronostico_base(df, columnas_valor, horizonte=meses_futuros):
+    """Pronóstico "base" de todas las (categoría, propiedad) de df, en formato de la tabla."""
+    if df.empty:
+        return pd.DataFrame(columns=columnas_pronostico)
+    claves, inicio, matriz = matriz_series(df, columnas_valor)
+    vigentes = _series_vigentes(matriz)
+    yhat, inferior, superior = suavizado_holt(matriz[vigentes], horizonte)
+    meses = inicio + matriz.shape[1] + np.arange(horizonte)
+    claves = [clave for clave, vigente in zip(claves, vigentes) if vigente]
+    return _largo(claves, meses, yhat, inferior, superior, "base")
+
+
+def _ajustar_serie(argumentos):
+    """Ajusta un Prophet a una serie (se ejecuta en otro proceso)."""
+    indice, meses, valores, meses_pronostico = argumentos
+    from prophet import Prophet
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    fechas = pd.to_datetime([f"{p}01" for p in _periodo(meses)], format="%Y%m%d")
+    modelo = Prophet()
+    modelo.fit(pd.DataFrame({"ds": fechas, "y": valores}))
+    futuro = pd.DataFrame({"ds": pd.to_datetime([f"{p}01" for p in _periodo(meses_pronostico)], format="%Y%m%d")})
+    prediccion = modelo.predict(futuro)
+    return (indice, prediccion["yhat"].to_numpy(), prediccion["yhat_lower"].to_numpy(),
+            prediccion["yhat_upper"].to_numpy())
+
+
+def pronostico_prophet(df, columnas_valor, horizonte=meses_futuros, procesos=None):
+    """Un Prophet por (categoría, propiedad) vigente, en `procesos` procesos (None: uno por CPU)."""
+    if df.empty:
+        return pd.DataFrame(columns=columnas_pronostico)
+    claves, inicio, matriz = matriz_series(df, columnas_valor)
+    meses = inicio + matriz.shape[1] + np.arange(horizonte)
+    tareas = []
+    for indice in np.flatnonzero(_series_vigentes(matriz)):
+        validos = ~np.isnan(matriz[indice])
+        # Prophet necesita al menos dos puntos
+        if validos.sum() >= 2:
+            tareas.append((indice, inicio + np.flatnonzero(validos), matriz[indice, validos], meses))
+
+    if procesos == 1:
+        resultados = list(map(_ajustar_serie, tareas))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(_ajustar_serie, tareas))
+
+    indices = [indice for indice, *_ in resultados]
+    yhat, inferior, superior = (np.array([resultado[i] for resultado in resultados]).reshape(len(indices), horizonte)
+                                for i in (1, 2, 3))
+    return _largo([claves[indice] for indice in indices], meses, yhat, inferior, superior, "prophet")
+
+
+def calcular(df, columnas_valor, metodo="base", horizonte=meses_futuros, procesos=None):
+    if metodo == "base":
+        return pronostico_base(df, columnas_valor, horizonte)
+    if metodo == "prophet":
+        return pronostico_prophet(df, columnas_valor, horizonte, procesos)
+    raise ValueError(f"Método de pronóstico desconocido: {metodo}")
+
+
+def guardar(conexion, pronosticos, metodo):
+    """Reemplaza los pronósticos del método en la tabla; devuelve las filas escritas."""
+    conexion.execute(text(f"DELETE FROM {tabla_pronostico} WHERE metodo = :metodo"), {"metodo": metodo})
+    if pronosticos.empty:
+        return 0
+    generado = datetime.now().replace(microsecond=0)
+    filas = pronosticos.round({"yhat": 2, "yhat_inferior": 2, "yhat_superior": 2})
+    registros = [dict(fila, generado=generado) for fila in filas[columnas_pronostico].to_dict(orient="records")]
+    nombres = columnas_pronostico + ["generado"]
+    conexion.execute(
+        text(f"INSERT INTO {tabla_pronostico} ({', '.join(nombres)}) VALUES ({', '.join(':' + n for n in nombres)})"),
+        registros,
+    )
+    return len(filas)
+
+
+def calcular_y_guardar(engine, tablas_valor, metodo="base", horizonte=meses_futuros, procesos=None):
+    """Calcula los pronósticos de {tabla: (df, columnas)} y los guarda en una transacción."""
+    inicio = time.perf_counter()
+    pronosticos = pd.concat([calcular(df, columnas_valor, metodo, horizonte, procesos)
+                             for df, columnas_valor in tablas_valor.values()], ignore_index=True)
+    segundos_calculo = time.perf_counter() - inicio
+    with engine.begin() as conexion:
+        filas = guardar(conexion, pronosticos, metodo)
+    return {"series": pronosticos.groupby(["id_categoria", "propiedad"]).ngroups if filas else 0,
+            "filas": filas, "segundos_calculo": segundos_calculo}
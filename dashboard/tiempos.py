@@ -0,0 +1,23 @@
+"""Registro del tiempo de cálculo de cada pestaña del dashboard.
+
+Si REGISTRO_TIEMPOS tiene una ruta, cada medición se agrega a ese CSV
+(pestaña, segundos) para compararlas después con benchmarks/bench_pestanas.py.
+"""
+import os
+import csv
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def medir(nombre):
+    """Mide el bloque y lo agrega al CSV de REGISTRO_TIEMPOS (si está configurado)."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        ruta = os.getenv("REGISTRO_TIEMPOS")
+        if ruta:
+            with open(ruta, "a", newline="", encoding="utf-8") as archivo:
+                csv.writer(archivo).writerow([nombre, f"{segundos:.6f}"])
@@ -0,0 +1,88 @@
+import os
+import csv
+import glob
+import argparse
+from tarifas.cache import directorio_cache
+from tarifas.extraccion import (crear_cache, encabezados, extraer_paginas, lectura_por_defecto, lecturas,
+                                paginas_por_bloque, resumen_backends)
+from tarifas.formatos import formatos, formato_por_defecto
+from tarifas.texto import backend_por_defecto, backends
+
+# Archivos CSV de cada conjunto de filas
+csv_estratos = "tarifas_estratos.csv"
+csv_industriales = "tarifas_industriales.csv"
+
+
+def expandir_entradas(entradas):
+    """Rutas de PDF a partir de archivos, carpetas o patrones glob, sin repetir y en el orden dado.
+
+    Los patrones y las carpetas se expanden en orden alfabético, que para
+    unificados/AAAA.pdf y AAAA/AAAA-MM.pdf es el orden cronológico.
+    """
+    rutas = []
+    for entrada in entradas:
+        if glob.has_magic(entrada):
+            encontradas = sorted(glob.glob(entrada, recursive=True))
+        else:
+            encontradas = [entrada]
+        # Las carpetas (también las que resultan de un patrón como '20??/') aportan sus PDF
+        encontradas = [pdf for ruta in encontradas
+                       for pdf in (sorted(glob.glob(os.path.join(ruta, "*.pdf"))) if os.path.isdir(ruta) else [ruta])]
+        if not encontradas:
+            raise SystemExit(f"No hay PDF que coincidan con {entrada}")
+        rutas += [ruta for ruta in encontradas if ruta not in rutas]
+    for ruta in rutas:
+        if not os.path.isfile(ruta):
+            raise SystemExit(f"No existe el archivo {ruta}")
+    return rutas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrae las tarifas de los PDF de EPM a CSV.")
+    parser.add_argument("entradas", nargs="+",
+                        help="PDF, carpetas o patrones (p. ej. 'unificados/*.pdf' 2024/), en orden cronológico")
+    parser.add_argument("-p", "--procesos", type=int, default=1,
+                        help="Número de procesos para extraer páginas en paralelo")
+    parser.add_argument("--paginas-por-bloque", type=int, default=paginas_por_bloque,
+                        help="Páginas que procesa cada tarea del pool")
+    parser.add_argument("--formato", choices=sorted(formatos), default=formato_por_defecto,
+                        help="Formato (versión de diseño) de los PDF")
+    parser.add_argument("--backend", choices=backends, default=backend_por_defecto,
+                        help="Lector del texto; con pdfium las páginas dudosas se releen con pdfplumber")
+    parser.add_argument("--lectura", choices=lecturas, default=lectura_por_defecto,
+                        help="completa: todas las páginas enteras; clasificada: omite las de otros operadores "
+                             "de red; recortada: además lee solo las franjas de las tablas")
+    parser.add_argument("--estratos", default=csv_estratos, help="CSV de las tarifas de Nivel I")
+    parser.add_argument("--industriales", default=csv_industriales, help="CSV de las tarifas de Niveles II-IV")
+    parser.add_argument("--cache", default=directorio_cache,
+                        help="Carpeta de la caché de extracción")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="Extraer todas las páginas sin usar la caché")
+    args = parser.parse_args()
+
+    rutas = expandir_entradas(args.entradas)
+    cache = None if args.sin_cache else crear_cache(args.cache, args.formato)
+
+    # Las filas se escriben a medida que salen de cada página
+    filas = {1: 0, 2: 0}
+    estadisticas = {}
+    with open(args.estratos, mode="w", newline="", encoding="utf-8") as archivo_csv1, \
+            open(args.industriales, mode="w", newline="", encoding="utf-8") as archivo_csv2:
+        escritores = {1: csv.writer(archivo_csv1), 2: csv.writer(archivo_csv2)}
+        for conjunto, escritor in escritores.items():
+            escritor.writerow(encabezados[conjunto])
+
+        for fila in extraer_paginas(rutas, args.procesos, args.paginas_por_bloque, cache, args.formato,
+                                    args.backend, estadisticas, args.lectura):
+            escritores[fila.conjunto].writerow(fila.fila)
+            filas[fila.conjunto] += 1
+
+    print(f"{len(rutas)} PDF: {filas[1]} filas en {args.estratos}, {filas[2]} filas en {args.industriales}")
+    if estadisticas:
+        print(f"Texto: {resumen_backends(estadisticas)}")
+    if cache is not None:
+        print(cache.resumen())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Utilidades compartidas para extraer y procesar las tarifas de energía de EPM."""
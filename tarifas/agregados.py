@@ -0,0 +1,46 @@
+"""Acumulados por (categoría, periodo) para las estadísticas del dashboard.
+
+Por cada fila de `tarifa` / `tarifa_nivel` se guarda en `<tabla>_acumulado`
+el valor del periodo y, para cada columna de valores, la suma y la suma de
+cuadrados acumuladas desde el primer periodo de la categoría, más el número
+de filas acumuladas (n). Con dos filas de prefijo por categoría (la del
+último periodo del rango y la anterior a su inicio) se obtienen conteo,
+promedio y desviación estándar de cualquier rango de fechas sin recorrer
+las filas (ver dashboard/consultas.py).
+
+Se recalcula al cargar datos, dentro de la misma transacción de la carga.
+"""
+from sqlalchemy import text
+
+
+def tabla_acumulado(tabla):
+    return f"{tabla}_acumulado"
+
+
+def columnas_acumulado(columnas_tabla):
+    """Columnas de la tabla de acumulados, en orden, para las columnas de valores dadas."""
+    nombres = ["id_categoria", "periodo", "n"]
+    for columna in columnas_tabla:
+        nombres += [columna, f"suma_{columna}", f"suma2_{columna}"]
+    return nombres
+
+
+def recalcular_acumulados(conexion, tabla, columnas_tabla):
+    """Reconstruye <tabla>_acumulado a partir de la tabla; devuelve las filas escritas.
+
+    Usa funciones de ventana (MySQL 8, MariaDB 10.2 o SQLite 3.25 en adelante).
+    Las columnas de valores nunca son NULL (tarifas.carga descarta esas filas),
+    así que un solo contador n sirve para todas.
+    """
+    acumulado = tabla_acumulado(tabla)
+    ventana = "OVER (PARTITION BY id_categoria ORDER BY periodo ROWS UNBOUNDED PRECEDING)"
+    expresiones = ["id_categoria", "periodo", f"COUNT(*) {ventana}"]
+    for columna in columnas_tabla:
+        expresiones += [columna, f"SUM({columna}) {ventana}", f"SUM({columna} * {columna}) {ventana}"]
+
+    conexion.execute(text(f"DELETE FROM {acumulado}"))
+    resultado = conexion.execute(text(
+        f"INSERT INTO {acumulado} ({', '.join(columnas_acumulado(columnas_tabla))}) "
+        f"SELECT {', '.join(expresiones)} FROM {tabla}"
+    ))
+    return resultado.rowcount
@@ -0,0 +1,90 @@
+"""Caché en disco de la extracción de los PDF de tarifas.
+
+Los PDF publicados no cambian, así que el texto de cada página y las filas
+extraídas se guardan en un archivo JSON por PDF, identificado por el hash
+SHA-256 de su contenido. Las filas llevan además una firma de las expresiones
+regulares: si las expresiones cambian, las filas se recalculan a partir del
+texto guardado sin volver a abrir el PDF.
+"""
+import hashlib
+import json
+import os
+
+# Carpeta por defecto de la caché (relativa al directorio de trabajo)
+directorio_cache = ".cache_extraccion"
+
+
+def firma(*objetos):
+    """Calcula una firma estable de los objetos dados (por ejemplo, los diccionarios de regex)."""
+    contenido = json.dumps(objetos, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+def hash_archivo(ruta, tamano_bloque=1 << 20):
+    """Hash SHA-256 del contenido del archivo, leído por bloques."""
+    h = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(tamano_bloque), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+class CacheExtraccion:
+    """Guarda por PDF el texto de cada página y el resultado de extraer sus filas."""
+
+    def __init__(self, directorio=directorio_cache, firma_expresiones=""):
+        self.directorio = directorio
+        self.firma_expresiones = firma_expresiones
+        self.aciertos = 0        # Páginas cuyo resultado se tomó de la caché
+        self.aciertos_texto = 0  # Páginas con texto en caché pero filas recalculadas
+        self.fallos = 0          # Páginas que hubo que extraer del PDF
+        self.bytes_leidos = 0
+        self.bytes_escritos = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta_entrada(self, clave):
+        return os.path.join(self.directorio, f"{clave}.json")
+
+    def contiene(self, clave):
+        return os.path.exists(self._ruta_entrada(clave))
+
+    def obtener(self, clave):
+        """Devuelve (paginas, vigentes) del PDF con esa clave (ver hash_archivo).
+
+        Cada página es un dict con "texto" y "resultado". Si la firma de las
+        expresiones no coincide, vigentes es False y los resultados hay que
+        recalcularlos a partir del texto.
+        """
+        with open(self._ruta_entrada(clave), "rb") as archivo:
+            contenido = archivo.read()
+        self.bytes_leidos += len(contenido)
+        entrada = json.loads(contenido)
+
+        paginas = entrada["paginas"]
+        # Si las expresiones cambiaron, el texto sigue siendo válido pero las filas no
+        vigentes = entrada.get("firma") == self.firma_expresiones
+        if vigentes:
+            self.aciertos += len(paginas)
+        else:
+            self.aciertos_texto += len(paginas)
+        return paginas, vigentes
+
+    def guardar(self, clave, ruta, paginas):
+        """Guarda las páginas de un PDF de forma atómica (archivo temporal + rename)."""
+        entrada = {
+            "archivo": os.path.basename(ruta),
+            "firma": self.firma_expresiones,
+            "paginas": paginas,
+        }
+        contenido = json.dumps(entrada, ensure_ascii=False).encode("utf-8")
+        ruta_entrada = self._ruta_entrada(clave)
+        temporal = ruta_entrada + ".tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta_entrada)
+        self.bytes_escritos += len(contenido)
+
+    def resumen(self):
+        return (f"Caché: {self.aciertos} aciertos, {self.aciertos_texto} solo texto, "
+                f"{self.fallos} fallos, {self.bytes_leidos:,} bytes leídos, "
+                f"{self.bytes_escritos:,} bytes escritos")
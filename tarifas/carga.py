@@ -0,0 +1,220 @@
+"""Carga masiva de filas en las tablas tarifa y tarifa_nivel.
+
+Las filas llegan como las genera tarifas.extraccion.filas_con_periodo o como
+están en tarifas_nivel1.csv / tarifas_nivel2-3-4.csv: [categoría, valor, ...,
+periodo], donde el conjunto 1 va a `tarifa` y el conjunto 2 a `tarifa_nivel`.
+
+Los nombres de categoría se resuelven a id_categoria en memoria con una sola
+consulta. Las filas se suben por lotes (executemany o LOAD DATA LOCAL INFILE)
+a una tabla temporal y desde ahí se reemplazan en la tabla final con dos
+sentencias, así la carga se comporta como un upsert por (categoría, periodo).
+Si la base ya migró a la tabla larga (tarifas/valores.py), `tarifa` y
+`tarifa_nivel` son vistas y las filas se reemplazan en tarifa_valor.
+"""
+import os
+import re
+import csv
+import time
+import tempfile
+
+from sqlalchemy import inspect, text
+
+from tarifas.agregados import recalcular_acumulados, tabla_acumulado
+from tarifas.valores import reemplazar as reemplazar_valores, usa_valores
+
+tablas = {1: "tarifa", 2: "tarifa_nivel"}
+
+columnas = {
+    1: ["propiedad_epm", "propiedad_compartido", "propiedad_cliente"],
+    2: ["nivel_ii_punta", "nivel_ii_fuera_de_punta", "nivel_iii_punta",
+        "nivel_iii_fuera_de_punta", "nivel_iv_punta", "nivel_iv_fuera_de_punta"],
+}
+
+# Nombres del extractor que en la tabla categoria se guardaron distinto
+nombres_categoria = {
+    1: {"Oficial y Exentos de Contribución": "Oficial y Exentos de Contribucion"},
+    2: {"Industrial y Comercial": "Industrial y Comercial 2 3 4",
+        "Oficial y Exentos": "Oficial y Exentos 2 3 4"},
+}
+
+# Archivos CSV consolidados de cada conjunto (Latin-1, separados por ";")
+archivos_csv = {1: "tarifas_nivel1.csv", 2: "tarifas_nivel2-3-4.csv"}
+
+# Filas por cada executemany
+tamano_lote = 5000
+
+# Del PDF un valor siempre trae decimales; "1" o "47" salen de números partidos en el texto
+_valor_con_decimales = re.compile(r"^[\d,]*\d\.\d+$")
+_valor_numerico = re.compile(r"^\d[\d,]*(\.\d+)?$")
+
+
+def nombre_categoria(conjunto, categoria):
+    return nombres_categoria[conjunto].get(categoria, categoria)
+
+
+def convertir_valores(valores, exigir_decimales=True):
+    """Limpia espacios y separadores de miles; devuelve None si algún valor no es una tarifa.
+
+    Se dejan como texto para que la base los convierta a decimal(10,2) sin
+    pasar por float.
+    """
+    patron = _valor_con_decimales if exigir_decimales else _valor_numerico
+    valores = [valor.strip() for valor in valores]
+    if not all(patron.match(valor) for valor in valores):
+        return None
+    return [valor.replace(",", "") for valor in valores]
+
+
+def leer_csv(ruta):
+    """Filas de un CSV consolidado (Latin-1, ";"), sin el encabezado."""
+    with open(ruta, encoding="latin-1", newline="") as archivo:
+        lector = csv.reader(archivo, delimiter=";")
+        next(lector, None)
+        return [fila for fila in lector if fila]
+
+
+def periodos_cargados(conexion):
+    """Manifiesto de lo que ya está en la base: {conjunto: {periodo, ...}}."""
+    return {
+        conjunto: {fila[0] for fila in conexion.execute(text(f"SELECT DISTINCT periodo FROM {tabla}"))}
+        for conjunto, tabla in tablas.items()
+    }
+
+
+def ids_categoria(conexion, nombres):
+    """Resuelve los nombres a id_categoria, creando las categorías que no existan."""
+    ids = {nombre: id_categoria for id_categoria, nombre in
+           conexion.execute(text("SELECT id_categoria, nombre FROM categoria"))}
+    for nombre in sorted(set(nombres) - set(ids)):
+        conexion.execute(text("INSERT INTO categoria (nombre) VALUES (:nombre)"), {"nombre": nombre})
+        ids[nombre] = conexion.execute(
+            text("SELECT id_categoria FROM categoria WHERE nombre = :nombre"), {"nombre": nombre}
+        ).scalar_one()
+    return ids
+
+
+def preparar_registros(conexion, conjunto, filas, exigir_decimales=True):
+    """Convierte las filas en dicts listos para insertar; devuelve (registros, descartadas, repetidas).
+
+    Si una (categoría, periodo) se repite, queda la primera fila y las demás
+    se cuentan como repetidas: en tarifas_nivel1.csv la segunda fila de un
+    mes es la que está mal (las tres de ENEL en 202306).
+    """
+    nombres = [nombre_categoria(conjunto, fila[0].strip()) for fila in filas]
+    ids = ids_categoria(conexion, nombres)
+    registros = {}
+    descartadas = repetidas = 0
+
+    for nombre, fila in zip(nombres, filas):
+        valores = convertir_valores(fila[1:-1], exigir_decimales)
+        if valores is None or len(valores) != len(columnas[conjunto]):
+            descartadas += 1
+            continue
+        clave = (ids[nombre], int(fila[-1]))
+        if clave in registros:
+            repetidas += 1
+            continue
+        registro = dict(zip(columnas[conjunto], valores))
+        registro["id_categoria"], registro["periodo"] = clave
+        registros[clave] = registro
+    return list(registros.values()), descartadas, repetidas
+
+
+def _subir_executemany(conexion, tabla_temporal, nombres_columnas, registros, tamano):
+    consulta = text(f"INSERT INTO {tabla_temporal} ({', '.join(nombres_columnas)}) "
+                    f"VALUES ({', '.join(':' + c for c in nombres_columnas)})")
+    for inicio in range(0, len(registros), tamano):
+        conexion.execute(consulta, registros[inicio:inicio + tamano])
+
+
+def _subir_load_data(conexion, tabla_temporal, nombres_columnas, registros):
+    # Requiere crear el engine con connect_args={"allow_local_infile": True}
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as archivo:
+        escritor = csv.writer(archivo, lineterminator="\n")
+        for registro in registros:
+            escritor.writerow([registro[c] for c in nombres_columnas])
+    try:
+        ruta = archivo.name.replace("\\", "/")
+        conexion.execute(text(
+            f"LOAD DATA LOCAL INFILE '{ruta}' INTO TABLE {tabla_temporal} "
+            f"FIELDS TERMINATED BY ',' LINES TERMINATED BY '\\n' ({', '.join(nombres_columnas)})"
+        ))
+    finally:
+        os.remove(archivo.name)
+
+
+def cargar_filas(conexion, conjunto, filas, metodo="executemany", tamano=tamano_lote, exigir_decimales=True):
+    """Reemplaza en la tabla las filas dadas; devuelve (insertadas, descartadas, repetidas).
+
+    Se ejecuta dentro de la transacción de `conexion` (usar engine.begin()).
+    """
+    tabla = tablas[conjunto]
+    registros, descartadas, repetidas = preparar_registros(conexion, conjunto, filas, exigir_decimales)
+    if not registros:
+        return 0, descartadas, repetidas
+
+    mysql = conexion.dialect.name == "mysql"
+    tabla_temporal = f"tmp_carga_{tabla}"
+    nombres_columnas = ["id_categoria"] + columnas[conjunto] + ["periodo"]
+    definicion = ", ".join(["id_categoria INT"] + [f"{c} DECIMAL(10,2)" for c in columnas[conjunto]] + ["periodo INT"])
+    conexion.execute(text(f"CREATE TEMPORARY TABLE {tabla_temporal} ({definicion})"))
+
+    try:
+        if metodo == "load_data":
+            if not mysql:
+                raise ValueError("LOAD DATA LOCAL INFILE solo está disponible en MySQL")
+            _subir_load_data(conexion, tabla_temporal, nombres_columnas, registros)
+        else:
+            _subir_executemany(conexion, tabla_temporal, nombres_columnas, registros, tamano)
+
+        if usa_valores(conexion):
+            reemplazar_valores(conexion, tabla_temporal, columnas[conjunto])
+        else:
+            lista_columnas = ", ".join(nombres_columnas)
+            conexion.execute(text(
+                f"DELETE FROM {tabla} WHERE EXISTS (SELECT 1 FROM {tabla_temporal} s "
+                f"WHERE s.id_categoria = {tabla}.id_categoria AND s.periodo = {tabla}.periodo)"
+            ))
+            conexion.execute(text(
+                f"INSERT INTO {tabla} ({lista_columnas}) SELECT {lista_columnas} FROM {tabla_temporal}"
+            ))
+    finally:
+        # En MySQL un DROP TABLE sin TEMPORARY haría commit implícito
+        conexion.execute(text(f"DROP {'TEMPORARY ' if mysql else ''}TABLE {tabla_temporal}"))
+
+    return len(registros), descartadas, repetidas
+
+
+def actualizar_acumulados(conexion, conjuntos=tablas):
+    """Recalcula las tablas de acumulados de los conjuntos dados (ver tarifas.agregados).
+
+    Devuelve {tabla: filas escritas}. Las tablas de acumulados que no existen
+    (la base aún no corrió migraciones/002_acumulados.sql) se saltan y no
+    aparecen en el resultado: la carga sigue y el dashboard calcula las
+    estadísticas desde las filas.
+    """
+    existentes = inspect(conexion)
+    return {tablas[conjunto]: recalcular_acumulados(conexion, tablas[conjunto], columnas[conjunto])
+            for conjunto in conjuntos if existentes.has_table(tabla_acumulado(tablas[conjunto]))}
+
+
+def cargar_csv(engine, rutas=archivos_csv, metodo="executemany", tamano=tamano_lote):
+    """Carga los CSV consolidados y sus acumulados en una sola transacción; devuelve estadísticas por tabla."""
+    estadisticas = {}
+    inicio = time.perf_counter()
+    with engine.begin() as conexion:
+        for conjunto, ruta in rutas.items():
+            inicio_tabla = time.perf_counter()
+            insertadas, descartadas, repetidas = cargar_filas(conexion, conjunto, leer_csv(ruta), metodo, tamano,
+                                                              exigir_decimales=False)
+            estadisticas[tablas[conjunto]] = {
+                "insertadas": insertadas,
+                "descartadas": descartadas,
+                "repetidas": repetidas,
+                "segundos": time.perf_counter() - inicio_tabla,
+            }
+        inicio_acumulados = time.perf_counter()
+        estadisticas["acumulados"] = actualizar_acumulados(conexion, rutas)
+        estadisticas["acumulados_segundos"] = time.perf_counter() - inicio_acumulados
+    estadisticas["total_segundos"] = time.perf_counter() - inicio
+    return estadisticas
@@ -0,0 +1,203 @@
+"""Ingesta consolidada de los CSV de tarifas: los mensuales de 2014/ ... 2024/ y los consolidados.
+
+Hay dos formatos de archivo:
+- Mensual (AAAA/AAAA-MM.csv): UTF-8 con BOM, separado por ",", columnas
+  Sección, Subsección, Tipo, Propiedad EPM, Propiedad Compartido, Propiedad
+  Cliente y Periodo Consumo (AAAA-MM). Algunos nombres vienen escapados como
+  en Markdown (ESPD\\*). Solo trae tarifas de Nivel I.
+- Consolidado (tarifas_nivel1.csv, tarifas_nivel2-3-4.csv): Latin-1,
+  separado por ";", [categoría, valores..., periodo AAAAMM].
+
+consolidar() lee todos los archivos a la vez en un pool de hilos, con el
+módulo csv o con el lector CSV de Arrow (pyarrow, que lee fuera del GIL). Los
+archivos del repositorio son de 1 a 110 KB y el módulo csv los lee más rápido:
+Arrow solo compensa con archivos grandes y varios núcleos. En una sola pasada, en el orden de los archivos, normaliza
+cada fila a [categoría, valores..., periodo] como las de tarifas.extraccion
+(nombres del extractor, valores con dos decimales, periodo AAAAMM), descarta
+las repetidas y al final las ordena por periodo y categoría.
+
+Si una (categoría, periodo) aparece más de una vez queda la primera: los
+mensuales van antes que los consolidados, que en abril de 2019 tienen las
+tarifas de octubre y en junio de 2023 repiten tres categorías con las del
+mercado de ENEL. Las repetidas con otros valores se informan como conflictos.
+"""
+import os
+import re
+import csv
+import time
+import importlib.util
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from concurrent.futures import ThreadPoolExecutor
+
+from tarifas.carga import archivos_csv, columnas, nombres_categoria
+
+# Archivos mensuales por defecto (relativos a la raíz del repositorio)
+patron_mensuales = os.path.join("20[0-9][0-9]", "*.csv")
+
+lectores = ("arrow", "csv")
+
+# "arrow" requiere pyarrow (pip install pyarrow)
+lector_por_defecto = "csv"
+
+# Archivos que se leen a la vez
+hilos_por_defecto = 8
+
+# (codificación, separador) de cada formato de archivo
+formatos_archivo = {
+    "mensual": ("utf-8", ","),
+    "consolidado": ("latin-1", ";"),
+}
+
+# Nombres de los consolidados (los de la tabla categoria) -> nombres del extractor
+_nombres_extractor = {conjunto: {nombre: original for original, nombre in nombres.items()}
+                      for conjunto, nombres in nombres_categoria.items()}
+
+_escapado = re.compile(r"\\(.)")
+_periodo = re.compile(r"^(\d{4})-?(\d{2})$")
+_centavo = Decimal("0.01")
+
+
+def _leer_arrow(ruta, formato):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    codificacion, separador = formatos_archivo[formato]
+    tabla = pa_csv.read_csv(
+        ruta,
+        read_options=pa_csv.ReadOptions(encoding=codificacion, skip_rows=1, autogenerate_column_names=True),
+        parse_options=pa_csv.ParseOptions(delimiter=separador),
+        # Todo como texto: los valores se normalizan después, sin pasar por float
+        convert_options=pa_csv.ConvertOptions(column_types={f"f{i}": pa.string() for i in range(16)}),
+    )
+    return [list(fila) for fila in zip(*(columna.to_pylist() for columna in tabla.columns))]
+
+
+def _leer_csv(ruta, formato):
+    codificacion, separador = formatos_archivo[formato]
+    # utf-8-sig quita el BOM de los mensuales
+    with open(ruta, encoding="utf-8-sig" if codificacion == "utf-8" else codificacion, newline="") as archivo:
+        lector = csv.reader(archivo, delimiter=separador)
+        next(lector, None)
+        return [fila for fila in lector if fila]
+
+
+_funciones_lectura = {"arrow": _leer_arrow, "csv": _leer_csv}
+
+
+def categoria_mensual(seccion, subseccion, tipo):
+    """"Tarifa Residencial", "Estrato 1", "Rango 0 - CS" -> "Estrato 1 - Rango 0 - CS"."""
+    nombre = _escapado.sub(r"\1", subseccion.strip())
+    if seccion.strip() == "Tarifa Áreas Comunes":
+        # "Con contribución" a secas no dice de qué tarifa es
+        nombre = f"Áreas Comunes - {nombre}"
+    tipo = tipo.strip()
+    return nombre if tipo == "Valor único" else f"{nombre} - {tipo}"
+
+
+def normalizar_periodo(periodo):
+    """"2019-01" o "201901" -> "201901" (None si no es un periodo)."""
+    match = _periodo.match(periodo.strip())
+    return match.group(1) + match.group(2) if match else None
+
+
+def normalizar_valores(valores):
+    """["411.0", "1,234.5"] -> ["411.00", "1234.50"] (None si alguno no es un número)."""
+    try:
+        return [str(Decimal(valor.strip().replace(",", "")).quantize(_centavo, ROUND_HALF_UP)) for valor in valores]
+    except InvalidOperation:
+        return None
+
+
+def _normalizar(formato, fila):
+    """(conjunto, [categoría, valores..., periodo]) de una fila leída, o None si no se puede usar."""
+    if formato == "mensual":
+        if len(fila) != 7:
+            return None
+        conjunto = 1
+        categoria = categoria_mensual(*fila[:3])
+        valores = fila[3:6]
+    else:
+        conjuntos = [conjunto for conjunto, nombres in columnas.items() if len(nombres) + 2 == len(fila)]
+        if not conjuntos:
+            return None
+        conjunto = conjuntos[0]
+        nombre = _escapado.sub(r"\1", fila[0].strip())
+        categoria = _nombres_extractor[conjunto].get(nombre, nombre)
+        valores = fila[1:-1]
+    periodo = normalizar_periodo(fila[-1])
+    valores = normalizar_valores(valores)
+    if not categoria or periodo is None or valores is None:
+        return None
+    return conjunto, [categoria] + valores + [periodo]
+
+
+def _leer(tarea):
+    ruta, formato, lector = tarea
+    return os.path.getsize(ruta), _funciones_lectura[lector](ruta, formato)
+
+
+def fuentes_por_defecto(raiz=""):
+    """[(ruta, formato)] de los mensuales (en orden cronológico) y de los dos consolidados."""
+    import glob
+
+    mensuales = sorted(glob.glob(os.path.join(raiz, patron_mensuales)))
+    return ([(ruta, "mensual") for ruta in mensuales]
+            + [(os.path.join(raiz, ruta), "consolidado") for ruta in archivos_csv.values()])
+
+
+def consolidar(fuentes, hilos=hilos_por_defecto, lector=lector_por_defecto, estadisticas=None):
+    """{conjunto: filas} de las fuentes [(ruta, formato)], sin repetidas y ordenadas por periodo y categoría.
+
+    Las fuentes van en orden de prioridad: de una (categoría, periodo)
+    repetida queda la primera. Si se pasa un dict en `estadisticas`, se llena
+    con archivos, bytes, filas leídas, filas por conjunto, repetidas,
+    descartadas, conflictos [(conjunto, categoría, periodo, ruta)] y segundos
+    (ver resumen).
+    """
+    if lector not in lectores:
+        raise ValueError(f"Lector desconocido: {lector} (disponibles: {', '.join(lectores)})")
+    if lector == "arrow" and importlib.util.find_spec("pyarrow") is None:
+        raise ValueError("El lector arrow requiere pyarrow (pip install pyarrow)")
+    inicio = time.perf_counter()
+    vistas = {}
+    cuenta = {"archivos": len(fuentes), "bytes": 0, "filas_leidas": 0, "repetidas": 0, "descartadas": 0,
+              "conflictos": []}
+
+    with ThreadPoolExecutor(max_workers=max(hilos, 1)) as pool:
+        # map entrega los archivos en orden aunque se lean en paralelo
+        tareas = [(ruta, formato, lector) for ruta, formato in fuentes]
+        for (ruta, formato), (tamano, filas) in zip(fuentes, pool.map(_leer, tareas)):
+            cuenta["bytes"] += tamano
+            cuenta["filas_leidas"] += len(filas)
+            for fila in filas:
+                normalizada = _normalizar(formato, fila)
+                if normalizada is None:
+                    cuenta["descartadas"] += 1
+                    continue
+                conjunto, fila = normalizada
+                clave = (conjunto, fila[0], fila[-1])
+                anterior = vistas.setdefault(clave, fila)
+                if anterior is not fila:
+                    cuenta["repetidas"] += 1
+                    if anterior != fila:
+                        cuenta["conflictos"].append(clave + (ruta,))
+
+    resultado = {conjunto: [] for conjunto in columnas}
+    for (conjunto, categoria, periodo), fila in sorted(vistas.items(), key=lambda item: (item[0][2], item[0][1])):
+        resultado[conjunto].append(fila)
+    if estadisticas is not None:
+        estadisticas.update(cuenta)
+        estadisticas["filas"] = {conjunto: len(filas) for conjunto, filas in resultado.items()}
+        estadisticas["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+def resumen(estadisticas):
+    """"142 archivos (230.1 KB) en 0.05 s: 2,840 archivos/s, 120,000 filas/s; ..." a partir de las estadísticas de consolidar()."""
+    segundos = max(estadisticas["segundos"], 1e-9)
+    filas = estadisticas["filas"]
+    return (f"{estadisticas['archivos']} archivos ({estadisticas['bytes'] / 1024:,.1f} KB) en {segundos:.3f} s: "
+            f"{estadisticas['archivos'] / segundos:,.0f} archivos/s, {estadisticas['filas_leidas'] / segundos:,.0f} filas/s, "
+            f"{estadisticas['bytes'] / 1e6 / segundos:.1f} MB/s; "
+            f"{filas[1]} filas de Nivel I y {filas[2]} de Niveles II-IV, {estadisticas['repetidas']} repetidas "
+            f"({len(estadisticas['conflictos'])} con otros valores), {estadisticas['descartadas']} descartadas")
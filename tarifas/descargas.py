@@ -0,0 +1,186 @@
+"""Descarga concurrente de los PDF de tarifas publicados por EPM.
+
+Usa una sola requests.Session (pool de conexiones con reintentos) compartida
+por un pool de hilos, con un límite de descargas simultáneas por servidor.
+Cada PDF se escribe por bloques en un archivo .part que se renombra al
+terminar, de modo que nunca queda un PDF a medias con el nombre final. Si el
+.part ya existe, la descarga se reanuda con una petición Range. El ETag y el
+Last-Modified de cada archivo se guardan en un JSON junto a los PDF y se usan
+en peticiones condicionales para no volver a bajar lo que no cambió.
+"""
+import os
+import json
+import threading
+from urllib.parse import urljoin, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Página con el listado de tarifas de años anteriores
+URL = "https://www.epm.com.co/clientesyusuarios/energia/tarifas-energia/tarifas-anos-anteriores-energia.html#accordion-dc33e69ba6-item-d8ba3a3dea"
+
+# Diccionario para conversión de meses
+meses = {
+    "Enero": "01", "Febrero": "02", "Marzo": "03", "Abril": "04",
+    "Mayo": "05", "Junio": "06", "Julio": "07", "Agosto": "08",
+    "Septiembre": "09", "Octubre": "10", "Noviembre": "11", "Diciembre": "12"
+}
+
+# Archivo (dentro de la carpeta de salida) con los validadores HTTP de cada PDF
+archivo_metadatos = ".metadatos.json"
+
+tamano_bloque = 64 * 1024
+
+
+def crear_sesion(conexiones=8, reintentos=3):
+    """Sesión con pool de conexiones y reintentos con espera exponencial."""
+    sesion = requests.Session()
+    reintento = Retry(total=reintentos, backoff_factor=0.5,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET", "HEAD"))
+    adaptador = HTTPAdapter(pool_connections=conexiones, pool_maxsize=conexiones, max_retries=reintento)
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    return sesion
+
+
+def listar_documentos(html, url_pagina=URL):
+    """Extrae del HTML del listado las tuplas (nombre_archivo, url) de cada mes."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Buscar todos los enlaces de los PDFs
+    documentos = []
+    for accordion in soup.find_all("div", class_="cmp-accordion__item"):
+        year_tag = accordion.find("span", class_="cmp-accordion__title")
+        if not year_tag:
+            continue
+        year = year_tag.text.strip()
+        for card in accordion.find_all("div", class_="cmp-card-icon__text show"):
+            month_tag = card.find("p")
+            if not month_tag:
+                continue
+            month = meses.get(month_tag.text.strip(), "")
+            if not month:
+                continue
+            pdf_link = card.find_parent("a")
+            if pdf_link and "href" in pdf_link.attrs:
+                pdf_url = pdf_link["href"].strip()
+                if pdf_url.startswith("/"):
+                    pdf_url = urljoin(url_pagina, pdf_url)
+                documentos.append((f"{year}-{month}.pdf", pdf_url))
+    return documentos
+
+
+class Descargador:
+    """Descarga documentos en paralelo sobre una sesión compartida."""
+
+    def __init__(self, carpeta, hilos=8, por_host=4, timeout=(10, 60), sesion=None):
+        self.carpeta = carpeta
+        self.hilos = hilos
+        self.por_host = por_host
+        self.timeout = timeout
+        self.sesion = sesion or crear_sesion(conexiones=hilos)
+        self._semaforos = {}
+        self._candado = threading.Lock()
+        os.makedirs(carpeta, exist_ok=True)
+
+        ruta_metadatos = os.path.join(carpeta, archivo_metadatos)
+        self.metadatos = {}
+        if os.path.exists(ruta_metadatos):
+            with open(ruta_metadatos, encoding="utf-8") as archivo:
+                self.metadatos = json.load(archivo)
+
+    def _semaforo(self, url):
+        host = urlsplit(url).netloc
+        with self._candado:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.por_host)
+            return self._semaforos[host]
+
+    def _guardar_metadatos(self):
+        # Se llama con el candado tomado
+        ruta_metadatos = os.path.join(self.carpeta, archivo_metadatos)
+        temporal = ruta_metadatos + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(self.metadatos, archivo, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temporal, ruta_metadatos)
+
+    def descargar(self, file_name, pdf_url):
+        """Descarga un documento. Devuelve "descargado", "reanudado", "sin cambios" u "omitido"."""
+        pdf_path = os.path.join(self.carpeta, file_name)
+        parcial = pdf_path + ".part"
+        anterior = self.metadatos.get(file_name, {})
+
+        headers = {}
+        if os.path.exists(pdf_path):
+            # Sin validadores no hay forma de saber si cambió: se conserva como antes
+            if not anterior.get("etag") and not anterior.get("last_modified"):
+                return "omitido"
+            if anterior.get("etag"):
+                headers["If-None-Match"] = anterior["etag"]
+            if anterior.get("last_modified"):
+                headers["If-Modified-Since"] = anterior["last_modified"]
+
+        # Solo se reanuda si se sabe qué versión se empezó a bajar: con If-Range el
+        # servidor responde el archivo completo (200) si cambió desde entonces
+        inicio = 0
+        if os.path.exists(parcial) and anterior.get("etag_parcial"):
+            inicio = os.path.getsize(parcial)
+        if inicio:
+            headers["Range"] = f"bytes={inicio}-"
+            headers["If-Range"] = anterior["etag_parcial"]
+
+        with self._semaforo(pdf_url):
+            with self.sesion.get(pdf_url, headers=headers, stream=True, timeout=self.timeout) as respuesta:
+                if respuesta.status_code == 304:
+                    return "sin cambios"
+                rango_invalido = respuesta.status_code == 416 and inicio
+                if not rango_invalido:
+                    respuesta.raise_for_status()
+                    reanudado, etag = self._escribir(file_name, parcial, respuesta)
+
+        if rango_invalido:
+            # El .part no corresponde al archivo actual: empezar de cero
+            # (fuera del semáforo del host, para no bloquearse con por_host=1)
+            os.remove(parcial)
+            return self.descargar(file_name, pdf_url)
+
+        os.replace(parcial, pdf_path)
+        with self._candado:
+            self.metadatos[file_name] = {
+                "url": pdf_url,
+                "etag": etag or anterior.get("etag_parcial"),
+                "last_modified": respuesta.headers.get("Last-Modified"),
+            }
+            self._guardar_metadatos()
+        return "reanudado" if reanudado else "descargado"
+
+    def _escribir(self, file_name, parcial, respuesta):
+        """Escribe el cuerpo por bloques en el .part; devuelve (reanudado, etag)."""
+        reanudado = respuesta.status_code == 206
+        etag = respuesta.headers.get("ETag")
+        if not reanudado:
+            # Recordar qué versión se está bajando, para poder reanudarla luego con If-Range
+            with self._candado:
+                self.metadatos.setdefault(file_name, {})["etag_parcial"] = etag
+                self._guardar_metadatos()
+
+        with open(parcial, "ab" if reanudado else "wb") as archivo:
+            for bloque in respuesta.iter_content(chunk_size=tamano_bloque):
+                archivo.write(bloque)
+        return reanudado, etag
+
+    def descargar_todos(self, documentos):
+        """Descarga los documentos en paralelo; devuelve {nombre: estado o excepción}."""
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=self.hilos) as pool:
+            futuros = {pool.submit(self.descargar, nombre, url): nombre for nombre, url in documentos}
+            for futuro, nombre in futuros.items():
+                try:
+                    resultados[nombre] = futuro.result()
+                except requests.RequestException as e:
+                    resultados[nombre] = e
+        return resultados
@@ -0,0 +1,326 @@
+"""Extracción de las tarifas de los PDF de EPM, página por página.
+
+Las funciones forman un pipeline de generadores: PDF -> texto de cada página
+-> resultado de la página -> filas con el período. extraer_paginas() junta
+todo y es la entrada para extraer.py, la ingesta incremental o cualquier otro
+código que necesite las filas de uno o varios PDF.
+
+El texto sale del backend elegido (tarifas/texto.py, pdfium por defecto);
+las páginas que no pasan la validación del formato se vuelven a leer con
+pdfplumber. Los backends se importan al abrir el primer PDF, así importar el
+paquete (o pedir --help al CLI) no los carga.
+
+Antes de leer una página se clasifica (tarifas/plantillas.py) y las de
+otros operadores de red se omiten (ver lecturas).
+"""
+import time
+from collections import deque, namedtuple
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from tarifas.cache import CacheExtraccion, directorio_cache, firma, hash_archivo
+from tarifas.formatos import formato_por_defecto, obtener as obtener_formato
+from tarifas.patrones import expresiones1, expresiones2, regex_periodo
+from tarifas.plantillas import clasificar, familia_operador_red, familia_tarifas, plantillas_para
+from tarifas.texto import abrir as abrir_texto, backend_por_defecto, backend_referencia
+
+# Encabezados de los CSV de cada conjunto de filas
+encabezados = {
+    1: ["Categoría", "Propiedad EPM", "Propiedad Compartido", "Propiedad Cliente", "Periodo"],
+    2: ["Categoría", "Nivel II - Punta", "Nivel II - Fuera de Punta", "Nivel III - Punta", "Nivel III - Fuera de Punta", "Nivel IV - Punta", "Nivel IV - Fuera de Punta", "Periodo"],
+}
+
+# Páginas que procesa cada tarea del pool de procesos
+paginas_por_bloque = 4
+
+# Cómo se leen las páginas (ver tarifas/plantillas.py):
+# - "completa": todas enteras, sin clasificarlas.
+# - "clasificada": se omiten las de otros operadores de red; las demás se leen enteras.
+# - "recortada": además, las de tarifas se leen solo en las franjas de la
+#   plantilla de su versión de diseño. En los PDF de 2014 a 2024 casi todo el
+#   tiempo se va en abrir la página (PDFium) o en leer sus caracteres
+#   (pdfplumber), no en armar el texto, así que recortar no ahorra y no es la
+#   lectura por defecto.
+lecturas = ("completa", "clasificada", "recortada")
+lectura_por_defecto = "clasificada"
+
+
+
+class Fila(namedtuple("Fila", ["conjunto", "fila"])):
+    """Fila extraída: conjunto (1: Nivel I, 2: Niveles II-IV) y [categoría, valores..., periodo].
+
+    Se desempaca como la tupla (conjunto, fila) de siempre.
+    """
+    __slots__ = ()
+
+    @property
+    def categoria(self):
+        return self.fila[0]
+
+    @property
+    def valores(self):
+        return self.fila[1:-1]
+
+    @property
+    def periodo(self):
+        return self.fila[-1]
+
+
+def crear_cache(directorio=directorio_cache, formato=formato_por_defecto):
+    """Caché de extracción firmada con las expresiones y el formato actuales.
+
+    La firma invalida las filas guardadas cuando cambian las expresiones o el formato.
+    """
+    return CacheExtraccion(directorio, firma(expresiones1, expresiones2, regex_periodo,
+                                             obtener_formato(formato).firma()))
+
+
+def extraer_pagina(texto, formato=formato_por_defecto):
+    """Extrae el período y las filas de una página, sin resolver el período heredado.
+
+    Devuelve None si la página no tiene texto; si no, una tupla
+    (periodo_encontrado, filas1, filas2) donde las filas aún no llevan el período.
+    """
+    if not texto:
+        return None
+    return obtener_formato(formato).extraer(texto)
+
+
+def _leer_pagina(lector, indice, formato, cajas=None):
+    inicio = time.perf_counter()
+    texto = lector.texto(indice, cajas)
+    resultado = extraer_pagina(texto, formato)
+    return {"texto": texto, "resultado": resultado, "backend": lector.nombre, "recorte": cajas is not None,
+            "tiempos": {lector.nombre: time.perf_counter() - inicio}}
+
+
+def _leer_clasificada(lector, indice, formato, plantillas=None):
+    """Clasifica la página y la lee según su familia: omitida, recortada (con plantillas) o entera.
+
+    Un recorte se acepta si trae todas las filas y pasa la validación; si no,
+    se lee la página entera y, si esa sí está completa, se suma a la plantilla.
+    """
+    inicio = time.perf_counter()
+    definicion = obtener_formato(formato)
+    clase = clasificar(lector, indice)
+    if clase.familia == familia_operador_red:
+        pagina = {"texto": "", "resultado": None, "backend": lector.nombre, "recorte": False}
+    else:
+        pagina = None
+        cajas = None
+        if plantillas is not None and clase.familia == familia_tarifas:
+            cajas = plantillas.cajas(clase, lector.tamano(indice)[0])
+        if cajas is not None:
+            pagina = _leer_pagina(lector, indice, formato, cajas)
+            if not (definicion.completa(pagina["resultado"])
+                    and definicion.validar(pagina["texto"] or "", pagina["resultado"])):
+                pagina = None
+        if pagina is None:
+            pagina = _leer_pagina(lector, indice, formato)
+            if (plantillas is not None and clase.familia == familia_tarifas
+                    and definicion.completa(pagina["resultado"])
+                    and definicion.validar(pagina["texto"] or "", pagina["resultado"])):
+                plantillas.aprender(clase, lector.lineas(indice), definicion.extraer)
+    pagina["familia"] = clase.familia
+    pagina["tiempos"] = {lector.nombre: time.perf_counter() - inicio}
+    return pagina
+
+
+def paginas_pdf(ruta, inicio=0, fin=None, formato=formato_por_defecto, backend=backend_por_defecto,
+                lectura=lectura_por_defecto, directorio_plantillas=None):
+    """Genera {"texto", "resultado", "backend", "recorte", "tiempos"} por página.
+
+    Salvo con la lectura "completa", cada página se clasifica antes de
+    leerla y lleva además "familia". Con "recortada" (si el formato sabe
+    cuándo una página está completa) las plantillas se guardan en
+    directorio_plantillas (None: solo en memoria). Las páginas que lee un
+    backend rápido y no pasan la validación del formato se vuelven a leer
+    enteras con pdfplumber, que solo se abre si hace falta.
+    """
+    if lectura not in lecturas:
+        raise ValueError(f"Lectura desconocida: {lectura} (disponibles: {', '.join(lecturas)})")
+    definicion = obtener_formato(formato)
+    plantillas = None
+    if lectura == "recortada" and definicion.completa is not None:
+        plantillas = plantillas_para(directorio_plantillas, firma(definicion.firma()))
+    with ExitStack() as pila:
+        lector = pila.enter_context(abrir_texto(ruta, backend))
+        respaldo = None
+        for indice in range(len(lector))[inicio:fin]:
+            if lectura == "completa":
+                pagina = _leer_pagina(lector, indice, formato)
+            else:
+                pagina = _leer_clasificada(lector, indice, formato, plantillas)
+                if pagina["familia"] == familia_operador_red:
+                    yield pagina
+                    continue
+            if backend != backend_referencia and not definicion.validar(pagina["texto"] or "", pagina["resultado"]):
+                if respaldo is None:
+                    respaldo = pila.enter_context(abrir_texto(ruta, backend_referencia))
+                tiempos, familia = pagina["tiempos"], pagina.get("familia")
+                pagina = _leer_pagina(respaldo, indice, formato)
+                pagina["tiempos"].update(tiempos)
+                if familia is not None:
+                    pagina["familia"] = familia
+            yield pagina
+
+
+def extraer_bloque(tarea):
+    """Procesa un rango de páginas [inicio, fin) de un PDF (se ejecuta en un proceso del pool)."""
+    return list(paginas_pdf(*tarea))
+
+
+def dividir_en_bloques(ruta, tamano_bloque, formato=formato_por_defecto, backend=backend_por_defecto,
+                       lectura=lectura_por_defecto, directorio_plantillas=None):
+    """Tareas (ruta, inicio, fin, formato, backend, lectura, directorio_plantillas) de un PDF, en orden de página."""
+    with abrir_texto(ruta, backend) as lector:
+        total_paginas = len(lector)
+    return [(ruta, inicio, min(inicio + tamano_bloque, total_paginas), formato, backend, lectura, directorio_plantillas)
+            for inicio in range(0, total_paginas, tamano_bloque)]
+
+
+def clave_cache(ruta, backend=backend_por_defecto):
+    """Hash del PDF; el texto de otro backend que pdfplumber se guarda en otra entrada."""
+    clave = hash_archivo(ruta)
+    return clave if backend == backend_referencia else f"{clave}-{backend}"
+
+
+def _contar(estadisticas, pagina):
+    """Suma las páginas y los segundos de cada backend (y quita los tiempos, que no van a la caché).
+
+    Las páginas omitidas y recortadas se cuentan en el backend que las leyó al final.
+    """
+    for backend, segundos in pagina.pop("tiempos", {}).items():
+        if estadisticas is not None:
+            cuenta = estadisticas.setdefault(backend, {"paginas": 0, "segundos": 0.0, "omitidas": 0, "recortadas": 0})
+            cuenta["paginas"] += 1
+            cuenta["segundos"] += segundos
+            if backend == pagina["backend"]:
+                cuenta["omitidas"] += pagina.get("familia") == familia_operador_red
+                cuenta["recortadas"] += pagina.get("recorte", False)
+
+
+def resumen_backends(estadisticas):
+    """"pdfium: 278 páginas, 150.3 páginas/s (26 omitidas, 233 recortadas); pdfplumber: ..." (ver extraer())."""
+    partes = []
+    for backend, cuenta in estadisticas.items():
+        parte = f"{backend}: {cuenta['paginas']} páginas, {cuenta['paginas'] / max(cuenta['segundos'], 1e-9):.1f} páginas/s"
+        if cuenta["omitidas"] or cuenta["recortadas"]:
+            parte += f" ({cuenta['omitidas']} omitidas, {cuenta['recortadas']} recortadas)"
+        partes.append(parte)
+    return "; ".join(partes)
+
+
+def resultados_en_orden(pool, tareas, ventana):
+    """Envía las tareas al pool con a lo sumo `ventana` en vuelo y entrega los resultados en orden."""
+    en_vuelo = deque()
+    for tarea in tareas:
+        en_vuelo.append(pool.submit(extraer_bloque, tarea))
+        if len(en_vuelo) >= ventana:
+            yield en_vuelo.popleft().result()
+    while en_vuelo:
+        yield en_vuelo.popleft().result()
+
+
+def filas_con_periodo(resultados_paginas):
+    """Aplica el período heredado de la última página que lo tenía, en orden de página.
+
+    Genera tuplas (conjunto, fila). Como las páginas llegan en el mismo orden en
+    que se leen, el resultado es idéntico al de procesar todo de forma secuencial.
+    """
+    periodo_actual = None  # Variable para almacenar el período por página
+
+    for resultado in resultados_paginas:
+        if resultado is None:
+            continue
+        periodo, filas1, filas2 = resultado
+        if periodo:
+            periodo_actual = periodo
+
+        # Si no se encuentra el período en la página, usar el último detectado
+        if not periodo_actual:
+            continue  # Si aún no tenemos un período válido, omitir la página
+
+        for fila in filas1:
+            yield Fila(1, fila + [periodo_actual])
+        for fila in filas2:
+            yield Fila(2, fila + [periodo_actual])
+
+
+def extraer(rutas, procesos=1, tamano_bloque=paginas_por_bloque, cache=None, formato=formato_por_defecto,
+            backend=backend_por_defecto, estadisticas=None, lectura=lectura_por_defecto):
+    """Genera el resultado de cada página de uno o varios PDF, en orden.
+
+    Con varios procesos las páginas se reparten en bloques entre los procesos
+    del pool. Si se pasa una caché, solo se abren los PDF nuevos o modificados
+    y las plantillas de recorte se guardan en su carpeta. En memoria solo se
+    mantienen las páginas del PDF en curso (para la caché) y los bloques en
+    vuelo. Si se pasa un dict en `estadisticas`, se llena con {backend:
+    {"paginas", "segundos", "omitidas", "recortadas"}} de las páginas leídas
+    (ver resumen_backends). `lectura` es una de lecturas.
+    """
+    claves = {}
+    pendientes = list(rutas)
+    validar = obtener_formato(formato).validar
+    directorio_plantillas = None
+    if cache is not None:
+        claves = {ruta: clave_cache(ruta, backend) for ruta in rutas}
+        pendientes = [ruta for ruta in rutas if not cache.contiene(claves[ruta])]
+        directorio_plantillas = cache.directorio
+    opciones = (formato, backend, lectura, directorio_plantillas)
+
+    with ExitStack() as pila:
+        if procesos > 1:
+            pool = pila.enter_context(ProcessPoolExecutor(max_workers=procesos))
+            tareas_por_ruta = {ruta: dividir_en_bloques(ruta, tamano_bloque, *opciones) for ruta in pendientes}
+            tareas = (tarea for ruta in pendientes for tarea in tareas_por_ruta[ruta])
+            bloques = resultados_en_orden(pool, tareas, ventana=2 * procesos)
+        else:
+            # Un solo "bloque" por PDF, que se lee página por página
+            tareas_por_ruta = {ruta: [(ruta, 0, None, *opciones)] for ruta in pendientes}
+            bloques = (paginas_pdf(*tarea) for ruta in pendientes for tarea in tareas_por_ruta[ruta])
+
+        for ruta in rutas:
+            if ruta not in tareas_por_ruta:
+                paginas, vigentes = cache.obtener(claves[ruta])
+                if not vigentes:
+                    # Cambiaron las expresiones: recalcular las filas desde el texto guardado.
+                    # El texto de una página recortada puede no tener lo que ahora se busca
+                    for indice, pagina in enumerate(paginas):
+                        if pagina.get("recorte"):
+                            pagina = next(paginas_pdf(ruta, indice, indice + 1, *opciones))
+                            _contar(estadisticas, pagina)
+                            paginas[indice] = pagina
+                            continue
+                        pagina["resultado"] = extraer_pagina(pagina["texto"], formato)
+                        if (pagina.get("backend", backend_referencia) != backend_referencia
+                                and not validar(pagina["texto"] or "", pagina["resultado"])):
+                            pagina = next(paginas_pdf(ruta, indice, indice + 1, formato, backend_referencia))
+                            _contar(estadisticas, pagina)
+                            paginas[indice] = pagina
+                    cache.guardar(claves[ruta], ruta, paginas)
+                for pagina in paginas:
+                    yield pagina["resultado"]
+                continue
+
+            paginas = []
+            for _ in tareas_por_ruta[ruta]:
+                for pagina in next(bloques):
+                    _contar(estadisticas, pagina)
+                    if cache is not None:
+                        paginas.append(pagina)
+                    yield pagina["resultado"]
+
+            if cache is not None:
+                cache.fallos += len(paginas)
+                cache.guardar(claves[ruta], ruta, paginas)
+
+
+def extraer_paginas(pdf, procesos=1, tamano_bloque=paginas_por_bloque, cache=None, formato=formato_por_defecto,
+                    backend=backend_por_defecto, estadisticas=None, lectura=lectura_por_defecto):
+    """Genera las Fila de uno o varios PDF (ruta o lista de rutas, en orden cronológico).
+
+    El período de una página sin título es el de la última página anterior
+    que lo tenía, también entre un PDF y el siguiente.
+    """
+    rutas = [pdf] if isinstance(pdf, (str, bytes)) or hasattr(pdf, "__fspath__") else list(pdf)
+    return filas_con_periodo(extraer(rutas, procesos, tamano_bloque, cache, formato, backend, estadisticas, lectura))
@@ -0,0 +1,97 @@
+"""Registro de los formatos (versiones de diseño) de los PDF de tarifas de EPM.
+
+Cada formato sabe leer el texto de una página: devuelve (periodo, filas1,
+filas2) como tarifas.patrones.extraer_filas. Cuando EPM cambie el diseño del
+PDF se registra un formato nuevo con registrar() en vez de copiar el
+extractor completo, como pasó con extract v1 ... v5.
+
+Cada formato valida además el resultado de una página (validar(texto,
+resultado)): lo que lee un backend rápido (ver tarifas/texto.py) y no pasa
+la validación se vuelve a leer con pdfplumber. Con completa(resultado), el
+formato dice si una página trae todas sus filas: solo entonces se aprende de
+ella una plantilla de recorte y se acepta lo leído de un recorte (ver
+tarifas/plantillas.py). Sin completa, las páginas se leen siempre enteras.
+
+El nombre y la versión de cada formato entran en la firma de la caché de
+extracción: subir la versión recalcula las filas guardadas desde el texto.
+"""
+import re
+
+from tarifas.patrones import expresiones1, expresiones2, extraer_filas, version_buscador
+
+formatos = {}
+
+
+class Formato:
+    """Versión de diseño de los PDF y la función que extrae sus filas del texto de una página."""
+
+    def __init__(self, nombre, descripcion, extraer, validar, completa=None, version=1):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.extraer = extraer
+        self.validar = validar
+        self.completa = completa
+        self.version = version
+
+    def firma(self):
+        return [self.nombre, self.version]
+
+
+def registrar(formato):
+    formatos[formato.nombre] = formato
+    return formato
+
+
+def obtener(nombre):
+    try:
+        return formatos[nombre]
+    except KeyError:
+        raise ValueError(f"Formato de PDF desconocido: {nombre} (registrados: {', '.join(formatos)})") from None
+
+
+_precio = re.compile(r"^\d[\d,]*\.\d{2}$")
+_tabla_nivel1 = re.compile(r"Tarifa Residencial Nivel I", re.IGNORECASE)
+
+
+def _valor(texto):
+    return float(texto.replace(",", ""))
+
+
+def validar_epm(texto, resultado):
+    """True si la página se leyó bien: hay texto, las filas tienen período y
+    precios completos, Propiedad EPM >= Compartido >= Cliente en Nivel I, y
+    si está el encabezado de la tabla de Nivel I también están sus filas.
+
+    En los PDF de 2014 a 2024 lo que falla es el orden de las columnas o el
+    título de la página en el texto de PDFium; esas páginas van a pdfplumber.
+    """
+    if resultado is None:
+        return False
+    periodo, filas1, filas2 = resultado
+    if not filas1 and not filas2:
+        return not _tabla_nivel1.search(texto)
+    if periodo is None:
+        return False
+    for fila in filas1 + filas2:
+        if not all(_precio.match(valor) for valor in fila[1:]):
+            return False
+    return all(_valor(epm) >= _valor(compartido) >= _valor(cliente) for _, epm, compartido, cliente in filas1)
+
+
+def completa_epm(resultado):
+    """True si la página tiene período y todas las categorías de Nivel I y de Niveles II-IV."""
+    return (resultado is not None and resultado[0] is not None
+            and len(resultado[1]) == len(expresiones1) and len(resultado[2]) == len(expresiones2))
+
+
+# Tarifas de Nivel I y de Niveles II-IV, el diseño de 2014 a 2024 (el buscador de tarifas.patrones)
+registrar(Formato(
+    "epm",
+    "Tarifas y Costo de Energía Eléctrica de EPM, Nivel I y Niveles II-IV (2014-2024)",
+    extraer_filas,
+    validar_epm,
+    completa_epm,
+    version=version_buscador,
+))
+
+formato_por_defecto = "epm"
@@ -0,0 +1,69 @@
+"""Ingesta incremental: descargar, extraer y cargar solo los meses que faltan.
+
+El manifiesto son los períodos que ya están en `tarifa` y `tarifa_nivel`. Con
+él se filtra el listado de EPM antes de descargar nada, se extraen solo esos
+PDF y se insertan sus filas, junto con los acumulados del dashboard, en una
+única transacción.
+"""
+import os
+import re
+
+from tarifas.carga import actualizar_acumulados, cargar_filas, periodos_cargados
+from tarifas.descargas import Descargador, crear_sesion, listar_documentos
+from tarifas.extraccion import extraer_paginas
+
+_nombre_mensual = re.compile(r"^(\d{4})-(\d{2})\.pdf$")
+
+
+def periodo_de_archivo(file_name):
+    """"2024-12.pdf" -> 202412 (None si el nombre no sigue ese formato)."""
+    match = _nombre_mensual.match(file_name)
+    return int(match.group(1) + match.group(2)) if match else None
+
+
+def meses_faltantes(documentos, manifiesto):
+    """Documentos cuyo período falta en alguna de las dos tablas, en orden cronológico."""
+    faltantes = []
+    for file_name, pdf_url in documentos:
+        periodo = periodo_de_archivo(file_name)
+        if periodo is None:
+            continue
+        if any(periodo not in periodos for periodos in manifiesto.values()):
+            faltantes.append((periodo, file_name, pdf_url))
+    return sorted(faltantes)
+
+
+def actualizar(engine, url, carpeta, cache=None, hilos=4, por_host=4):
+    """Ejecuta la ingesta completa y devuelve un resumen por tabla."""
+    with engine.connect() as conexion:
+        manifiesto = periodos_cargados(conexion)
+
+    sesion = crear_sesion(conexiones=hilos)
+    respuesta = sesion.get(url, timeout=(10, 60))
+    respuesta.raise_for_status()
+    faltantes = meses_faltantes(listar_documentos(respuesta.content, url), manifiesto)
+    resumen = {"meses": [periodo for periodo, _, _ in faltantes], "insertadas": {}, "descartadas": {}}
+    if not faltantes:
+        return resumen
+
+    descargador = Descargador(carpeta, hilos=hilos, por_host=por_host, sesion=sesion)
+    estados = descargador.descargar_todos([(file_name, pdf_url) for _, file_name, pdf_url in faltantes])
+    errores = {nombre: estado for nombre, estado in estados.items() if isinstance(estado, Exception)}
+    rutas = [os.path.join(carpeta, file_name) for _, file_name, _ in faltantes if file_name not in errores]
+    resumen["errores"] = errores
+
+    # Solo las filas de los períodos que aún no tiene cada tabla, sin repetir categoría
+    filas = {conjunto: {} for conjunto in manifiesto}
+    for conjunto, fila in extraer_paginas(rutas, cache=cache):
+        periodo = int(fila[-1])
+        if periodo not in manifiesto[conjunto]:
+            filas[conjunto].setdefault((fila[0], periodo), fila)
+
+    with engine.begin() as conexion:
+        for conjunto, filas_conjunto in filas.items():
+            # Las filas ya llegan sin repetir (categoría, periodo)
+            insertadas, descartadas, _ = cargar_filas(conexion, conjunto, list(filas_conjunto.values()))
+            resumen["insertadas"][conjunto] = insertadas
+            resumen["descartadas"][conjunto] = descartadas
+        actualizar_acumulados(conexion)
+    return resumen
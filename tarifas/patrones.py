@@ -0,0 +1,172 @@
+"""Expresiones regulares de los PDF de tarifas y buscador de una sola pasada.
+
+Los diccionarios expresiones1/expresiones2 y regex_periodo son la definición
+original de cada registro (uno re.search por patrón). extraer_filas recorre el
+texto una sola vez con un patrón precompilado que solo reconoce la primera
+palabra de las líneas con etiqueta; esa palabra indica qué etiquetas pueden
+empezar ahí y solo esas se prueban, con patrones
+precompilados que leen los valores justo después de la etiqueta. Así cada
+"Rango > CS" queda ligado al estrato que lo precede, en lugar de tomar siempre
+el primero de la página.
+"""
+import re
+
+# Expresiones regulares para cada registro
+expresiones1 = {
+    "Estrato 1 - Rango 0 - CS": r"Estrato 1\.\s*Rango 0 - CS\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Estrato 1 - Rango > CS": r"\s*Rango > CS\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Estrato 2 - Rango 0 - CS": r"Estrato 2\.\s*Rango 0 - CS\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Estrato 2 - Rango > CS": r"\s*Rango > CS\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Estrato 3 - Rango 0 - CS": r"Estrato 3\.\s*Rango 0 - CS\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Estrato 3 - Rango > CS": r"\s*Rango > CS\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Estrato 4 - Todo el consumo": r"Estrato 4\.\s*Todo el consumo\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Estrato 5 y 6 - Todo el consumo": r"Estrato 5 y 6\.\s*Todo el consumo\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Industrial y Comercial": r"Industrial y Comercial\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "ESPD*": r"ESPD\*\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Oficial y Exentos de Contribución": r"Oficial y Exentos de Contribución\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Industrial y Comercial - Punta": r"Industrial y\s+Punta\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Industrial y Comercial - Fuera de Punta": r"Comercial\s+Fuera de Punta\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Oficial y Exentos - Punta": r"Oficial y\s+Punta\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Oficial y Exentos - Fuera de Punta": r"Exentos\s+Fuera de Punta\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)"
+}
+
+expresiones2 = {
+    "Industrial y Comercial": r"Industrial y Comercial\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)",
+    "Oficial y Exentos": r"Oficial y Exentos\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)"
+}
+
+# Expresión regular para extraer el período
+regex_periodo = r"(?:Tarifas y Costo de Energía Eléctrica.*?-\s*)\s*(Enero|Febrero|Marzo|Abril|Mayo|Junio|Julio|Agosto|Septiembre|Octubre|Noviembre|Diciembre)\s*de\s*(\d{4})"
+
+# Diccionario para conversión de meses
+meses = {
+    "Enero": "01", "Febrero": "02", "Marzo": "03", "Abril": "04",
+    "Mayo": "05", "Junio": "06", "Julio": "07", "Agosto": "08",
+    "Septiembre": "09", "Octubre": "10", "Noviembre": "11", "Diciembre": "12"
+}
+
+# Valores numéricos que siguen a cada etiqueta
+tres_valores = r"\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)"
+seis_valores = tres_valores + tres_valores
+
+# Etiquetas del buscador: (regex de la etiqueta, [(conjunto, categoría, regex de los valores)]).
+# Una misma etiqueta puede alimentar los dos conjuntos (Nivel I y Niveles II-IV).
+# La categoría None indica un "Rango > CS", que se asigna al último estrato visto.
+etiquetas = [
+    (r"Estrato 1\.\s*Rango 0 - CS", [(1, "Estrato 1 - Rango 0 - CS", tres_valores)]),
+    (r"Estrato 2\.\s*Rango 0 - CS", [(1, "Estrato 2 - Rango 0 - CS", tres_valores)]),
+    (r"Estrato 3\.\s*Rango 0 - CS", [(1, "Estrato 3 - Rango 0 - CS", tres_valores)]),
+    (r"Rango > CS", [(1, None, tres_valores)]),
+    (r"Estrato 4\.\s*Todo el consumo", [(1, "Estrato 4 - Todo el consumo", tres_valores)]),
+    (r"Estrato 5 y 6\.\s*Todo el consumo", [(1, "Estrato 5 y 6 - Todo el consumo", tres_valores)]),
+    (r"Industrial y Comercial", [(1, "Industrial y Comercial", tres_valores),
+                                 (2, "Industrial y Comercial", seis_valores)]),
+    (r"ESPD\*", [(1, "ESPD*", tres_valores)]),
+    (r"Oficial y Exentos", [(1, "Oficial y Exentos de Contribución", r" de Contribución" + tres_valores),
+                            (2, "Oficial y Exentos", seis_valores)]),
+    (r"Industrial y\s+Punta", [(1, "Industrial y Comercial - Punta", tres_valores)]),
+    (r"Comercial\s+Fuera de Punta", [(1, "Industrial y Comercial - Fuera de Punta", tres_valores)]),
+    (r"Oficial y\s+Punta", [(1, "Oficial y Exentos - Punta", tres_valores)]),
+    (r"Exentos\s+Fuera de Punta", [(1, "Oficial y Exentos - Fuera de Punta", tres_valores)]),
+]
+
+# Estrato al que pertenecen los "Rango > CS" que siguen a cada etiqueta
+estratos = {0: 1, 1: 2, 2: 3}
+
+# Versión del buscador; forma parte de la firma de la caché de extracción
+version_buscador = 3
+
+# pdfplumber parte algunos números en dos ("153.50 1 47.57 141.64" en vez de
+# "153.50 147.57 141.64", sobre todo en los PDF de 2014 a 2018): un entero de
+# hasta tres cifras suelto, seguido de un número con decimales, es la primera
+# parte de ese número
+_numero_partido = re.compile(r"(?<![\d.,])(\d{1,3}) (?=\d[\d,]*\.\d+(?![\d.]))")
+
+_etiqueta_periodo = re.compile(r"Tarifas y Costo de Energía Eléctrica", re.IGNORECASE)
+_valores_periodo = re.compile(
+    r".*?-\s*\s*(Enero|Febrero|Marzo|Abril|Mayo|Junio|Julio|Agosto|Septiembre|Octubre|Noviembre|Diciembre)\s*de\s*(\d{4})",
+    re.IGNORECASE,
+)
+
+
+def unir_numeros_partidos(texto):
+    """Vuelve a unir los números que pdfplumber separó con un espacio."""
+    return _numero_partido.sub(r"\1", texto)
+
+
+def _primera_palabra(etiqueta):
+    return re.split(r" |\\s", etiqueta)[0].replace("\\", "")
+
+
+# Etiquetas posibles según la primera palabra de la línea: [(índice, etiqueta compilada, candidatos)]
+_por_palabra = {}
+for _indice, (_etiqueta, _lista) in enumerate(etiquetas):
+    _candidatos = [(conjunto, categoria, re.compile(valores)) for conjunto, categoria, valores in _lista]
+    _por_palabra.setdefault(_primera_palabra(_etiqueta), []).append((_indice, re.compile(_etiqueta), _candidatos))
+
+# Inicio de las líneas que pueden tener una etiqueta (el período no distingue mayúsculas).
+# Empieza con un salto de línea literal en lugar de ^ para que re busque ese carácter
+# directamente en vez de probar la alternancia en cada posición.
+_inicio_linea = re.compile(
+    "\n(" + "|".join(re.escape(palabra) for palabra in _por_palabra) + "|(?i:tarifas))"
+)
+
+_total_categorias = len(expresiones1) + len(expresiones2)
+
+
+def extraer_filas(texto):
+    """Recorre el texto de una página una sola vez y devuelve (periodo, filas1, filas2).
+
+    Las etiquetas se buscan al inicio de cada línea, que es donde las deja
+    pdfplumber. Como con re.search, cada categoría toma su primera coincidencia
+    (los valores sí pueden continuar en la línea siguiente). Las filas se
+    devuelven en el orden de expresiones1/expresiones2 y sin el período.
+    Antes se unen los números partidos (ver unir_numeros_partidos).
+    """
+    periodo = None
+    encontrados = {1: {}, 2: {}}
+    estrato_actual = None
+    texto = "\n" + unir_numeros_partidos(texto)  # Para que la primera línea también empiece con salto de línea
+
+    for match_linea in _inicio_linea.finditer(texto):
+        pos = match_linea.start(1)
+        palabra = match_linea.group(1)
+
+        if palabra not in _por_palabra:
+            # Línea del título: "Tarifas y Costo de Energía Eléctrica - ... - <mes> de <año>"
+            if periodo is None:
+                match_etiqueta = _etiqueta_periodo.match(texto, pos)
+                if match_etiqueta:
+                    match_periodo = _valores_periodo.match(texto, match_etiqueta.end())
+                    if match_periodo:
+                        mes_texto, anio = match_periodo.groups()
+                        periodo = anio + meses[mes_texto.capitalize()]  # Convertir a formato YYYYMM
+            continue
+
+        for indice, etiqueta, candidatos in _por_palabra[palabra]:
+            match_etiqueta = etiqueta.match(texto, pos)
+            if not match_etiqueta:
+                continue
+            if indice in estratos:
+                estrato_actual = estratos[indice]
+
+            for conjunto, categoria, valores in candidatos:
+                if categoria is None:
+                    if estrato_actual is None:
+                        continue
+                    categoria = f"Estrato {estrato_actual} - Rango > CS"
+                destino = encontrados[conjunto]
+                if categoria in destino:
+                    continue
+                match = valores.match(texto, match_etiqueta.end())
+                if match:
+                    destino[categoria] = list(match.groups())
+            break
+
+        # Terminar en cuanto estén todas las categorías y el período
+        if periodo and len(encontrados[1]) + len(encontrados[2]) == _total_categorias:
+            break
+
+    filas1 = [[categoria] + encontrados[1][categoria] for categoria in expresiones1 if categoria in encontrados[1]]
+    filas2 = [[categoria] + encontrados[2][categoria] for categoria in expresiones2 if categoria in encontrados[2]]
+    return periodo, filas1, filas2
@@ -0,0 +1,153 @@
+"""Clasificación de las páginas de los PDF y plantillas de recorte por versión de diseño.
+
+clasificar() decide qué tiene cada página con su tamaño y la posición de dos
+textos, sin armar el texto de la página:
+- "tarifas": las tablas de EPM (título "Tarifas y Costo de Energía Eléctrica").
+- "operador_red": las tablas de los mercados de otros operadores de red
+  (ENEL, CELSIA, EMCALI; desde junio de 2023). No se extraen.
+- "otra": sin título; se extrae la página completa.
+
+La versión de diseño de una página de tarifas es su tamaño (carta de 2014 en
+adelante, A4 y el de 971 x 1257 de 2019). La plantilla de cada versión son
+las franjas de la página donde están el título y las tablas que se extraen,
+medidas desde el título (su posición cambia de un mes a otro). Con la
+lectura "recortada" de tarifas.extraccion se aprende de la primera página
+completa de esa versión y se guarda en la carpeta de la caché de
+extracción; las páginas siguientes solo leen el texto de esas franjas. Si lo recortado no trae todas las filas, se lee la página completa
+y sus franjas se suman a la plantilla, que así cubre los meses en que las
+tablas se corren.
+"""
+import os
+import json
+import statistics
+from collections import namedtuple
+
+familia_tarifas = "tarifas"
+familia_operador_red = "operador_red"
+familia_otra = "otra"
+
+# Textos que distinguen las familias (buscar() no distingue mayúsculas)
+titulo_tarifas = "Tarifas y Costo de Energ"
+titulo_operador_red = "Operador de Red"
+
+# Versión del aprendizaje de las plantillas; forma parte de su firma
+version_plantillas = 1
+
+# Archivo de las plantillas dentro de la carpeta de la caché de extracción
+archivo_plantillas = "plantillas.json"
+
+
+class Clase(namedtuple("Clase", ["familia", "version", "titulo"])):
+    """Familia de tablas de una página, versión de diseño y top del título (None si no lo tiene)."""
+    __slots__ = ()
+
+
+def clasificar(lector, indice):
+    """Clase de la página `indice` del lector (ver tarifas/texto.py)."""
+    ancho, alto = lector.tamano(indice)
+    version = f"{round(ancho)}x{round(alto)}"
+    titulo = lector.buscar(indice, titulo_tarifas)
+    if lector.buscar(indice, titulo_operador_red) is not None:
+        return Clase(familia_operador_red, version, titulo)
+    if titulo is None:
+        return Clase(familia_otra, version, None)
+    return Clase(familia_tarifas, version, titulo)
+
+
+def aprender_franjas(lineas, extraer, titulo):
+    """Franjas [(desde, hasta)], relativas al título, de las líneas de las que `extraer` saca algo.
+
+    Las líneas con filas o período que están cerca se juntan en una franja;
+    cada franja lleva una línea de margen arriba y abajo.
+    """
+    relevantes = []
+    for texto, top, bottom in lineas:
+        resultado = extraer(texto)
+        if resultado is not None and (resultado[0] or resultado[1] or resultado[2]):
+            relevantes.append((top, bottom))
+    if not relevantes:
+        return []
+    alto_linea = statistics.median(bottom - top for top, bottom in relevantes)
+
+    franjas = []
+    for top, bottom in sorted(relevantes):
+        if franjas and top - franjas[-1][1] <= 2 * alto_linea:
+            franjas[-1][1] = max(franjas[-1][1], bottom)
+        else:
+            franjas.append([top, bottom])
+    return [(round(top - alto_linea - titulo, 1), round(bottom + alto_linea - titulo, 1)) for top, bottom in franjas]
+
+
+class Plantillas:
+    """Franjas de recorte por versión de diseño, en memoria y (si hay carpeta) en disco.
+
+    La firma debe cambiar cuando cambia lo que se extrae (el formato): las
+    plantillas guardadas con otra firma se descartan.
+    """
+
+    def __init__(self, directorio=None, firma_formato=""):
+        self.directorio = directorio
+        self.firma = [firma_formato, version_plantillas]
+        self.versiones = {}
+        if directorio is not None:
+            self._cargar()
+
+    def _ruta(self):
+        return os.path.join(self.directorio, archivo_plantillas)
+
+    def _cargar(self):
+        try:
+            with open(self._ruta(), encoding="utf-8") as archivo:
+                contenido = json.load(archivo)
+        except (OSError, ValueError):
+            return
+        if contenido.get("firma") == self.firma:
+            self.versiones = {version: [tuple(franja) for franja in franjas]
+                              for version, franjas in contenido["versiones"].items()}
+
+    def cajas(self, clase, ancho):
+        """Cajas (x0, top, x1, bottom) de la página de esa clase, o None si su versión aún no tiene plantilla."""
+        if clase.version not in self.versiones and self.directorio is not None:
+            # Otro proceso pudo haberla aprendido
+            self._cargar()
+        franjas = self.versiones.get(clase.version)
+        if not franjas:
+            return None
+        return [(0, clase.titulo + desde, ancho, clase.titulo + hasta) for desde, hasta in franjas]
+
+    def aprender(self, clase, lineas, extraer):
+        """Suma a la plantilla de la versión de la página las franjas de sus líneas (ver aprender_franjas)."""
+        franjas = aprender_franjas(lineas, extraer, clase.titulo)
+        if not franjas:
+            return
+        if self.directorio is not None:
+            # Partir de lo que hayan guardado otros procesos
+            self._cargar()
+        unidas = []
+        for desde, hasta in sorted(self.versiones.get(clase.version, []) + franjas):
+            if unidas and desde <= unidas[-1][1]:
+                unidas[-1] = (unidas[-1][0], max(unidas[-1][1], hasta))
+            else:
+                unidas.append((desde, hasta))
+        self.versiones[clase.version] = unidas
+        if self.directorio is None:
+            return
+        # Escritura atómica: otros procesos pueden estar leyendo el archivo
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = f"{self._ruta()}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump({"firma": self.firma, "versiones": self.versiones}, archivo, ensure_ascii=False, indent=1)
+        os.replace(temporal, self._ruta())
+
+
+# Plantillas de cada proceso, por (carpeta, firma): se comparten entre los PDF
+# y entre las tareas que recibe un mismo proceso del pool
+_por_proceso = {}
+
+
+def plantillas_para(directorio, firma_formato):
+    """Plantillas del proceso para esa carpeta (None: solo en memoria) y firma."""
+    clave = (directorio, firma_formato)
+    if clave not in _por_proceso:
+        _por_proceso[clave] = Plantillas(directorio, firma_formato)
+    return _por_proceso[clave]
@@ -0,0 +1,177 @@
+"""Lectores del texto de las páginas de un PDF (backends de extracción).
+
+- "pdfplumber": arma el layout completo de cada página (objetos por carácter)
+  y ordena el texto por posición. Es lento, pero es la referencia.
+- "pdfium": el texto de la página tal como lo guarda el PDF, con pypdfium2
+  (PDFium en C). Decenas de veces más rápido; el orden de las líneas puede
+  cambiar, pero cada fila de la tabla queda en su línea.
+
+extraccion.paginas_pdf valida lo que se lee con el backend rápido y solo
+las páginas que no pasan se vuelven a leer con pdfplumber. Los dos backends
+se importan al abrir el primer PDF.
+
+Los dos lectores miden en puntos desde la esquina superior izquierda de la
+página, como pdfplumber: las cajas son (x0, top, x1, bottom). Además del
+texto completo dan el tamaño de la página, la posición de un texto y las
+líneas con su posición, que usa tarifas/plantillas.py para clasificar las
+páginas y recortarlas.
+"""
+import re
+import importlib.util
+from contextlib import contextmanager
+
+backends = ("pdfium", "pdfplumber")
+
+# Backend de respaldo y de referencia
+backend_referencia = "pdfplumber"
+
+# pdfium si pypdfium2 está instalado (pip install pypdfium2); si no, pdfplumber
+backend_por_defecto = "pdfium" if importlib.util.find_spec("pypdfium2") else backend_referencia
+
+
+_lineas_pdfium = re.compile(r"[^\r\n]+")
+
+
+def _recortar(caja, ancho, alto):
+    x0, top, x1, bottom = caja
+    return max(x0, 0), max(top, 0), min(x1, ancho), min(bottom, alto)
+
+
+class TextoPdfplumber:
+    nombre = "pdfplumber"
+
+    def __init__(self, ruta):
+        import pdfplumber
+
+        self._pdf = pdfplumber.open(ruta)
+        self._actual = None
+
+    def __len__(self):
+        return len(self._pdf.pages)
+
+    def _pagina(self, indice):
+        # La página en curso se reutiliza entre llamadas (pdfplumber guarda su
+        # layout) y se suelta al pasar a otra
+        if self._actual is None or self._actual[0] != indice:
+            self._soltar()
+            self._actual = (indice, self._pdf.pages[indice])
+        return self._actual[1]
+
+    def _soltar(self):
+        if self._actual is not None:
+            self._actual[1].close()
+            self._actual = None
+
+    def tamano(self, indice):
+        page = self._pagina(indice)
+        return page.width, page.height
+
+    def texto(self, indice, cajas=None):
+        """Texto de la página o, con cajas, solo el de esas cajas (una tras otra)."""
+        page = self._pagina(indice)
+        if cajas is None:
+            return page.extract_text()
+        return "\n".join(page.crop(_recortar(caja, page.width, page.height)).extract_text() for caja in cajas)
+
+    def buscar(self, indice, texto):
+        """Top de la primera aparición del texto (sin distinguir mayúsculas), o None."""
+        encontrados = self._pagina(indice).search(texto, regex=False, case=False)
+        return encontrados[0]["top"] if encontrados else None
+
+    def lineas(self, indice):
+        """[(texto, top, bottom)] de cada línea de la página."""
+        return [(linea["text"], linea["top"], linea["bottom"])
+                for linea in self._pagina(indice).extract_text_lines(return_chars=False)]
+
+    def cerrar(self):
+        self._soltar()
+        self._pdf.close()
+
+
+class TextoPdfium:
+    nombre = "pdfium"
+
+    def __init__(self, ruta):
+        import pypdfium2
+
+        self._pdf = pypdfium2.PdfDocument(ruta)
+        self._actual = None
+
+    def __len__(self):
+        return len(self._pdf)
+
+    def _pagina(self, indice):
+        # (página, texto de la página, alto); PDFium mide desde abajo
+        if self._actual is None or self._actual[0] != indice:
+            self._soltar()
+            pagina = self._pdf[indice]
+            self._actual = (indice, pagina, pagina.get_textpage(), pagina.get_height())
+        return self._actual[1:]
+
+    def _soltar(self):
+        if self._actual is not None:
+            self._actual[2].close()
+            self._actual[1].close()
+            self._actual = None
+
+    def tamano(self, indice):
+        return self._pagina(indice)[0].get_size()
+
+    def texto(self, indice, cajas=None):
+        """Texto de la página o, con cajas, solo el de esas cajas (una tras otra)."""
+        pagina, texto_pagina, alto = self._pagina(indice)
+        if cajas is None:
+            texto = texto_pagina.get_text_range()
+        else:
+            texto = "\n".join(texto_pagina.get_text_bounded(left=x0, bottom=alto - bottom, right=x1, top=alto - top)
+                              for x0, top, x1, bottom in cajas)
+        # PDFium separa las líneas con \r\n y deja espacios al inicio de algunas;
+        # el buscador espera las etiquetas al inicio de la línea, como en pdfplumber
+        return "\n".join(linea.strip() for linea in texto.splitlines())
+
+    def buscar(self, indice, texto):
+        """Top de la primera aparición del texto (sin distinguir mayúsculas), o None."""
+        pagina, texto_pagina, alto = self._pagina(indice)
+        buscador = texto_pagina.search(texto, match_case=False)
+        try:
+            encontrado = buscador.get_next()
+        finally:
+            buscador.close()
+        if encontrado is None:
+            return None
+        return alto - texto_pagina.get_charbox(encontrado[0])[3]
+
+    def lineas(self, indice):
+        """[(texto, top, bottom)] de cada línea de la página.
+
+        Los índices de get_text_range coinciden con los de los caracteres, así
+        que la posición de cada línea sale de las cajas de sus caracteres.
+        """
+        pagina, texto_pagina, alto = self._pagina(indice)
+        texto = texto_pagina.get_text_range()
+        lineas = []
+        for linea in _lineas_pdfium.finditer(texto):
+            cajas = [texto_pagina.get_charbox(i) for i in range(linea.start(), linea.end()) if not texto[i].isspace()]
+            if cajas:
+                lineas.append((linea.group().strip(), alto - max(caja[3] for caja in cajas),
+                               alto - min(caja[1] for caja in cajas)))
+        return lineas
+
+    def cerrar(self):
+        self._soltar()
+        self._pdf.close()
+
+
+_clases = {"pdfplumber": TextoPdfplumber, "pdfium": TextoPdfium}
+
+
+@contextmanager
+def abrir(ruta, backend=backend_por_defecto):
+    """with abrir(ruta, backend) as lector: len(lector), lector.texto(indice)."""
+    if backend not in _clases:
+        raise ValueError(f"Backend de texto desconocido: {backend} (disponibles: {', '.join(backends)})")
+    lector = _clases[backend](ruta)
+    try:
+        yield lector
+    finally:
+        lector.cerrar()
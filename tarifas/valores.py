@@ -0,0 +1,111 @@
+"""Tabla larga tarifa_valor: un valor por (categoría, periodo, dimensión).
+
+Con migraciones/004_tarifa_valor.sql (o migrar()) los precios de `tarifa`
+(tres columnas de propiedad) y de `tarifa_nivel` (seis de nivel y punta)
+pasan a filas (id_categoria, periodo, dimension, valor), donde dimension es
+el nombre de la columna de antes (propiedad_epm, nivel_ii_punta, ...). Una
+dimensión nueva son filas nuevas, sin cambiar el esquema.
+
+En MySQL/MariaDB la tabla se particiona por año (RANGE sobre periodo): una
+consulta con periodo BETWEEN solo lee las particiones de esos años. Las
+tablas anchas quedan como <tabla>_ancha y en su lugar hay vistas `tarifa` y
+`tarifa_nivel` con las mismas columnas (id_tarifa sale de periodo e
+id_categoria), así las consultas del dashboard y los acumulados no cambian.
+Las vistas son un JOIN por dimensión, sin GROUP BY: la base las funde con la
+consulta y los filtros llegan a la tabla.
+
+tarifas.carga escribe aquí cuando la tabla existe (ver reemplazar()).
+"""
+from sqlalchemy import inspect, text
+
+tabla_valores = "tarifa_valor"
+
+# Años con partición propia; lo anterior va a p_anterior y lo posterior a p_futuro
+anios_particion = range(2014, 2031)
+
+# Alias de cada dimensión en las vistas (la primera es la tabla base del JOIN)
+_alias = "abcdefghijklmnopqrstuvwxyz"
+
+
+def tabla_ancha(tabla):
+    return f"{tabla}_ancha"
+
+
+def usa_valores(conexion):
+    """True si la base ya tiene la tabla larga (las tablas tarifa y tarifa_nivel son vistas)."""
+    return inspect(conexion).has_table(tabla_valores)
+
+
+def sql_tabla(dialecto, anios=anios_particion):
+    """Sentencias que crean tarifa_valor y su índice por periodo; particionada por año en MySQL/MariaDB.
+
+    La clave primaria sirve a las consultas por categoría y a los JOIN de las
+    vistas; el índice (dimension, periodo, ...) cubre la tabla completa y los
+    rangos de periodos, en orden de periodo.
+    """
+    definicion = (f"CREATE TABLE {tabla_valores} ("
+                  "id_categoria INT NOT NULL, periodo INT NOT NULL, dimension VARCHAR(32) NOT NULL, "
+                  "valor DECIMAL(10,2) NOT NULL, PRIMARY KEY (dimension, id_categoria, periodo)")
+    indice = f"idx_{tabla_valores}_periodo"
+    if dialecto != "mysql":
+        # Sin rowid la clave primaria es la tabla, como el índice agrupado de InnoDB
+        return [definicion + ") WITHOUT ROWID",
+                f"CREATE INDEX {indice} ON {tabla_valores} (dimension, periodo, id_categoria, valor)"]
+    particiones = [f"PARTITION p_anterior VALUES LESS THAN ({anios[0] * 100})"]
+    particiones += [f"PARTITION p{anio} VALUES LESS THAN ({(anio + 1) * 100})" for anio in anios]
+    particiones.append("PARTITION p_futuro VALUES LESS THAN MAXVALUE")
+    return [definicion + f", KEY {indice} (dimension, periodo, id_categoria, valor)) "
+            f"ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci "
+            f"PARTITION BY RANGE (periodo) ({', '.join(particiones)})"]
+
+
+def sql_vista(dialecto, tabla, columnas):
+    """CREATE VIEW de la tabla ancha sobre tarifa_valor, una columna por dimensión."""
+    base = _alias[0]
+    lista = [f"{base}.periodo * 1000 + {base}.id_categoria AS id_tarifa", f"{base}.id_categoria"]
+    uniones = []
+    for alias, columna in zip(_alias, columnas):
+        lista.append(f"{alias}.valor AS {columna}")
+        if alias != base:
+            uniones.append(f"LEFT JOIN {tabla_valores} {alias} ON {alias}.dimension = '{columna}' "
+                           f"AND {alias}.id_categoria = {base}.id_categoria AND {alias}.periodo = {base}.periodo")
+    lista.append(f"{base}.periodo")
+    algoritmo = "ALGORITHM=MERGE " if dialecto == "mysql" else ""
+    return (f"CREATE {algoritmo}VIEW {tabla} AS SELECT {', '.join(lista)} FROM {tabla_valores} {base} "
+            f"{' '.join(uniones)} WHERE {base}.dimension = '{columnas[0]}'")
+
+
+def _insertar_dimension(conexion, origen, columna):
+    # Una sentencia por dimensión: MySQL no deja leer dos veces una tabla temporal en la misma consulta
+    conexion.execute(text(
+        f"INSERT INTO {tabla_valores} (id_categoria, periodo, dimension, valor) "
+        f"SELECT id_categoria, periodo, '{columna}', {columna} FROM {origen} WHERE {columna} IS NOT NULL"
+    ))
+
+
+def migrar(conexion, tablas_columnas):
+    """Crea tarifa_valor con las filas de las tablas anchas y deja las vistas en su lugar.
+
+    tablas_columnas: {tabla: [columnas de valores]}. Es lo mismo que
+    migraciones/004_tarifa_valor.sql; en MySQL los CREATE/RENAME hacen commit
+    implícito, así que si falla a mitad hay que revisar la base a mano.
+    """
+    dialecto = conexion.dialect.name
+    for sentencia in sql_tabla(dialecto):
+        conexion.execute(text(sentencia))
+    for tabla, columnas in tablas_columnas.items():
+        for columna in columnas:
+            _insertar_dimension(conexion, tabla, columna)
+        conexion.execute(text(f"ALTER TABLE {tabla} RENAME TO {tabla_ancha(tabla)}"))
+        conexion.execute(text(sql_vista(dialecto, tabla, columnas)))
+
+
+def reemplazar(conexion, tabla_temporal, columnas):
+    """Reemplaza en tarifa_valor las (categoría, periodo) de la tabla temporal de tarifas.carga."""
+    for columna in columnas:
+        # Con la dimensión fija, cada (categoría, periodo) de la temporal es una búsqueda por clave primaria
+        conexion.execute(text(
+            f"DELETE FROM {tabla_valores} WHERE dimension = '{columna}' AND (id_categoria, periodo) IN ("
+            f"SELECT id_categoria, periodo FROM {tabla_temporal})"
+        ))
+        _insertar_dimension(conexion, tabla_temporal, columna)